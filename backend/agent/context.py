@@ -0,0 +1,176 @@
+# backend/agent/context.py
+
+import os
+import re
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+
+# ============================================================================
+# CONFIGURATION (ENV VARS)
+# ============================================================================
+
+# Budget (tokens estimés) de tout ce qui est envoyé à Ollama, prompt système compris
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "3000"))
+
+# Derniers tours gardés mot pour mot (1 tour = message utilisateur + réponse)
+CONTEXT_KEEP_TURNS = int(os.getenv("CONTEXT_KEEP_TURNS", "4"))
+
+# Les tours anciens sont résumés par paquets de N tours (le résumé bouge moins souvent)
+CONTEXT_FOLD_STEP = int(os.getenv("CONTEXT_FOLD_STEP", "2"))
+
+# Taille max du résumé glissant (caractères)
+CONTEXT_SUMMARY_CHARS = int(os.getenv("CONTEXT_SUMMARY_CHARS", "800"))
+
+
+# Bloc ajouté par l'orchestrator au message utilisateur
+_SCRAPED_BLOCK = re.compile(r"\s*\[Contexte fiable scraped : .*\]\s*$", re.S)
+
+# Coût fixe approximatif d'un message (rôle, séparateurs du template)
+_MESSAGE_OVERHEAD = 4
+
+
+# ============================================================================
+# ESTIMATION DES TOKENS
+# ============================================================================
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimation rapide (~4 caractères par token), sans tokenizer :
+    suffit pour rester sous un budget.
+    """
+    return len(text) // 4 + 1
+
+
+def _messages_tokens(messages: List[Dict[str, str]]) -> int:
+    return sum(estimate_tokens(m.get("content", "")) + _MESSAGE_OVERHEAD for m in messages)
+
+
+def strip_scraped_context(content: str) -> str:
+    """Retire le bloc [Contexte fiable scraped : …] d'un ancien message."""
+    return _SCRAPED_BLOCK.sub("", content)
+
+
+# ============================================================================
+# RÉSUMÉ GLISSANT (extractif, mis en cache)
+# ============================================================================
+
+# Empreinte des tours résumés → résumé ; borné pour ne pas grossir
+_SUMMARY_CACHE: "OrderedDict[str, str]" = OrderedDict()
+_SUMMARY_CACHE_MAX = 2048
+_SUMMARY_LOCK = threading.Lock()
+
+
+def _first_line(text: str, limit: int) -> str:
+    line = text.strip().split("\n", 1)[0].strip()
+    return line if len(line) <= limit else line[:limit].rstrip() + "…"
+
+
+def _summarize(messages: List[Dict[str, str]]) -> str:
+    """
+    Résumé des anciens tours : question de l'utilisateur + 1re ligne de la réponse.
+    Pas d'appel LLM : aucun coût de latence supplémentaire.
+    Si le résumé dépasse CONTEXT_SUMMARY_CHARS, les tours les plus récents sont gardés.
+    """
+    key = hashlib.sha1(
+        "\x00".join(f"{m['role']}:{m.get('content', '')}" for m in messages).encode("utf-8")
+    ).hexdigest()
+
+    with _SUMMARY_LOCK:
+        if key in _SUMMARY_CACHE:
+            _SUMMARY_CACHE.move_to_end(key)
+            return _SUMMARY_CACHE[key]
+
+    lines = []
+    for m in messages:
+        if m["role"] == "user":
+            lines.append(f"- Utilisateur : {_first_line(m.get('content', ''), 160)}")
+        elif m["role"] == "assistant":
+            lines.append(f"  FlorIA : {_first_line(m.get('content', ''), 160)}")
+
+    summary = "\n".join(lines)
+    if len(summary) > CONTEXT_SUMMARY_CHARS:
+        summary = "…" + summary[-CONTEXT_SUMMARY_CHARS:]
+
+    with _SUMMARY_LOCK:
+        _SUMMARY_CACHE[key] = summary
+        if len(_SUMMARY_CACHE) > _SUMMARY_CACHE_MAX:
+            _SUMMARY_CACHE.popitem(last=False)
+
+    return summary
+
+
+# ============================================================================
+# CONSTRUCTION DE LA FENÊTRE
+# ============================================================================
+
+def _split_history(history: List[Dict[str, str]], keep_turns: int, fold_step: int) -> Tuple[List, List]:
+    """
+    (tours à résumer, tours gardés tels quels).
+    La frontière avance par paquets de fold_step tours : entre deux paquets,
+    le début du prompt (système + résumé) reste identique d'un tour à l'autre.
+    """
+    keep = keep_turns * 2
+    step = max(1, fold_step) * 2
+
+    if len(history) <= keep:
+        return [], history
+
+    extra = (len(history) - keep) % step
+    cut = len(history) - keep - extra
+    return history[:cut], history[cut:]
+
+
+def build_context(
+    system_prompt: str,
+    history: List[Dict[str, str]],
+    user_entry: Dict[str, str],
+    budget: int = CONTEXT_TOKEN_BUDGET,
+    keep_turns: int = CONTEXT_KEEP_TURNS,
+    fold_step: int = CONTEXT_FOLD_STEP
+) -> List[Dict[str, str]]:
+    """
+    Messages envoyés à Ollama, sous un budget de tokens :
+
+    1) prompt système
+    2) résumé glissant des anciens tours (si besoin)
+    3) derniers tours, sans les anciens blocs de contexte scrapé
+    4) nouveau message utilisateur (toujours gardé)
+
+    Si le budget est dépassé, les plus anciens tours gardés rejoignent le résumé.
+    """
+    cleaned = [
+        {**m, "content": strip_scraped_context(m.get("content", ""))} if m["role"] == "user" else m
+        for m in history
+    ]
+    folded, kept = _split_history(cleaned, keep_turns, fold_step)
+
+    system = {"role": "system", "content": system_prompt}
+
+    while True:
+        messages = [system]
+        if folded:
+            messages.append({
+                "role": "system",
+                "content": f"Résumé des échanges précédents :\n{_summarize(folded)}"
+            })
+        messages.extend(kept)
+        messages.append(user_entry)
+
+        if _messages_tokens(messages) <= budget or not kept:
+            return messages
+
+        # Hors budget : le plus ancien tour gardé passe dans le résumé
+        folded, kept = folded + kept[:2], kept[2:]
+
+
+# 🧠 À quoi sert ce fichier ?
+
+# Sans lui, Ollama relit toute la conversation à chaque message :
+# plus la session est longue, plus chaque réponse est lente
+# Ici on garde seulement : le prompt système, un court résumé des vieux échanges,
+# les derniers tours, et le nouveau message
+# Les anciens blocs "[Contexte fiable scraped : …]" sont retirés (ils ne servent plus)
+# Le tout tient dans un budget de tokens (CONTEXT_TOKEN_BUDGET)
@@ -0,0 +1,300 @@
+# backend/agent/lexicon.py
+
+import os
+import re
+import json
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+
+# ============================================================================
+# CONFIGURATION (ENV VARS)
+# ============================================================================
+
+# Fichier JSON : [{"nom_vernaculaire": "...", "nom_latin": "..."}, ...]
+PLANT_LEXICON_PATH = os.getenv(
+    "PLANT_LEXICON_PATH",
+    os.path.join(os.path.dirname(__file__), "data", "plants.json")
+)
+
+# Score minimal (0 → 1) pour accepter un nom approché ("monsterra" → monstera)
+# À 0.8, une seule lettre changée sur un mot de 5 suffisait ("morte" → myrte)
+PLANT_FUZZY_MIN_SCORE = float(os.getenv("PLANT_FUZZY_MIN_SCORE", "0.85"))
+
+# Longueur minimale d'un mot pour tenter un nom approché (les mots courts se ressemblent tous)
+PLANT_FUZZY_MIN_LENGTH = int(os.getenv("PLANT_FUZZY_MIN_LENGTH", "6"))
+
+
+# ============================================================================
+# NORMALISATION
+# ============================================================================
+
+def normaliser(chaine: str) -> List[str]:
+    """
+    Texte → liste de tokens ASCII en minuscules.
+    Les tirets et apostrophes séparent les mots ("belle-de-nuit", "l'if").
+    """
+    chaine = unicodedata.normalize('NFD', chaine)
+
+    chaine = chaine.encode('ascii', 'ignore').decode('utf-8')
+
+    chaine = re.sub(r"[-'’]", ' ', chaine)
+
+    chaine = re.sub(r'[^a-zA-Z0-9\s]', '', chaine)
+
+    return chaine.lower().split()
+
+
+# Mots trop courants dans les messages pour être corrigés en nom de plante
+STOPWORDS = {
+    "plante", "plantes", "feuille", "feuilles", "fleur", "fleurs", "racine", "racines",
+    "arroser", "arrosage", "arrose", "terre", "terreau", "jardin", "balcon", "soleil",
+    "lumiere", "ombre", "hiver", "ete", "printemps", "automne", "comment", "pourquoi",
+    "quand", "quelle", "quelles", "bonjour", "merci", "depuis", "toujours", "jaune",
+    "jaunes", "brune", "brunes", "seche", "seches", "pierre", "maison", "interieur",
+    "exterieur", "tailler", "taille", "rempoter", "engrais", "besoin", "conseil"
+}
+
+# Mots français courants, à une lettre d'un nom de plante : jamais corrigés
+# ("bureau" → sureau, "tasse" → casse, "morte" → myrte)
+MOTS_COURANTS = {
+    # maison
+    "bureau", "salon", "cuisine", "chambre", "fenetre", "fenetres", "balcons", "terrasse",
+    "table", "lampe", "tasse", "tasses", "verre", "verres", "bouteille", "assiette",
+    "meuble", "etagere", "radiateur", "chauffage", "garage", "veranda", "entree",
+    # état de la plante
+    "morte", "mortes", "mourir", "meurt", "malade", "malades", "molle", "molles",
+    "pourrie", "pourries", "fanee", "fanees", "cassee", "cassees", "casses", "cassez",
+    "abimee", "abimees", "tombee", "tombees", "grillee", "brulee", "brulees", "triste",
+    "tachee", "tachees", "taches", "trouee", "trouees", "fletrie", "ramollie",
+    # lumière, climat, temps
+    "sombre", "sombres", "clair", "claire", "chaude", "chaud", "froide", "froid",
+    "humide", "humidite", "pluie", "soleil", "lumineux", "lumineuse", "semaine",
+    "semaines", "matin", "soiree", "journee", "annee", "saison",
+    # verbes et mots du quotidien
+    "renverse", "renversee", "arrosee", "arrosees", "devrais", "pouvez", "pourriez",
+    "faudrait", "mettre", "donner", "changer", "trouver", "acheter", "achete", "achetee",
+    "offert", "offerte", "probleme", "problemes", "question", "conseils", "souvent",
+    "beaucoup", "encore", "plusieurs", "petite", "petites", "grande", "grandes",
+    "nouvelle", "nouvelles", "vieille", "vieilles", "couleur", "couleurs",
+    "blanche", "blanches", "noires", "rouges", "vertes", "marron", "orange",
+    "branche", "branches", "bouture", "boutures", "graine", "graines", "pousse", "pousses",
+    "bourgeon", "bourgeons", "soucoupe", "jardiniere", "substrat", "arrosoir",
+}
+
+
+# ============================================================================
+# DISTANCE D'ÉDITION + TRIGRAMMES
+# ============================================================================
+
+def _trigrams(word: str) -> Set[str]:
+    """Trigrammes du mot, bornes comprises ("  m", " mo", "mon", ...)."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _levenshtein(a: str, b: str, max_dist: int) -> int:
+    """
+    Distance d'édition, abandonnée dès qu'elle dépasse max_dist
+    (renvoie alors max_dist + 1).
+    """
+    if abs(len(a) - len(b)) > max_dist:
+        return max_dist + 1
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb)
+            ))
+        if min(current) > max_dist:
+            return max_dist + 1
+        previous = current
+
+    return previous[-1]
+
+
+def _plural_variants(token: str) -> List[str]:
+    """Formes singulières probables ("lavandes" → "lavande", "bambous" → "bambou")."""
+    variants = []
+    if token.endswith(("s", "x")):
+        variants.append(token[:-1])
+    if token.endswith("es"):
+        variants.append(token[:-2])
+    return variants
+
+
+# ============================================================================
+# TRIE DE TOKENS
+# ============================================================================
+
+# Clé de fin de nom dans un nœud (jamais produite par normaliser)
+_END = "$"
+
+
+class PlantLexicon:
+    """
+    Index des noms de plantes (vernaculaires + latins), construit une fois.
+
+    Trie de tokens : chaque nœud est un dict token → nœud suivant,
+    ce qui permet de reconnaître les noms en plusieurs mots
+    ("belle de nuit", "lilas de californie") avec un accès dict par token.
+    """
+
+    def __init__(self, entries: List[Dict[str, str]]):
+        self._root: Dict = {}
+        self.size = 0
+
+        # Index approché : noms d'un seul mot, trigramme → ids de noms
+        self._words: List[Tuple[str, str]] = []
+        self._gram_counts: List[int] = []
+        self._trigram_index: Dict[str, List[int]] = defaultdict(list)
+
+        # Ordre du fichier conservé : en cas de doublon, le premier nom gagne
+        for entry in entries:
+            latin = entry["nom_latin"]
+            self.add(entry["nom_vernaculaire"], latin)
+            self.add(latin, latin)
+
+    @classmethod
+    def from_file(cls, path: str) -> "PlantLexicon":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def add(self, name: str, latin: str) -> None:
+        """Ajoute un nom (déjà connu = ignoré)."""
+        tokens = normaliser(name)
+        if not tokens:
+            return
+
+        node = self._root
+        for token in tokens:
+            node = node.setdefault(token, {})
+
+        if _END not in node:
+            node[_END] = latin
+            self.size += 1
+
+            if len(tokens) == 1:
+                word_id = len(self._words)
+                grams = _trigrams(tokens[0])
+                self._words.append((tokens[0], latin))
+                self._gram_counts.append(len(grams))
+                for gram in grams:
+                    self._trigram_index[gram].append(word_id)
+
+    def find(self, tokens: List[str]) -> Optional[Tuple[str, int, int]]:
+        """
+        Premier nom trouvé dans les tokens (le plus long à une position donnée).
+        Retourne (nom_latin, début, fin) ou None.
+        """
+        for start in range(len(tokens)):
+            node = self._root
+            match = None
+
+            for end in range(start, len(tokens)):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                if _END in node:
+                    match = (node[_END], start, end + 1)
+
+            if match:
+                return match
+
+        return None
+
+    def _lookup(self, token: str) -> Optional[str]:
+        """Nom d'un seul mot, correspondance exacte."""
+        node = self._root.get(token)
+        if node is not None:
+            return node.get(_END)
+        return None
+
+    def fuzzy(self, token: str, min_score: float = PLANT_FUZZY_MIN_SCORE) -> Optional[Tuple[str, float]]:
+        """
+        Nom le plus proche d'un token mal orthographié.
+
+        Les candidats viennent de l'index de trigrammes (coefficient de Dice),
+        puis sont vérifiés par distance d'édition bornée.
+        Score = 1 - distance / longueur du plus long des deux mots.
+        """
+        grams = _trigrams(token)
+        shared: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for word_id in self._trigram_index.get(gram, ()):
+                shared[word_id] += 1
+
+        # Au-delà de max_dist, le score passerait sous min_score
+        max_dist = int(len(token) * (1 - min_score)) + 1
+        best = None
+
+        # Les 5 meilleurs candidats de longueur compatible (Dice sur trigrammes)
+        ranked = sorted(
+            (
+                (2 * count / (len(grams) + self._gram_counts[word_id]), word_id)
+                for word_id, count in shared.items()
+                if abs(len(self._words[word_id][0]) - len(token)) <= max_dist
+            ),
+            reverse=True
+        )[:5]
+
+        for _, word_id in ranked:
+            word, latin = self._words[word_id]
+            dist = _levenshtein(token, word, max_dist)
+            score = 1 - dist / max(len(token), len(word))
+
+            if score >= min_score and (best is None or score > best[1]):
+                best = (latin, score)
+
+        return best
+
+    def resolve(self, tokens: List[str], min_score: float = PLANT_FUZZY_MIN_SCORE) -> Optional[Tuple[str, float]]:
+        """
+        Nom latin + confiance (0 → 1) pour un message déjà normalisé.
+
+        1) nom exact (multi-mots compris)       → 1.0
+        2) pluriel d'un nom connu ("lavandes")  → 0.95
+        3) nom approché ("monsterra", "orchidé") → score d'édition
+           (mots d'au moins PLANT_FUZZY_MIN_LENGTH lettres, hors MOTS_COURANTS)
+        """
+        match = self.find(tokens)
+        if match:
+            return match[0], 1.0
+
+        best = None
+        for token in tokens:
+            if len(token) < 4 or token in STOPWORDS or token in MOTS_COURANTS:
+                continue
+
+            for variant in _plural_variants(token):
+                latin = self._lookup(variant)
+                if latin:
+                    return latin, 0.95
+
+            if len(token) < PLANT_FUZZY_MIN_LENGTH:
+                continue
+
+            candidate = self.fuzzy(token, min_score)
+            if candidate and (best is None or candidate[1] > best[1]):
+                best = candidate
+
+        return best
+
+
+# Chargé une seule fois, au premier import
+PLANT_LEXICON = PlantLexicon.from_file(PLANT_LEXICON_PATH)
+
+
+# 🧠 À quoi sert ce fichier ?
+
+# C’est le dictionnaire des plantes connues de FlorIA
+# La liste vit dans data/plants.json (peut grandir sans toucher au code)
+# Elle est chargée une fois au démarrage, pas reconstruite à chaque message
+# _extract_plant s’en sert pour trouver le nom latin à envoyer au scraping
+# Les fautes de frappe et pluriels ("monsterra", "lavandes") sont rattrapés
+# par un index de trigrammes + distance d'édition, avec un score de confiance
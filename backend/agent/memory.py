@@ -0,0 +1,432 @@
+# backend/agent/memory.py
+
+import os
+import time
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+# ============================================================================
+# CONFIGURATION (ENV VARS)
+# ============================================================================
+
+# Backend de stockage des sessions (voir SESSION_BACKENDS)
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "memory")
+
+# Nombre max de sessions vivantes / inactivité avant expiration (secondes)
+SESSION_MAX = int(os.getenv("SESSION_MAX", "5000"))
+SESSION_TTL = int(os.getenv("SESSION_TTL", str(6 * 3600)))
+
+# Tours gardés par session (1 tour = message utilisateur + réponse)
+SESSION_MAX_TURNS = int(os.getenv("SESSION_MAX_TURNS", "20"))
+
+# Budget mémoire global pour le contenu des messages (octets)
+SESSION_MAX_BYTES = int(os.getenv("SESSION_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Backend "sqlite" : fichier partagé par tous les workers uvicorn de la machine
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", "sessions.sqlite3")
+
+# Nettoyage (expiration, tours en trop) toutes les N écritures
+SESSION_PRUNE_EVERY = int(os.getenv("SESSION_PRUNE_EVERY", "200"))
+
+
+def _message_size(message: Dict[str, str]) -> int:
+    """Taille d'un message en octets (contenu UTF-8)."""
+    return len(message.get("content", "").encode("utf-8"))
+
+
+# ============================================================================
+# INTERFACE
+# ============================================================================
+
+class SessionStore(ABC):
+    """
+    Interface d'un backend de sessions.
+
+    Une session ne contient que les tours de conversation (user / assistant) :
+    le prompt système, identique pour tout le monde, est ajouté par l'orchestrator.
+    """
+
+    @abstractmethod
+    def history(self, session_id: str) -> List[Dict[str, str]]:
+        """Messages de la session, du plus ancien au plus récent ([] si inconnue)."""
+
+    @abstractmethod
+    def append(self, session_id: str, *messages: Dict[str, str]) -> None:
+        """Ajoute des messages à la fin de la session (la crée si besoin)."""
+
+    @abstractmethod
+    def delete(self, session_id: str) -> None:
+        """Supprime une session."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, int]:
+        """Métriques : sessions vivantes, octets gardés, évictions..."""
+
+    def __contains__(self, session_id: str) -> bool:
+        return bool(self.history(session_id))
+
+
+# ============================================================================
+# BACKEND EN MÉMOIRE (un seul process)
+# ============================================================================
+
+class InMemorySessionStore(SessionStore):
+    """
+    Sessions en RAM, bornées :
+    - LRU : au-delà de max_sessions, la session la moins récente part
+    - TTL : une session inactive depuis ttl secondes expire
+    - max_turns : seuls les derniers tours de chaque session sont gardés
+    - max_bytes : budget global, les sessions les moins récentes partent d'abord ;
+      s'il n'en reste qu'une, ses tours les plus anciens partent à leur tour
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = SESSION_MAX,
+        ttl: int = SESSION_TTL,
+        max_turns: int = SESSION_MAX_TURNS,
+        max_bytes: int = SESSION_MAX_BYTES
+    ):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_messages = max_turns * 2
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._sessions: "OrderedDict[str, Dict]" = OrderedDict()
+        self._bytes = 0
+        self._counters = {
+            "evicted_lru": 0,
+            "evicted_ttl": 0,
+            "evicted_budget": 0,
+            "trimmed_messages": 0,
+        }
+
+    def history(self, session_id: str) -> List[Dict[str, str]]:
+        with self._lock:
+            session = self._get(session_id)
+            return list(session["messages"]) if session else []
+
+    def append(self, session_id: str, *messages: Dict[str, str]) -> None:
+        with self._lock:
+            session = self._get(session_id)
+            if session is None:
+                session = {"messages": [], "bytes": 0, "last_seen": time.time()}
+                self._sessions[session_id] = session
+
+            for message in messages:
+                session["messages"].append(message)
+                size = _message_size(message)
+                session["bytes"] += size
+                self._bytes += size
+
+            # Cap par session : on retire les tours les plus anciens
+            while len(session["messages"]) > self.max_messages:
+                self._trim_oldest(session)
+
+            self._evict(keep=session_id)
+
+    def delete(self, session_id: str) -> None:
+        with self._lock:
+            self._drop(session_id)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._evict()
+            return {
+                "sessions": len(self._sessions),
+                "bytes": self._bytes,
+                **self._counters
+            }
+
+    # ------------------------------------------------------------------------
+    # Interne (appelé sous self._lock)
+    # ------------------------------------------------------------------------
+
+    def _get(self, session_id: str) -> Optional[Dict]:
+        """Session vivante (marquée comme récente) ou None si absente / expirée."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+
+        now = time.time()
+        if now - session["last_seen"] > self.ttl:
+            self._drop(session_id)
+            self._counters["evicted_ttl"] += 1
+            return None
+
+        session["last_seen"] = now
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def _drop(self, session_id: str) -> None:
+        session = self._sessions.pop(session_id, None)
+        if session:
+            self._bytes -= session["bytes"]
+
+    def _evict(self, keep: Optional[str] = None) -> None:
+        """Expire puis évince par LRU jusqu'à respecter les limites."""
+        now = time.time()
+
+        # Les plus anciennes sont en tête : on s'arrête à la première encore vivante
+        while self._sessions:
+            oldest_id, oldest = next(iter(self._sessions.items()))
+            if now - oldest["last_seen"] <= self.ttl:
+                break
+            self._drop(oldest_id)
+            self._counters["evicted_ttl"] += 1
+
+        while len(self._sessions) > self.max_sessions:
+            self._drop(self._oldest(keep))
+            self._counters["evicted_lru"] += 1
+
+        while self._bytes > self.max_bytes and len(self._sessions) > 1:
+            self._drop(self._oldest(keep))
+            self._counters["evicted_budget"] += 1
+
+        # Une seule session, mais des tours très longs : elle aussi respecte le budget
+        if self._bytes > self.max_bytes and self._sessions:
+            session_id, session = next(iter(self._sessions.items()))
+            while self._bytes > self.max_bytes and session["messages"]:
+                self._trim_oldest(session, count=2)
+            if not session["messages"]:
+                self._drop(session_id)
+                self._counters["evicted_budget"] += 1
+
+    def _trim_oldest(self, session: Dict, count: int = 1) -> None:
+        """Retire les count messages les plus anciens d'une session (2 = un tour)."""
+        for removed in session["messages"][:count]:
+            size = _message_size(removed)
+            session["bytes"] -= size
+            self._bytes -= size
+            self._counters["trimmed_messages"] += 1
+        del session["messages"][:count]
+
+    def _oldest(self, keep: Optional[str]) -> str:
+        """Session la moins récente, sans jamais évincer celle en cours d'écriture."""
+        for session_id in self._sessions:
+            if session_id != keep:
+                return session_id
+        return keep
+
+
+# ============================================================================
+# BACKEND SQLITE (plusieurs process / workers)
+# ============================================================================
+
+class SQLiteSessionStore(SessionStore):
+    """
+    Sessions dans un fichier SQLite en mode WAL, partagé entre process :
+    un 2e message qui arrive sur un autre worker retrouve son historique.
+
+    Les écritures sont en ajout seul (une ligne par message) : l'historique
+    n'est jamais réécrit. Les tours au-delà de max_turns ne sont pas relus,
+    et sont supprimés avec les sessions expirées lors du nettoyage périodique.
+    """
+
+    def __init__(
+        self,
+        path: str = SESSION_DB_PATH,
+        max_sessions: int = SESSION_MAX,
+        ttl: int = SESSION_TTL,
+        max_turns: int = SESSION_MAX_TURNS,
+        prune_every: int = SESSION_PRUNE_EVERY
+    ):
+        self.path = path
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.max_messages = max_turns * 2
+        self.prune_every = prune_every
+
+        # Une connexion par thread (sqlite3 ne se partage pas entre threads)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._counters = {"pruned_sessions": 0, "pruned_messages": 0}
+
+        conn = self._conn()
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS sessions (
+                session_id TEXT PRIMARY KEY,
+                last_seen REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS turns (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL,
+                role TEXT NOT NULL,
+                content TEXT NOT NULL,
+                created_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS turns_by_session ON turns (session_id, id);
+            CREATE INDEX IF NOT EXISTS sessions_by_age ON sessions (last_seen);
+            """
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def history(self, session_id: str) -> List[Dict[str, str]]:
+        conn = self._conn()
+        row = conn.execute(
+            "SELECT last_seen FROM sessions WHERE session_id = ?", (session_id,)
+        ).fetchone()
+        if row is None or time.time() - row[0] > self.ttl:
+            return []
+
+        rows = conn.execute(
+            """
+            SELECT role, content FROM (
+                SELECT id, role, content FROM turns
+                WHERE session_id = ? ORDER BY id DESC LIMIT ?
+            ) ORDER BY id
+            """,
+            (session_id, self.max_messages)
+        ).fetchall()
+        return [{"role": role, "content": content} for role, content in rows]
+
+    def append(self, session_id: str, *messages: Dict[str, str]) -> None:
+        now = time.time()
+        conn = self._conn()
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Session expirée : on repart d'un historique vide
+            row = conn.execute(
+                "SELECT last_seen FROM sessions WHERE session_id = ?", (session_id,)
+            ).fetchone()
+            if row is not None and now - row[0] > self.ttl:
+                conn.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+
+            conn.executemany(
+                "INSERT INTO turns (session_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                [(session_id, m["role"], m.get("content", ""), now) for m in messages]
+            )
+            conn.execute(
+                """
+                INSERT INTO sessions (session_id, last_seen) VALUES (?, ?)
+                ON CONFLICT(session_id) DO UPDATE SET last_seen = excluded.last_seen
+                """,
+                (session_id, now)
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        with self._lock:
+            self._writes += 1
+            prune = self._writes % self.prune_every == 0
+        if prune:
+            self.prune()
+
+    def delete(self, session_id: str) -> None:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("DELETE FROM turns WHERE session_id = ?", (session_id,))
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def prune(self) -> None:
+        """
+        Supprime les sessions expirées, les plus anciennes au-delà de max_sessions,
+        et les tours qui ne sont plus relus (au-delà de max_turns).
+        """
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                """
+                CREATE TEMP TABLE IF NOT EXISTS doomed (session_id TEXT PRIMARY KEY)
+                """
+            )
+            conn.execute("DELETE FROM doomed")
+            conn.execute(
+                "INSERT INTO doomed SELECT session_id FROM sessions WHERE last_seen < ?",
+                (time.time() - self.ttl,)
+            )
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO doomed
+                SELECT session_id FROM sessions ORDER BY last_seen DESC LIMIT -1 OFFSET ?
+                """,
+                (self.max_sessions,)
+            )
+            sessions = conn.execute(
+                "DELETE FROM sessions WHERE session_id IN (SELECT session_id FROM doomed)"
+            ).rowcount
+            messages = conn.execute(
+                "DELETE FROM turns WHERE session_id IN (SELECT session_id FROM doomed)"
+            ).rowcount
+            messages += conn.execute(
+                """
+                DELETE FROM turns WHERE id IN (
+                    SELECT id FROM (
+                        SELECT id, ROW_NUMBER() OVER (PARTITION BY session_id ORDER BY id DESC) AS rank
+                        FROM turns
+                    ) WHERE rank > ?
+                )
+                """,
+                (self.max_messages,)
+            ).rowcount
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        with self._lock:
+            self._counters["pruned_sessions"] += sessions
+            self._counters["pruned_messages"] += messages
+
+    def stats(self) -> Dict[str, int]:
+        conn = self._conn()
+        live = conn.execute(
+            "SELECT COUNT(*) FROM sessions WHERE last_seen >= ?", (time.time() - self.ttl,)
+        ).fetchone()[0]
+        stored, size = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(CAST(content AS BLOB))), 0) FROM turns"
+        ).fetchone()
+        with self._lock:
+            return {"sessions": live, "bytes": size, "messages": stored, **self._counters}
+
+
+# ============================================================================
+# SÉLECTION DU BACKEND
+# ============================================================================
+
+# Nom → classe ; un nouveau backend s'ajoute ici
+SESSION_BACKENDS = {
+    "memory": InMemorySessionStore,
+    "sqlite": SQLiteSessionStore,
+}
+
+
+def create_session_store(backend: str = SESSION_BACKEND) -> SessionStore:
+    """Instancie le backend configuré (SESSION_BACKEND)."""
+    if backend not in SESSION_BACKENDS:
+        raise ValueError(f"Backend de sessions inconnu : '{backend}'. Disponibles : {list(SESSION_BACKENDS)}")
+    return SESSION_BACKENDS[backend]()
+
+
+# 🧠 À quoi sert ce fichier ?
+
+# C’est la mémoire des conversations de FlorIA
+# Avant : un dict global qui grossissait sans fin (prompt système copié dans chaque session)
+# Maintenant : des sessions bornées (nombre, âge, tours, octets), avec des métriques
+# Le backend est interchangeable : SESSION_BACKEND choisit l’implémentation
+# - memory : un seul process (uvicorn sans --workers)
+# - sqlite : fichier WAL partagé, pour uvicorn --workers N sur la même machine
@@ -0,0 +1,111 @@
+# backend/agent/response_cache.py
+
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+from agent.lexicon import normaliser
+
+
+# ============================================================================
+# CONFIGURATION (ENV VARS)
+# ============================================================================
+
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "1") == "1"
+
+# Durée de vie d'une réponse (24 h) / nombre max de réponses / taille max (octets)
+RESPONSE_CACHE_TTL = int(os.getenv("RESPONSE_CACHE_TTL", str(24 * 3600)))
+RESPONSE_CACHE_MAX = int(os.getenv("RESPONSE_CACHE_MAX", "2000"))
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+
+# ============================================================================
+# CLÉ DE CACHE
+# ============================================================================
+
+def response_key(message: str, intent: str, plant: Optional[str], summary: Optional[str]) -> str:
+    """
+    Clé = message normalisé + intention + plante + empreinte du contexte scrapé.
+    Si les sources changent, le résumé change et la clé aussi.
+    """
+    summary_hash = hashlib.sha1((summary or "").encode("utf-8")).hexdigest()
+    raw = "\x00".join([" ".join(normaliser(message)), intent, plant or "", summary_hash])
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+# ============================================================================
+# CACHE LRU + TTL
+# ============================================================================
+
+class ResponseCache:
+    """
+    Réponses d'Ollama aux premiers messages (sans historique), en mémoire.
+    Éviction LRU par nombre d'entrées et par taille totale, expiration par TTL.
+    """
+
+    def __init__(
+        self,
+        ttl: int = RESPONSE_CACHE_TTL,
+        max_entries: int = RESPONSE_CACHE_MAX,
+        max_bytes: int = RESPONSE_CACHE_MAX_BYTES
+    ):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._bytes = 0
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry["expires_at"] <= time.time():
+                if entry is not None:
+                    self._drop(key)
+                self._counters["misses"] += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry["reply"]
+
+    def put(self, key: str, reply: str) -> None:
+        size = len(reply.encode("utf-8"))
+        if not reply or size > self.max_bytes:
+            return
+
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = {"reply": reply, "size": size, "expires_at": time.time() + self.ttl}
+            self._bytes += size
+            self._counters["stores"] += 1
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self._counters["evictions"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, **self._counters}
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._bytes -= entry["size"]
+
+
+# Instance partagée (None si le cache est désactivé)
+RESPONSE_CACHE: Optional[ResponseCache] = ResponseCache() if RESPONSE_CACHE_ENABLED else None
+
+
+# 🧠 À quoi sert ce fichier ?
+
+# Beaucoup de conversations commencent par la même question ("comment arroser ma lavande")
+# Avec le même contexte scrapé et le même prompt système, Ollama répondrait la même chose
+# On garde donc la réponse et on évite un appel LLM de plusieurs dizaines de secondes
+# Uniquement pour le 1er message d'une session : avec un historique, la réponse dépend de la conversation
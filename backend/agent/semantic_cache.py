@@ -0,0 +1,304 @@
+# backend/agent/semantic_cache.py
+
+import os
+import math
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import httpx
+import requests
+
+# NumPy est optionnel : sans lui, produit scalaire en Python pur (plus lent, même résultat)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# CONFIGURATION (ENV VARS)
+# ============================================================================
+
+# Désactivé par défaut : demande un modèle d'embedding dans Ollama (0/1)
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE", "0") == "1"
+
+# Embeddings calculés en local par Ollama
+OLLAMA_EMBED_URL = os.getenv("OLLAMA_EMBED_URL", "http://localhost:11434/api/embed")
+OLLAMA_EMBED_MODEL = os.getenv("OLLAMA_EMBED_MODEL", "nomic-embed-text")
+OLLAMA_EMBED_TIMEOUT = float(os.getenv("OLLAMA_EMBED_TIMEOUT", "5"))
+
+# Similarité cosinus minimale pour réutiliser une réponse
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+
+# Durée de vie d'une réponse / nombre max de réponses par index / nombre max d'index
+SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", str(24 * 3600)))
+SEMANTIC_CACHE_MAX_PER_INDEX = int(os.getenv("SEMANTIC_CACHE_MAX_PER_INDEX", "256"))
+SEMANTIC_CACHE_MAX_INDEXES = int(os.getenv("SEMANTIC_CACHE_MAX_INDEXES", "512"))
+
+
+# ============================================================================
+# EMBEDDINGS (OLLAMA)
+# ============================================================================
+
+def _normalize(values: List[float]):
+    """Vecteur unitaire (float32) : la similarité cosinus devient un produit scalaire."""
+    norm = math.sqrt(sum(v * v for v in values)) or 1.0
+    if np is not None:
+        return np.asarray(values, dtype=np.float32) / np.float32(norm)
+    return array("f", (v / norm for v in values))
+
+
+def _read_embedding(data: Dict):
+    # /api/embed → {"embeddings": [[...]]} ; ancien /api/embeddings → {"embedding": [...]}
+    values = (data.get("embeddings") or [None])[0] or data.get("embedding")
+    if not values:
+        raise ValueError("Réponse d'embedding vide")
+    return _normalize(values)
+
+
+def _embed_payload(text: str) -> Dict:
+    return {"model": OLLAMA_EMBED_MODEL, "input": text, "prompt": text}
+
+
+# Client httpx partagé (keep-alive), recréé si la boucle asyncio change
+_ASYNC_CLIENT: Optional[httpx.AsyncClient] = None
+_ASYNC_CLIENT_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    global _ASYNC_CLIENT, _ASYNC_CLIENT_LOOP
+
+    loop = asyncio.get_running_loop()
+    if _ASYNC_CLIENT is None or _ASYNC_CLIENT.is_closed or _ASYNC_CLIENT_LOOP is not loop:
+        _ASYNC_CLIENT = httpx.AsyncClient(timeout=OLLAMA_EMBED_TIMEOUT)
+        _ASYNC_CLIENT_LOOP = loop
+    return _ASYNC_CLIENT
+
+
+async def aclose_client() -> None:
+    """
+    Ferme le client d'embedding partagé (arrêt de l'application).
+    """
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is not None:
+        await _ASYNC_CLIENT.aclose()
+        _ASYNC_CLIENT = None
+
+
+def embed(text: str):
+    """Vecteur unitaire du texte (appel bloquant)."""
+    r = requests.post(OLLAMA_EMBED_URL, json=_embed_payload(text), timeout=OLLAMA_EMBED_TIMEOUT)
+    r.raise_for_status()
+    return _read_embedding(r.json())
+
+
+async def embed_async(text: str):
+    """Version asynchrone de embed."""
+    r = await _get_async_client().post(OLLAMA_EMBED_URL, json=_embed_payload(text))
+    r.raise_for_status()
+    return _read_embedding(r.json())
+
+
+# ============================================================================
+# INDEX VECTORIEL (un par plante)
+# ============================================================================
+
+class _VectorIndex:
+    """
+    Vecteurs unitaires d'une même plante + réponses associées
+    (et empreinte du contexte scrapé qui a servi à chaque réponse).
+    Avec NumPy : une matrice float32 (n × dim), recherche = un produit matrice-vecteur.
+    Plein : la plus ancienne réponse est remplacée (tampon circulaire).
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.vectors: List = []
+        self.replies: List[str] = []
+        self.contexts: List[str] = []
+        self.expires: List[float] = []
+        self._matrix = None
+        self._next = 0
+
+    def search(self, vector, context_hash: str) -> Tuple[float, int]:
+        """
+        (meilleure similarité, position) parmi les entrées encore valides
+        et générées avec le même contexte scrapé.
+        """
+        if not self.vectors or len(self.vectors[0]) != len(vector):
+            return -1.0, -1
+
+        if np is not None:
+            if self._matrix is None:
+                self._matrix = np.vstack(self.vectors)
+            scores = self._matrix @ vector
+            now = time.time()
+            for i, expires_at in enumerate(self.expires):
+                if expires_at <= now or self.contexts[i] != context_hash:
+                    scores[i] = -1.0
+            best = int(np.argmax(scores))
+            return float(scores[best]), best
+
+        now = time.time()
+        best_score, best = -1.0, -1
+        for i, stored in enumerate(self.vectors):
+            if self.expires[i] <= now or self.contexts[i] != context_hash:
+                continue
+            score = sum(a * b for a, b in zip(stored, vector))
+            if score > best_score:
+                best_score, best = score, i
+        return best_score, best
+
+    def add(self, vector, reply: str, context_hash: str, expires_at: float) -> None:
+        if self.vectors and len(self.vectors[0]) != len(vector):
+            # Modèle d'embedding changé : les anciens vecteurs ne sont plus comparables
+            self.__init__(self.capacity)
+
+        if len(self.vectors) < self.capacity:
+            self.vectors.append(vector)
+            self.replies.append(reply)
+            self.contexts.append(context_hash)
+            self.expires.append(expires_at)
+        else:
+            self.vectors[self._next] = vector
+            self.replies[self._next] = reply
+            self.contexts[self._next] = context_hash
+            self.expires[self._next] = expires_at
+            self._next = (self._next + 1) % self.capacity
+
+        self._matrix = None
+
+
+# ============================================================================
+# CACHE SÉMANTIQUE
+# ============================================================================
+
+def _context_hash(context: Optional[str]) -> str:
+    """
+    Empreinte du contexte scrapé, gardée avec chaque réponse :
+    une réponse n'est réutilisée que si les sources n'ont pas changé.
+    """
+    return hashlib.sha1((context or "").encode("utf-8")).hexdigest()
+
+
+class SemanticCache:
+    """
+    Réponses aux premiers messages, retrouvées par sens et non par texte exact :
+    "feuilles jaunes monstera" et "ma monstera jaunit" tombent sur la même réponse.
+    """
+
+    def __init__(
+        self,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        ttl: int = SEMANTIC_CACHE_TTL,
+        max_per_index: int = SEMANTIC_CACHE_MAX_PER_INDEX,
+        max_indexes: int = SEMANTIC_CACHE_MAX_INDEXES
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_per_index = max_per_index
+        self.max_indexes = max_indexes
+
+        self._lock = threading.Lock()
+        self._indexes: "OrderedDict[str, _VectorIndex]" = OrderedDict()
+        self._counters = {"lookups": 0, "hits": 0, "misses": 0, "stores": 0, "errors": 0}
+        self._embed_seconds = 0.0
+        self._search_seconds = 0.0
+
+    def lookup(self, message: str, plant: Optional[str], context: Optional[str]):
+        """
+        Retourne (réponse ou None, vecteur du message).
+        Le vecteur est repassé à store() : pas de second embedding.
+        """
+        started = time.perf_counter()
+        try:
+            vector = embed(message)
+        except Exception as e:
+            return self._embed_failed(e)
+        return self._search(vector, started, plant, context)
+
+    async def lookup_async(self, message: str, plant: Optional[str], context: Optional[str]):
+        started = time.perf_counter()
+        try:
+            vector = await embed_async(message)
+        except Exception as e:
+            return self._embed_failed(e)
+        return self._search(vector, started, plant, context)
+
+    def store(self, vector, plant: Optional[str], context: Optional[str], reply: str) -> None:
+        if vector is None or not reply:
+            return
+
+        key = plant or ""
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = self._indexes[key] = _VectorIndex(self.max_per_index)
+                if len(self._indexes) > self.max_indexes:
+                    self._indexes.popitem(last=False)
+            self._indexes.move_to_end(key)
+
+            index.add(vector, reply, _context_hash(context), time.time() + self.ttl)
+            self._counters["stores"] += 1
+
+    def stats(self) -> Dict:
+        """Taux de hit + latence moyenne (embedding, recherche) en millisecondes."""
+        with self._lock:
+            lookups = self._counters["lookups"]
+            searched = lookups - self._counters["errors"]
+            return {
+                **self._counters,
+                "indexes": len(self._indexes),
+                "entries": sum(len(i.vectors) for i in self._indexes.values()),
+                "hit_rate": round(self._counters["hits"] / lookups, 3) if lookups else 0.0,
+                "avg_embed_ms": round(1000 * self._embed_seconds / searched, 2) if searched else 0.0,
+                "avg_search_ms": round(1000 * self._search_seconds / searched, 3) if searched else 0.0,
+                "backend": "numpy" if np is not None else "python",
+            }
+
+    def _search(self, vector, started: float, plant: Optional[str], context: Optional[str]):
+        embedded = time.perf_counter()
+        context_hash = _context_hash(context)
+
+        with self._lock:
+            index = self._indexes.get(plant or "")
+            score, position = index.search(vector, context_hash) if index is not None else (-1.0, -1)
+            hit = score >= self.threshold
+            reply = index.replies[position] if hit else None
+
+            self._counters["lookups"] += 1
+            self._counters["hits" if hit else "misses"] += 1
+            self._embed_seconds += embedded - started
+            self._search_seconds += time.perf_counter() - embedded
+
+        if hit:
+            logger.debug("🧲 Cache sémantique : similarité %.3f", score)
+        return reply, vector
+
+    def _embed_failed(self, error: Exception):
+        logger.warning("💥 Embedding impossible : %s", error)
+        with self._lock:
+            self._counters["lookups"] += 1
+            self._counters["misses"] += 1
+            self._counters["errors"] += 1
+        return None, None
+
+
+# Instance partagée (None si le cache est désactivé)
+SEMANTIC_CACHE: Optional[SemanticCache] = SemanticCache() if SEMANTIC_CACHE_ENABLED else None
+
+
+# 🧠 À quoi sert ce fichier ?
+
+# Le cache de réponses (response_cache.py) ne sert que les questions identiques au mot près
+# Ici, le 1er message est transformé en vecteur (embedding Ollama, en local)
+# puis comparé aux questions déjà posées pour la même plante
+# Au-dessus du seuil de similarité, la réponse déjà générée est réutilisée sans appeler le LLM
+# Activé avec SEMANTIC_CACHE=1 (et un modèle d'embedding : ollama pull nomic-embed-text)
@@ -0,0 +1,214 @@
+# backend/benchmarks/bench_parsers.py
+
+import os
+import glob
+import time
+import argparse
+import statistics
+import tracemalloc
+from typing import Callable, Dict, List, Tuple
+from bs4 import BeautifulSoup
+from tools import scraping
+from tools.extraction import HtmlDecoder, etree, parse_page
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Pages HTML synthétiques (on peut y déposer de vraies pages : curl -o ...)
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "pages")
+
+
+def _backends() -> Dict[str, Callable[[str], Tuple[str, str]]]:
+    """Backends disponibles sur cette machine (lxml seulement s'il est installé)."""
+    backends = {
+        "bs4": scraping._parse_page_bs4,
+        "stdlib": lambda html: parse_page(html, "stdlib"),
+    }
+    if etree is not None:
+        backends["lxml"] = lambda html: parse_page(html, "lxml")
+    return backends
+
+
+# ============================================================================
+# ÉTAPES MESURÉES
+# ============================================================================
+
+def _decode(raw: bytes) -> str:
+    """Même décodage que le scraping (en-tête absent : meta charset, sinon UTF-8)."""
+    decoder = HtmlDecoder()
+    return decoder.feed(raw) + decoder.flush()
+
+
+def bs4_stages(raw: bytes) -> List[Tuple[str, Callable[[Dict], None]]]:
+    """
+    Ancien chemin (PARSER_BACKEND=bs4), découpé comme _parse_page_bs4 + _finish_text.
+    Chaque étape lit / écrit dans un état partagé (la soupe est modifiée en place).
+    """
+    def decode(state):
+        state["html"] = _decode(raw)
+
+    def parse(state):
+        state["soup"] = BeautifulSoup(state["html"], "html.parser")
+
+    def clean(state):
+        scraping._clean_soup(state["soup"])
+
+    def structured(state):
+        state["structured"] = scraping._extract_structured_info(state["soup"], "")
+
+    def main_text(state):
+        state["main_text"] = scraping._extract_main_text(state["soup"])
+
+    def useful_lines(state):
+        text = state["structured"]
+        if not text or len(text) < 100:
+            text = state["main_text"]
+        state["text"] = scraping._keep_useful_lines(text, max_lines=40)
+
+    return [
+        ("decode", decode),
+        ("BeautifulSoup", parse),
+        ("_clean_soup", clean),
+        ("_extract_structured_info", structured),
+        ("_extract_main_text", main_text),
+        ("_keep_useful_lines", useful_lines),
+    ]
+
+
+def single_pass_stages(raw: bytes, backend: str) -> List[Tuple[str, Callable[[Dict], None]]]:
+    """Extracteur en une passe (tools/extraction.py) : décodage, parsing, mise en forme."""
+    def decode(state):
+        state["html"] = _decode(raw)
+
+    def parse(state):
+        state["parsed"] = parse_page(state["html"], backend)
+
+    def finish(state):
+        state["text"] = scraping._finish_text(*state["parsed"])
+
+    return [("decode", decode), (f"parse_page ({backend})", parse), ("_finish_text", finish)]
+
+
+def pipelines(raw: bytes) -> Dict[str, List[Tuple[str, Callable[[Dict], None]]]]:
+    """Un pipeline découpé en étapes par backend de _backends()."""
+    return {
+        name: bs4_stages(raw) if name == "bs4" else single_pass_stages(raw, name)
+        for name in _backends()
+    }
+
+
+# ============================================================================
+# MESURE
+# ============================================================================
+
+def time_stages(stages, repeat: int) -> Dict[str, List[float]]:
+    """Durées (ms) de chaque étape ; le pipeline entier est rejoué à chaque tour."""
+    durations: Dict[str, List[float]] = {name: [] for name, _ in stages}
+    for _ in range(repeat):
+        state: Dict = {}
+        for name, stage in stages:
+            started = time.perf_counter()
+            stage(state)
+            durations[name].append((time.perf_counter() - started) * 1000)
+    return durations
+
+
+def allocations(stages) -> Dict[str, Tuple[int, int]]:
+    """
+    Par étape (un seul passage, sous tracemalloc) :
+    (pic alloué pendant l'étape, mémoire encore retenue après), en octets.
+    """
+    result = {}
+    state: Dict = {}
+    tracemalloc.start()
+    try:
+        for name, stage in stages:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            stage(state)
+            after, peak = tracemalloc.get_traced_memory()
+            result[name] = (peak - before, after - before)
+    finally:
+        tracemalloc.stop()
+    return result
+
+
+def _final_text(parsed: Tuple[str, str]) -> str:
+    """Même post-traitement que _extract_content (sans la coupe à 2000 caractères)."""
+    structured, main_text = parsed
+    text = structured if structured and len(structured) >= 100 else main_text
+    return scraping._keep_useful_lines(text, max_lines=40)
+
+
+def _verdict(html: str) -> str:
+    """
+    Le texte final doit rester celui de l'ancien chemin. Seule différence admise :
+    l'ancien chemin répète une section dont le titre contient 2 mots-clés.
+    """
+    backends = _backends()
+    reference = _final_text(backends["bs4"](html)).split("\n")
+    outputs = [_final_text(fn(html)).split("\n") for name, fn in backends.items() if name != "bs4"]
+    if all(out == reference for out in outputs):
+        return "identique"
+    if all(set(reference) <= set(out) and len(set(out)) == len(out) for out in outputs):
+        return "identique (sans doublons)"
+    return "différente"
+
+
+def run(pages_dir: str = PAGES_DIR, repeat: int = 20) -> None:
+    paths = sorted(glob.glob(os.path.join(pages_dir, "*.html")))
+    if not paths:
+        print(f"Aucune page dans {pages_dir}")
+        return
+
+    totals: Dict[Tuple[str, str], float] = {}
+
+    for path in paths:
+        with open(path, "rb") as f:
+            raw = f.read()
+        print(f"\n{os.path.basename(path)} ({len(raw) / 1024:.1f} Ko) : sortie {_verdict(_decode(raw))}")
+        print(f"  {'chemin':8} {'étape':28} {'p50 ms':>9} {'pic Ko':>9} {'retenu Ko':>10}")
+
+        for pipeline, stages in pipelines(raw).items():
+            time_stages(stages, 1)  # premier passage hors mesure (imports, regex)
+            durations = time_stages(stages, repeat)
+            allocated = allocations(stages)
+
+            for name, _ in stages:
+                p50 = statistics.median(durations[name])
+                peak, kept = allocated[name]
+                totals[(pipeline, name)] = totals.get((pipeline, name), 0.0) + p50
+                print(f"  {pipeline:8} {name:28} {p50:9.3f} {peak / 1024:9.1f} {kept / 1024:10.1f}")
+
+            total = statistics.median(map(sum, zip(*durations.values())))
+            print(f"  {pipeline:8} {'total':28} {total:9.3f}")
+
+    print(f"\nTotal sur {len(paths)} page(s) (somme des p50)")
+    for pipeline in dict.fromkeys(p for p, _ in totals):
+        stage_totals = {name: ms for (p, name), ms in totals.items() if p == pipeline}
+        print(f"  {pipeline:8} {sum(stage_totals.values()):9.2f} ms  " + ", ".join(
+            f"{name} {ms:.2f}" for name, ms in stage_totals.items()
+        ))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_parsers")
+    parser.add_argument("--pages", default=PAGES_DIR, help="Dossier de pages .html")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    run(args.pages, args.repeat)
+
+
+# 🧠 À quoi sert ce fichier ?
+
+# Compare le coût d'extraction d'une page entre l'ancien chemin (BeautifulSoup,
+# plusieurs parcours de l'arbre) et l'extracteur en une passe (stdlib, lxml si installé)
+# Étape par étape : décodage, BeautifulSoup, _clean_soup, _extract_structured_info,
+# _extract_main_text, _keep_useful_lines (ancien chemin) / parse_page, _finish_text
+# Pour chaque étape : temps médian et allocations (tracemalloc : pic et mémoire retenue)
+# Vérifie aussi que le texte final envoyé au LLM est le même
+# Lancer depuis backend/, avant / après une modification du parseur ou de l'extraction :
+#   python -m benchmarks.bench_parsers --repeat 50
+# Pour les requêtes réelles, voir profiling.py (PROFILE_SLOW_MS)
@@ -0,0 +1,266 @@
+# backend/benchmarks/load_chat.py
+
+import os
+import sys
+import json
+import math
+import time
+import asyncio
+import argparse
+import tempfile
+import threading
+import subprocess
+from collections import defaultdict
+from typing import Dict, List, Optional
+import httpx
+from benchmarks.stand_ins import add_arguments, backend_env, from_arguments
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CORPUS_PATH = os.path.join(os.path.dirname(__file__), "conversations.json")
+
+BACKEND_PORT = 8765
+STARTUP_TIMEOUT = 30
+
+
+# ============================================================================
+# BACKEND LANCÉ SUR LES STAND-INS
+# ============================================================================
+
+def start_backend(port: int, env: Dict[str, str], workdir: str) -> subprocess.Popen:
+    """
+    uvicorn dans un process séparé (RSS mesurable), bases SQLite dans un dossier
+    temporaire : chaque run part de caches vides.
+    """
+    full_env = {
+        **os.environ,
+        "KB_PATH": os.path.join(workdir, "knowledge_base.sqlite3"),
+        "SCRAPE_CACHE_PATH": os.path.join(workdir, "scrape_cache.sqlite3"),
+        "RESOLUTION_PATH": os.path.join(workdir, "url_resolution.sqlite3"),
+        "SESSION_DB_PATH": os.path.join(workdir, "sessions.sqlite3"),
+        "LOG_LEVEL": "WARNING",
+        **env,
+    }
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=full_env
+    )
+
+
+def wait_ready(url: str, process: Optional[subprocess.Popen]) -> None:
+    deadline = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < deadline:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError(f"Le backend s'est arrêté (code {process.returncode})")
+        try:
+            if httpx.get(f"{url}/tools", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Backend injoignable sur {url}")
+
+
+def read_rss_mb(pid: int) -> Optional[float]:
+    """RSS courant d'un process (Linux : /proc/<pid>/status)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class RssSampler(threading.Thread):
+    """Relève le RSS du backend pendant le run (début, pic, fin)."""
+
+    def __init__(self, pid: int, interval: float = 0.2):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.samples: List[float] = []
+        self._finished = threading.Event()
+
+    def run(self):
+        while not self._finished.is_set():
+            rss = read_rss_mb(self.pid)
+            if rss is not None:
+                self.samples.append(rss)
+            self._finished.wait(self.interval)
+
+    def stop(self) -> Dict[str, float]:
+        self._finished.set()
+        self.join()
+        if not self.samples:
+            return {}
+        return {"start": self.samples[0], "peak": max(self.samples), "end": self.samples[-1]}
+
+
+# ============================================================================
+# CHARGE
+# ============================================================================
+
+def percentile(values: List[float], p: float) -> float:
+    """Percentile au rang le plus proche (pas d'interpolation)."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+async def replay(
+    url: str,
+    conversations: List[List[str]],
+    concurrency: int,
+    rounds: int,
+    prefix: str = "bench"
+) -> Dict:
+    """
+    Rejoue le corpus : concurrency conversations en même temps, les messages
+    d'une conversation l'un après l'autre (même session_id, l'historique compte).
+    prefix : début des session_id (le warm-up a le sien, ses sessions ne sont pas reprises).
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for r in range(rounds):
+        for i, conversation in enumerate(conversations):
+            queue.put_nowait((f"{prefix}-{r}-{i}", conversation))
+
+    latencies: List[float] = []
+    stages: Dict[str, List[float]] = defaultdict(list)
+    errors = 0
+
+    async def user(client: httpx.AsyncClient):
+        nonlocal errors
+        while not queue.empty():
+            session_id, conversation = queue.get_nowait()
+            for message in conversation:
+                started = time.perf_counter()
+                try:
+                    r = await client.post(
+                        f"{url}/chat",
+                        json={"message": message, "session_id": session_id, "timings": True}
+                    )
+                    r.raise_for_status()
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - started) * 1000)
+                for stage, ms in (r.json().get("timings") or {}).items():
+                    stages[stage].append(ms)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(timeout=600, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(user(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {"latencies": latencies, "stages": stages, "errors": errors, "elapsed": elapsed}
+
+
+def summarize(run: Dict, concurrency: int, rss: Dict[str, float]) -> Dict:
+    latencies = run["latencies"]
+    report = {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "errors": run["errors"],
+        "seconds": round(run["elapsed"], 2),
+        "throughput_rps": round(len(latencies) / run["elapsed"], 2) if run["elapsed"] else 0.0,
+    }
+    if latencies:
+        report.update({f"p{p}_ms": round(percentile(latencies, p), 1) for p in (50, 95, 99)})
+    report["stages_mean_ms"] = {
+        stage: round(sum(values) / len(values), 2) for stage, values in sorted(run["stages"].items())
+    }
+    report["rss_mb"] = {k: round(v, 1) for k, v in rss.items()}
+    return report
+
+
+def print_report(report: Dict) -> None:
+    print(
+        f"{report['requests']} requêtes, {report['errors']} erreur(s), "
+        f"concurrence {report['concurrency']}, {report['seconds']} s"
+    )
+    print(f"débit      : {report['throughput_rps']} req/s")
+    if "p50_ms" in report:
+        print(f"latence    : p50 {report['p50_ms']} ms  p95 {report['p95_ms']} ms  p99 {report['p99_ms']} ms")
+    if report["rss_mb"]:
+        rss = report["rss_mb"]
+        print(f"RSS backend: début {rss['start']} Mo  pic {rss['peak']} Mo  fin {rss['end']} Mo")
+    for stage, ms in report["stages_mean_ms"].items():
+        print(f"  {stage:40} {ms:10.2f} ms (moyenne)")
+
+
+# ============================================================================
+# LIGNE DE COMMANDE
+# ============================================================================
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load_chat")
+    parser.add_argument("--concurrency", type=int, default=8, help="Conversations simultanées")
+    parser.add_argument("--rounds", type=int, default=2, help="Nombre de passages sur le corpus")
+    parser.add_argument("--corpus", default=CORPUS_PATH)
+    parser.add_argument("--url", help="Backend déjà lancé (sinon démarré ici sur les stand-ins)")
+    parser.add_argument("--port", type=int, default=BACKEND_PORT)
+    parser.add_argument("--env", action="append", default=[], metavar="CLÉ=VALEUR",
+                        help="Variable passée au backend (répétable), ex. RESPONSE_CACHE_ENABLED=0")
+    parser.add_argument("--json", help="Écrit le rapport dans ce fichier")
+    add_arguments(parser)
+    args = parser.parse_args(argv)
+
+    with open(args.corpus, encoding="utf-8") as f:
+        conversations = json.load(f)
+
+    process = None
+    url = args.url
+    with tempfile.TemporaryDirectory(prefix="floria-bench-") as workdir:
+        if url is None:
+            sites, ollama = from_arguments(args)
+            env = {**backend_env(sites, ollama), **dict(e.split("=", 1) for e in args.env)}
+            process = start_backend(args.port, env, workdir)
+            url = f"http://127.0.0.1:{args.port}"
+
+        try:
+            wait_ready(url, process)
+
+            # Une conversation hors mesure : imports paresseux, connexions, warm-up
+            # Sessions à part : la mesure ne reprend pas son historique
+            asyncio.run(replay(url, conversations[:1], 1, 1, prefix="warmup"))
+
+            sampler = RssSampler(process.pid) if process is not None else None
+            if sampler:
+                sampler.start()
+            run = asyncio.run(replay(url, conversations, args.concurrency, args.rounds))
+            rss = sampler.stop() if sampler else {}
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=10)
+
+    report = summarize(run, args.concurrency, rss)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
+
+
+# 🧠 À quoi sert ce fichier ?
+
+# Mesure de débit et de latence de /chat, sans réseau ni vrai Ollama :
+# le backend est lancé (uvicorn) sur les stand-ins de stand_ins.py,
+# puis le corpus conversations.json est rejoué avec N conversations en parallèle
+# Rapport : p50 / p95 / p99, requêtes par seconde, RSS du backend,
+# et durée moyenne de chaque étape (champ "timings" de /chat)
+#   python -m benchmarks.load_chat --concurrency 8 --rounds 3
+#   python -m benchmarks.load_chat --env RESPONSE_CACHE_ENABLED=0 --json avant.json
@@ -0,0 +1,268 @@
+# backend/benchmarks/stand_ins.py
+
+import os
+import sys
+import glob
+import json
+import time
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Tuple
+
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Pages HTML synthétiques, les mêmes que bench_parsers : générées pour imiter
+# la structure des 3 sites (scripts, pubs, menus, sections), pas des copies des vraies pages
+PAGES_DIR = os.path.join(os.path.dirname(__file__), "pages")
+
+# Hôte des SOURCES → préfixe des fichiers de pages/ (aujardin_lavande.html, ...)
+HOST_FIXTURES = {
+    "www.conservation-nature.fr": "conservation",
+    "www.tela-botanica.org": "tela",
+    "www.aujardin.info": "aujardin",
+}
+
+SITES_PORT = 9100
+OLLAMA_PORT = 9200
+
+# Vocabulaire de la réponse factice (un "token" = un mot)
+_WORDS = (
+    "Arrose", "modérément", "quand", "le", "substrat", "est", "sec", "en", "surface,",
+    "place", "la", "plante", "en", "plein", "soleil", "et", "taille", "après", "floraison."
+)
+
+
+# ============================================================================
+# SITES DES SOURCES (pages synthétiques)
+# ============================================================================
+
+def load_fixtures(pages_dir: str = PAGES_DIR) -> Dict[str, List[Tuple[str, bytes]]]:
+    """Hôte → [(nom de page, HTML)] lu une fois au démarrage."""
+    fixtures: Dict[str, List[Tuple[str, bytes]]] = {}
+    for host, prefix in HOST_FIXTURES.items():
+        for path in sorted(glob.glob(os.path.join(pages_dir, f"{prefix}_*.html"))):
+            name = os.path.basename(path)[len(prefix) + 1:-len(".html")]
+            with open(path, "rb") as f:
+                fixtures.setdefault(host, []).append((name, f.read()))
+    return fixtures
+
+
+def _site_handler(fixtures: Dict[str, List[Tuple[str, bytes]]], latency: float):
+    class SiteHandler(BaseHTTPRequestHandler):
+        """
+        GET /<hôte>/<chemin> (format de SCRAPE_PROXY_BASE) → page synthétique de cet hôte.
+        La page dont le nom apparaît dans le chemin est choisie, sinon la première.
+        """
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            host, _, path = self.path.lstrip("/").partition("/")
+            pages = fixtures.get(host)
+            time.sleep(latency)
+
+            if not pages:
+                self._send(404, b"not found", "text/plain")
+                return
+
+            body = next((html for name, html in pages if name in path.lower()), pages[0][1])
+            self._send(200, body, "text/html; charset=utf-8")
+
+        def _send(self, status: int, body: bytes, content_type: str):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return SiteHandler
+
+
+# ============================================================================
+# OLLAMA FACTICE (/api/chat, /api/embed)
+# ============================================================================
+
+def _fake_embedding(text: str, size: int = 64) -> List[float]:
+    """Vecteur déterministe : même texte → même vecteur (le cache sémantique reste testable)."""
+    digest = hashlib.sha256(text.encode("utf-8")).digest()
+    return [(digest[i % len(digest)] - 128) / 128 for i in range(size)]
+
+
+def _ollama_handler(prefill: float, tokens_per_s: float, tokens: int):
+    class OllamaHandler(BaseHTTPRequestHandler):
+        """
+        Même contrat que Ollama : réponse complète ou NDJSON (stream),
+        avec prompt_eval_duration / eval_duration en nanosecondes.
+        prefill = attente avant le 1er token, puis tokens_per_s tokens par seconde.
+        """
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            body = json.loads(self.rfile.read(length) or b"{}")
+
+            if self.path.startswith("/api/embed"):
+                texts = body.get("input") or ""
+                texts = texts if isinstance(texts, list) else [texts]
+                self._send_json({"embeddings": [_fake_embedding(t) for t in texts]})
+                return
+
+            if not self.path.startswith("/api/chat"):
+                self._send_json({"error": "not found"}, status=404)
+                return
+
+            options = body.get("options") or {}
+            count = min(tokens, options.get("num_predict") or tokens)
+            words = [_WORDS[i % len(_WORDS)] for i in range(count)]
+            time.sleep(prefill)
+
+            if body.get("stream", True):
+                self._stream(words)
+            else:
+                time.sleep(count / tokens_per_s)
+                self._send_json(self._final({"role": "assistant", "content": " ".join(words)}, count))
+
+        def _final(self, message: Dict, count: int) -> Dict:
+            return {
+                "model": "stand-in",
+                "message": message,
+                "done": True,
+                "prompt_eval_duration": int(prefill * 1e9),
+                "eval_count": count,
+                "eval_duration": int(count / tokens_per_s * 1e9),
+            }
+
+        def _stream(self, words: List[str]):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/x-ndjson")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+
+            for i, word in enumerate(words):
+                time.sleep(1 / tokens_per_s)
+                token = word if i == 0 else f" {word}"
+                self._chunk({"message": {"role": "assistant", "content": token}, "done": False})
+
+            self._chunk(self._final({"role": "assistant", "content": ""}, len(words)))
+            self.wfile.write(b"0\r\n\r\n")
+
+        def _chunk(self, data: Dict):
+            line = json.dumps(data).encode() + b"\n"
+            self.wfile.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            self.wfile.flush()
+
+        def _send_json(self, data: Dict, status: int = 200):
+            payload = json.dumps(data).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *args):
+            pass
+
+    return OllamaHandler
+
+
+# ============================================================================
+# DÉMARRAGE
+# ============================================================================
+
+class _QuietServer(ThreadingHTTPServer):
+    """
+    Client parti avant la fin de la réponse (le scraping coupe la lecture dès que
+    la page suffit, un client /chat peut abandonner) : fin normale, pas de traceback.
+    """
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if isinstance(sys.exc_info()[1], (BrokenPipeError, ConnectionResetError)):
+            return
+        super().handle_error(request, client_address)
+
+
+def _serve(handler, port: int) -> ThreadingHTTPServer:
+    server = _QuietServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def start_stand_ins(
+    sites_port: int = SITES_PORT,
+    ollama_port: int = OLLAMA_PORT,
+    site_latency_ms: float = 50,
+    prefill_ms: float = 300,
+    tokens_per_s: float = 40,
+    tokens: int = 60,
+    pages_dir: str = PAGES_DIR
+) -> Tuple[ThreadingHTTPServer, ThreadingHTTPServer]:
+    """
+    Démarre les deux serveurs dans des threads (port 0 = port libre choisi par l'OS).
+    Retourne (sites, ollama) ; server.server_address[1] donne le port réel.
+    """
+    sites = _serve(_site_handler(load_fixtures(pages_dir), site_latency_ms / 1000), sites_port)
+    ollama = _serve(_ollama_handler(prefill_ms / 1000, tokens_per_s, tokens), ollama_port)
+    return sites, ollama
+
+
+def backend_env(sites: ThreadingHTTPServer, ollama: ThreadingHTTPServer) -> Dict[str, str]:
+    """Variables d'environnement qui branchent le backend sur les stand-ins."""
+    ollama_base = f"http://127.0.0.1:{ollama.server_address[1]}"
+    return {
+        "SCRAPE_PROXY_BASE": f"http://127.0.0.1:{sites.server_address[1]}",
+        "OLLAMA_URL": f"{ollama_base}/api/chat",
+        "OLLAMA_EMBED_URL": f"{ollama_base}/api/embed",
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Options des stand-ins (partagées avec load_chat)."""
+    parser.add_argument("--site-latency-ms", type=float, default=50, help="Latence de chaque page")
+    parser.add_argument("--prefill-ms", type=float, default=300, help="Attente avant le 1er token")
+    parser.add_argument("--tokens-per-s", type=float, default=40, help="Débit de génération")
+    parser.add_argument("--tokens", type=int, default=60, help="Longueur de la réponse (tokens)")
+
+
+def from_arguments(args: argparse.Namespace, sites_port: int = 0, ollama_port: int = 0):
+    return start_stand_ins(
+        sites_port, ollama_port,
+        site_latency_ms=args.site_latency_ms,
+        prefill_ms=args.prefill_ms,
+        tokens_per_s=args.tokens_per_s,
+        tokens=args.tokens
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.stand_ins")
+    parser.add_argument("--sites-port", type=int, default=SITES_PORT)
+    parser.add_argument("--ollama-port", type=int, default=OLLAMA_PORT)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    sites, ollama = from_arguments(args, args.sites_port, args.ollama_port)
+    for name, value in backend_env(sites, ollama).items():
+        print(f"export {name}={value}")
+    print("# Ctrl+C pour arrêter")
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+
+
+# 🧠 À quoi sert ce fichier ?
+
+# Remplace tout ce qui est externe au backend, pour mesurer sans réseau :
+# - les 3 sites des SOURCES → pages HTML synthétiques de pages/ (latence réglable)
+# - Ollama → réponse factice avec pré-remplissage et débit de tokens réglables
+# Le backend y est branché par SCRAPE_PROXY_BASE / OLLAMA_URL (voir backend_env)
+#   python -m benchmarks.stand_ins   → affiche les export à copier
@@ -1,12 +1,67 @@
 # backend/main.py
 
+import json
+import asyncio
+from typing import List
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from mcp.server import execute_tool, get_tools
-from mcp.schemas import ToolRequest, ToolResponse
-from agent.orchestrator import handle_message
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from mcp.server import get_tools
+from mcp import dispatch
+from mcp.dispatch import execute_batch_request, execute_local
+from mcp.schemas import BatchToolRequest, ToolRequest, ToolResponse
+from agent import orchestrator
+from agent.orchestrator import handle_message_async, stream_message
+from agent import semantic_cache
+from agent.response_cache import RESPONSE_CACHE
+from agent.semantic_cache import SEMANTIC_CACHE
+from tools import scraping
+from tools.cache import SCRAPE_CACHE
+from tools.knowledge_base import KNOWLEDGE_BASE
+from tools.resolution import URL_RESOLVER
+import telemetry
+import profiling
 
-app = FastAPI(title="Backend MCP Connector")
+# print remplacés par logging : LOG_LEVEL=DEBUG pour le détail de chaque appel
+telemetry.configure_logging()
+
+# Jauges exposées par /metrics (caches et sessions désactivés = absents)
+telemetry.register_stats("sessions", orchestrator.CHAT_MEMORY.stats)
+for name, store in (
+    ("response_cache", RESPONSE_CACHE),
+    ("semantic_cache", SEMANTIC_CACHE),
+    ("scrape_cache", SCRAPE_CACHE),
+    ("knowledge_base", KNOWLEDGE_BASE),
+    ("url_resolution", URL_RESOLVER),
+):
+    if store is not None:
+        telemetry.register_stats(name, store.stats)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Chargement du modèle en arrière-plan : le serveur répond déjà pendant ce temps
+    warmup = None
+    if orchestrator.OLLAMA_WARMUP:
+        warmup = asyncio.create_task(orchestrator.warm_up_ollama_async())
+
+    # Workers d'extraction HTML démarrés avant le premier message (EXTRACTION_WORKERS > 0)
+    scraping.start_extraction_pool()
+
+    yield
+
+    scraping.shutdown_extraction_pool()
+    if warmup is not None:
+        warmup.cancel()
+    # Fermeture des clients HTTP partagés (keep-alive)
+    await orchestrator.aclose_client()
+    await dispatch.aclose_client()
+    await scraping.aclose_client()
+    await semantic_cache.aclose_client()
+
+
+app = FastAPI(title="Backend MCP Connector", lifespan=lifespan)
 
 # Autoriser le frontend à communiquer (CORS)
 app.add_middleware(
@@ -17,54 +72,84 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Profil des requêtes plus lentes que PROFILE_SLOW_MS (désactivé par défaut, voir profiling.py)
+if profiling.PROFILE_SLOW_MS > 0:
+    app.add_middleware(profiling.SlowRequestMiddleware)
+
 # Route pour vérifier la disponibilité des tools
 @app.get("/tools")
 def list_tools():
     return get_tools()
 
+# Métriques Prometheus : durée de chaque étape + stats des caches
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(telemetry.render_metrics(), media_type="text/plain; version=0.0.4")
+
 # Route pour exécuter un tool via le MCP
 @app.post("/execute", response_model=ToolResponse)
 def run_tool(request: ToolRequest):
-    try:
-        result = execute_tool(request)
-        return ToolResponse(
-            status="success",
-            tool=request.tool,
-            result=result
-        )
-    except HTTPException as e:
-        # Erreurs renvoyées par le MCP
-        return ToolResponse(
-            status="error",
-            tool=request.tool,
-            message=e.detail
-        )
-    except Exception as e:
-        # Autres erreurs
-        return ToolResponse(
-            status="error",
-            tool=request.tool,
-            message=str(e)
-        )
+    # Exécution directe du tool : une seule enveloppe (pas de result.result)
+    return ToolResponse(**execute_local(request.tool, request.arguments))
+
+# Plusieurs tools en un seul appel (ex. comparaison de plantes, pré-chauffage des caches)
+@app.post("/execute/batch", response_model=List[ToolResponse])
+async def run_tool_batch(batch: BatchToolRequest):
+    return await execute_batch_request(batch)
+
+def _read_chat_payload(payload: dict):
+    """
+    Valide le JSON envoyé par le front : {"message": "...", "session_id": "..."}
+    """
+    message = payload.get("message")
+    session_id = payload.get("session_id")
+
+    if not message or not session_id:
+        raise HTTPException(status_code=400, detail="message and session_id required")
+
+    return message, session_id
+
 
 @app.post("/chat")
-def chat_endpoint(payload: dict):
+async def chat_endpoint(payload: dict):
     """
     Endpoint pour le front.
     Attends JSON :
     {
         "message": "...",
-        "session_id": "..."
+        "session_id": "...",
+        "timings": true     (optionnel : durée de chaque étape dans la réponse)
     }
     """
-    message = payload.get("message")
-    session_id = payload.get("session_id")
+    message, session_id = _read_chat_payload(payload)
 
-    if not message or not session_id:
-        raise HTTPException(status_code=400, detail="message and session_id required")
+    # Appel de l'orchestrator (async : ne consomme pas de thread pendant Ollama)
+    return await handle_message_async(message, session_id, timings=bool(payload.get("timings")))
+
+
+@app.post("/chat/stream")
+async def chat_stream_endpoint(payload: dict):
+    """
+    Même contrat d'entrée que /chat, réponse en Server-Sent Events :
+
+    event: sources   → {"tools_used": [...], "sources": [...]}
+    event: token     → "morceau de réponse"
+    event: done      → {"reply": "..."} (+ "timings" si demandé)
+    event: error     → {"message": "...", "reply": "début de réponse"} (Ollama coupé en cours de route)
+    """
+    message, session_id = _read_chat_payload(payload)
+    timings = bool(payload.get("timings"))
+
+    async def event_stream():
+        async for event in stream_message(message, session_id, timings=timings):
+            data = json.dumps(event["data"], ensure_ascii=False)
+            yield f"event: {event['event']}\ndata: {data}\n\n"
 
-    # Appel de l'orchestrator
-    return handle_message(message, session_id)
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # 🧠 À quoi sert ce fichier ?
 # Sert de pont entre le frontend et le MCP
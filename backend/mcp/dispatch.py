@@ -0,0 +1,263 @@
+# mcp/dispatch.py
+
+import os
+import asyncio
+import httpx
+import requests
+from fastapi import HTTPException
+from typing import Dict, Any, List, Optional
+from mcp.registry import TOOLS, ASYNC_TOOLS, list_tools
+from mcp.schemas import BatchToolRequest
+
+
+# ============================================================================
+# CONFIGURATION (ENV VARS)
+# ============================================================================
+
+# MCP distant : vide = les tools sont exécutés dans le process (pas d'HTTP)
+MCP_URL = os.getenv("MCP_URL", "")
+MCP_EXECUTE_ENDPOINT = os.getenv("MCP_EXECUTE_ENDPOINT", "/execute")
+MCP_TIMEOUT = int(os.getenv("MCP_TIMEOUT", "600"))
+
+# /execute/batch : appels simultanés max, délai max par appel (secondes), taille max d'un lot
+MCP_BATCH_CONCURRENCY = int(os.getenv("MCP_BATCH_CONCURRENCY", "4"))
+MCP_BATCH_TIMEOUT = float(os.getenv("MCP_BATCH_TIMEOUT", "60"))
+MCP_BATCH_MAX_ITEMS = int(os.getenv("MCP_BATCH_MAX_ITEMS", "32"))
+
+
+# ============================================================================
+# ENVELOPPE DE RÉSULTAT (identique à mcp.schemas.ToolResponse)
+# ============================================================================
+
+def _envelope(status: str, tool: str, result: Any = None, message: str = "") -> Dict[str, Any]:
+    """
+    Enveloppe unique renvoyée par le dispatch, que le tool soit local ou distant.
+    """
+    return {
+        "status": status,
+        "tool": tool,
+        "result": result,
+        "message": message
+    }
+
+
+def _unwrap_remote(tool: str, data: Any) -> Dict[str, Any]:
+    """
+    Ramène une réponse HTTP du MCP distant à une seule enveloppe.
+    Les anciens serveurs renvoyaient result.result (double imbrication).
+    """
+    if not isinstance(data, dict) or "status" not in data:
+        return _envelope("error", tool, message=f"Réponse MCP invalide : {data!r}")
+
+    result = data.get("result")
+    if isinstance(result, dict) and "status" in result and "result" in result:
+        result = result.get("result")
+
+    return _envelope(
+        data.get("status", "error"),
+        data.get("tool") or tool,
+        result=result,
+        message=data.get("message") or ""
+    )
+
+
+def _remote_error(tool: str, status_code: int, data: Any, text: str) -> Dict[str, Any]:
+    """
+    Réponse HTTP en erreur du MCP distant → enveloppe "error", comme un échec local.
+    Le serveur MCP renvoie {"detail": "..."} (HTTPException) : on garde ce message.
+    """
+    detail = data.get("detail") if isinstance(data, dict) else None
+    return _envelope("error", tool, message=f"MCP error {status_code}: {detail or text}")
+
+
+# ============================================================================
+# EXÉCUTION LOCALE / DISTANTE
+# ============================================================================
+
+def execute_local(tool: str, arguments: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Exécute un tool du registre directement dans le process.
+    """
+    if tool not in TOOLS:
+        return _envelope(
+            "error", tool,
+            message=f"Tool '{tool}' non disponible. Outils disponibles : {list_tools()}"
+        )
+
+    try:
+        result = TOOLS[tool](**(arguments or {}))
+        return _envelope("success", tool, result=result)
+    except Exception as e:
+        return _envelope("error", tool, message=f"Erreur lors de l'exécution du tool : {str(e)}")
+
+
+def execute_remote(tool: str, arguments: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Appel d'un MCP distant via HTTP POST /execute.
+    Erreur HTTP ou réseau → enveloppe "error" (jamais d'exception).
+    """
+    url = f"{MCP_URL}{MCP_EXECUTE_ENDPOINT}"
+    payload = {"tool": tool, "arguments": arguments or {}}
+
+    try:
+        resp = requests.post(url, json=payload, timeout=MCP_TIMEOUT)
+    except requests.RequestException as e:
+        return _envelope("error", tool, message=f"MCP injoignable : {str(e)}")
+
+    try:
+        data = resp.json()
+    except ValueError:
+        data = None
+
+    if resp.status_code != 200:
+        return _remote_error(tool, resp.status_code, data, resp.text)
+    return _unwrap_remote(tool, data)
+
+
+def dispatch_tool(tool: str, arguments: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Point d'entrée unique : HTTP seulement si un MCP distant est configuré.
+    """
+    if MCP_URL:
+        return execute_remote(tool, arguments)
+    return execute_local(tool, arguments)
+
+
+# ============================================================================
+# VERSION ASYNCHRONE (utilisée par /chat)
+# ============================================================================
+
+_ASYNC_CLIENT: Optional[httpx.AsyncClient] = None
+_ASYNC_CLIENT_LOOP: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    """
+    Client httpx partagé pour le MCP distant, recréé si la boucle asyncio change.
+    """
+    global _ASYNC_CLIENT, _ASYNC_CLIENT_LOOP
+
+    loop = asyncio.get_running_loop()
+    if _ASYNC_CLIENT is None or _ASYNC_CLIENT.is_closed or _ASYNC_CLIENT_LOOP is not loop:
+        _ASYNC_CLIENT = httpx.AsyncClient(timeout=MCP_TIMEOUT)
+        _ASYNC_CLIENT_LOOP = loop
+    return _ASYNC_CLIENT
+
+
+async def aclose_client() -> None:
+    """
+    Ferme le client MCP partagé (arrêt de l'application).
+    """
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is not None:
+        await _ASYNC_CLIENT.aclose()
+        _ASYNC_CLIENT = None
+
+
+async def execute_local_async(tool: str, arguments: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Exécute un tool local sans bloquer la boucle :
+    variante async du registre si elle existe, sinon thread dédié.
+    """
+    if tool not in ASYNC_TOOLS:
+        return await asyncio.to_thread(execute_local, tool, arguments)
+
+    try:
+        result = await ASYNC_TOOLS[tool](**(arguments or {}))
+        return _envelope("success", tool, result=result)
+    except Exception as e:
+        return _envelope("error", tool, message=f"Erreur lors de l'exécution du tool : {str(e)}")
+
+
+async def execute_remote_async(tool: str, arguments: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Appel asynchrone d'un MCP distant via HTTP POST /execute (même enveloppe d'erreur).
+    """
+    url = f"{MCP_URL}{MCP_EXECUTE_ENDPOINT}"
+    payload = {"tool": tool, "arguments": arguments or {}}
+
+    try:
+        resp = await _get_async_client().post(url, json=payload)
+    except httpx.HTTPError as e:
+        return _envelope("error", tool, message=f"MCP injoignable : {str(e)}")
+
+    try:
+        data = resp.json()
+    except ValueError:
+        data = None
+
+    if resp.status_code != 200:
+        return _remote_error(tool, resp.status_code, data, resp.text)
+    return _unwrap_remote(tool, data)
+
+
+async def dispatch_tool_async(tool: str, arguments: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Équivalent asynchrone de dispatch_tool (même enveloppe).
+    """
+    if MCP_URL:
+        return await execute_remote_async(tool, arguments)
+    return await execute_local_async(tool, arguments)
+
+
+# ============================================================================
+# LOT D'APPELS (/execute/batch)
+# ============================================================================
+
+async def execute_batch_async(
+    calls: List[Dict[str, Any]],
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None
+) -> List[Dict[str, Any]]:
+    """
+    Exécute plusieurs tools locaux en parallèle, au plus max_concurrency à la fois,
+    chacun limité à timeout secondes. Une enveloppe par appel, dans l'ordre reçu :
+    un appel en erreur ou hors délai n'empêche pas les autres de réussir.
+
+    calls : [{"tool": "...", "arguments": {...}}, ...]
+    Un tool sans variante async tourne dans un thread : hors délai, sa réponse
+    est abandonnée mais le thread termine son travail.
+    """
+    limit = max(1, min(max_concurrency or MCP_BATCH_CONCURRENCY, MCP_BATCH_CONCURRENCY))
+    deadline = min(timeout or MCP_BATCH_TIMEOUT, MCP_BATCH_TIMEOUT)
+    slots = asyncio.Semaphore(limit)
+
+    async def run_one(call: Dict[str, Any]) -> Dict[str, Any]:
+        tool = call.get("tool", "")
+        async with slots:
+            try:
+                return await asyncio.wait_for(execute_local_async(tool, call.get("arguments")), deadline)
+            except asyncio.TimeoutError:
+                return _envelope("error", tool, message=f"Délai dépassé ({deadline:g} s)")
+            except Exception as e:
+                return _envelope("error", tool, message=f"Erreur lors de l'exécution du tool : {str(e)}")
+
+    return await asyncio.gather(*(run_one(call) for call in calls))
+
+
+async def execute_batch_request(batch: BatchToolRequest) -> List[Dict[str, Any]]:
+    """
+    Corps commun des routes /execute/batch (main.py et mcp/server.py) :
+    taille du lot vérifiée (400 au-delà de MCP_BATCH_MAX_ITEMS), puis execute_batch_async.
+    Un tool inconnu ou en échec donne une réponse "error" à sa place, sans bloquer le lot.
+    """
+    if len(batch.requests) > MCP_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Lot trop grand : {MCP_BATCH_MAX_ITEMS} appels maximum")
+
+    return await execute_batch_async(
+        [{"tool": call.tool, "arguments": call.arguments} for call in batch.requests],
+        batch.max_concurrency,
+        batch.timeout
+    )
+
+
+# 🧠 À quoi sert ce fichier ?
+
+# C’est l’aiguillage entre l’orchestrator et les tools
+# Par défaut, le tool est appelé directement (même process, pas de JSON, pas d'HTTP)
+# Si MCP_URL est défini, l’appel part vers le MCP distant
+# execute_batch_async exécute un lot d'appels en parallèle (routes /execute/batch,
+# via execute_batch_request, partagé par main.py et mcp/server.py)
+# Dans les deux cas, le résultat a la même forme que ToolResponse :
+
+# {"status": "success", "tool": "...", "result": {...}, "message": ""}
@@ -0,0 +1,223 @@
+# mcp/jobs.py
+
+import os
+import time
+import uuid
+import asyncio
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+from mcp.dispatch import MCP_TIMEOUT, _envelope, execute_local_async
+
+
+# ============================================================================
+# CONFIGURATION (ENV VARS)
+# ============================================================================
+
+# Tools exécutés en même temps en mode async (POST /execute?async=true)
+MCP_JOB_WORKERS = int(os.getenv("MCP_JOB_WORKERS", "4"))
+
+# Jobs en attente max : au-delà, 429 (le client réessaie plus tard)
+MCP_JOB_QUEUE_MAX = int(os.getenv("MCP_JOB_QUEUE_MAX", "64"))
+
+# Résultats gardés : durée après la fin du job (secondes) / nombre max de jobs suivis
+MCP_JOB_TTL = int(os.getenv("MCP_JOB_TTL", "600"))
+MCP_JOB_MAX = int(os.getenv("MCP_JOB_MAX", "1000"))
+
+# Délai max d'un job (secondes) / attente max d'un long-poll GET /jobs/{id}?wait=...
+MCP_JOB_TIMEOUT = float(os.getenv("MCP_JOB_TIMEOUT", str(MCP_TIMEOUT)))
+MCP_JOB_WAIT_MAX = float(os.getenv("MCP_JOB_WAIT_MAX", "30"))
+
+
+class JobQueueFull(Exception):
+    """File pleine ou trop de jobs suivis : le client doit réessayer plus tard."""
+
+
+# ============================================================================
+# JOB
+# ============================================================================
+
+class Job:
+    """Un appel de tool exécuté en arrière-plan : queued → running → success / error."""
+
+    def __init__(self, tool: str, arguments: Optional[Dict[str, Any]]):
+        self.id = uuid.uuid4().hex
+        self.tool = tool
+        self.arguments = arguments or {}
+        self.status = "queued"
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.response: Optional[Dict[str, Any]] = None
+        self.done = asyncio.Event()
+
+    def finish(self, response: Dict[str, Any]) -> None:
+        self.response = response
+        self.status = response["status"]
+        self.finished_at = time.time()
+        self.done.set()
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Enveloppe du tool (status / tool / result / message) à plat,
+        avec l'état du job à côté : result est la sortie du tool, pas une 2e enveloppe.
+        """
+        response = self.response or {"result": None, "message": ""}
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "tool": self.tool,
+            "result": response["result"],
+            "message": response["message"],
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+
+# ============================================================================
+# FILE + WORKERS + RÉSULTATS (une seule boucle asyncio, pas de verrou)
+# ============================================================================
+
+class JobManager:
+    """
+    File bornée + workers asyncio + résultats gardés MCP_JOB_TTL secondes.
+    Les workers démarrent au premier job, dans la boucle du serveur
+    (recréés si la boucle change, comme les clients httpx partagés ;
+    les jobs restés dans l'ancienne file passent alors en erreur).
+    """
+
+    def __init__(
+        self,
+        workers: int = MCP_JOB_WORKERS,
+        queue_max: int = MCP_JOB_QUEUE_MAX,
+        ttl: int = MCP_JOB_TTL,
+        max_jobs: int = MCP_JOB_MAX,
+        timeout: float = MCP_JOB_TIMEOUT
+    ):
+        self.workers = workers
+        self.queue_max = queue_max
+        self.ttl = ttl
+        self.max_jobs = max_jobs
+        self.timeout = timeout
+
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._counters = {"submitted": 0, "rejected": 0}
+
+    def submit(self, tool: str, arguments: Optional[Dict[str, Any]] = None) -> Job:
+        """Met le job en file et rend la main tout de suite (JobQueueFull si saturé)."""
+        self._ensure_workers()
+        self._prune()
+
+        if self._queue.full() or len(self._jobs) >= self.max_jobs:
+            self._counters["rejected"] += 1
+            if self._queue.full():
+                raise JobQueueFull(f"File pleine ({self.queue_max} jobs en attente)")
+            raise JobQueueFull(f"Trop de jobs suivis ({self.max_jobs})")
+
+        self._counters["submitted"] += 1
+        job = Job(tool, arguments)
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Job encore suivi, None s'il est inconnu ou expiré."""
+        self._prune()
+        return self._jobs.get(job_id)
+
+    async def wait(self, job_id: str, timeout: float) -> Optional[Job]:
+        """Long-poll : attend la fin du job au plus timeout secondes, puis rend son état."""
+        job = self.get(job_id)
+        if job is not None and timeout > 0 and not job.done.is_set():
+            try:
+                await asyncio.wait_for(job.done.wait(), min(timeout, MCP_JOB_WAIT_MAX))
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    def stats(self) -> Dict[str, int]:
+        """Profondeur de la file (signal de saturation), jobs suivis, refus. À lire dans la boucle."""
+        statuses = [job.status for job in self._jobs.values()]
+        return {
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "queue_max": self.queue_max,
+            "workers": self.workers,
+            "queued": statuses.count("queued"),
+            "running": statuses.count("running"),
+            "finished": sum(1 for s in statuses if s not in ("queued", "running")),
+            **self._counters
+        }
+
+    async def shutdown(self) -> None:
+        """Arrêt du serveur : workers annulés, jobs non terminés marqués en erreur."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+        self._fail_unfinished("Serveur arrêté avant la fin du job")
+
+    # ------------------------------------------------------------------------
+    # Interne
+    # ------------------------------------------------------------------------
+
+    def _ensure_workers(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            if self._loop is not None:
+                # Ancienne boucle arrêtée : ses workers et sa file ne tourneront plus
+                self._fail_unfinished("Boucle du serveur redémarrée avant la fin du job", rebind=True)
+            self._queue = asyncio.Queue(maxsize=self.queue_max)
+            self._tasks = [loop.create_task(self._work()) for _ in range(self.workers)]
+            self._loop = loop
+
+    async def _work(self) -> None:
+        while True:
+            job = await self._queue.get()
+            job.status = "running"
+            try:
+                response = await asyncio.wait_for(execute_local_async(job.tool, job.arguments), self.timeout)
+            except asyncio.TimeoutError:
+                response = _envelope("error", job.tool, message=f"Délai dépassé ({self.timeout:g} s)")
+            except Exception as e:
+                response = _envelope("error", job.tool, message=f"Erreur lors de l'exécution du tool : {str(e)}")
+            job.finish(response)
+
+    def _fail_unfinished(self, message: str, rebind: bool = False) -> None:
+        """
+        Jobs en file ou en cours → "error" : wait() ne reste pas bloqué.
+        rebind : l'Event est recréé, ses anciens waiters appartiennent à une boucle fermée.
+        """
+        for job in self._jobs.values():
+            if not job.done.is_set():
+                if rebind:
+                    job.done = asyncio.Event()
+                job.finish(_envelope("error", job.tool, message=message))
+
+    def _prune(self) -> None:
+        """Oublie les jobs terminés depuis plus de ttl secondes, puis les plus anciens si plein."""
+        now = time.time()
+        for job_id in [i for i, job in self._jobs.items() if job.finished_at and job.finished_at + self.ttl < now]:
+            del self._jobs[job_id]
+
+        overflow = len(self._jobs) - self.max_jobs + 1
+        if overflow > 0:
+            finished = [i for i, job in self._jobs.items() if job.finished_at]
+            for job_id in finished[:overflow]:
+                del self._jobs[job_id]
+
+
+# Instance partagée du serveur MCP
+JOBS = JobManager()
+
+
+# 🧠 À quoi sert ce fichier ?
+
+# Un fetch_plant_sources lent (sources qui traînent) peut prendre une minute :
+# en synchrone, la connexion HTTP et un thread restent bloqués tout ce temps
+# Mode async : POST /execute?async=true rend un job_id tout de suite,
+# le tool tourne dans un des MCP_JOB_WORKERS workers,
+# et le résultat se lit avec GET /jobs/{id} (?wait=N pour attendre la fin)
+# File bornée : au-delà de MCP_JOB_QUEUE_MAX jobs en attente, 429 au lieu d'empiler
+# Résultats gardés MCP_JOB_TTL secondes après la fin, MCP_JOB_MAX jobs au plus
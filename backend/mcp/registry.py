@@ -1,7 +1,7 @@
 # mcp/registry.py
 
 # Import des tools existants
-from tools.scraping import fetch_plant_sources
+from tools.scraping import fetch_plant_sources, fetch_plant_sources_async
 
 # Registry : nom du tool → fonction Python
 TOOLS = {
@@ -9,6 +9,12 @@ TOOLS = {
     # Ajouter ici d'autres tools si besoin
 }
 
+# Variantes asynchrones (optionnelles) : utilisées par le dispatch async
+# Un tool absent d'ici est exécuté dans un thread
+ASYNC_TOOLS = {
+    "fetch_plant_sources": fetch_plant_sources_async,
+}
+
 def list_tools():
     """
     Retourne la liste des tools disponibles
@@ -1,7 +1,7 @@
 # mcp/schemas.py
 
-from pydantic import BaseModel
-from typing import Dict, Any
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional
 
 class ToolRequest(BaseModel):
     """
@@ -19,6 +19,15 @@ class ToolResponse(BaseModel):
     result: Any = None  # résultat renvoyé par le tool
     message: str = ""  # message optionnel (erreur ou info)
 
+class BatchToolRequest(BaseModel):
+    """
+    Plusieurs appels de tools en une seule requête HTTP (/execute/batch).
+    Les réponses reviennent dans le même ordre, une ToolResponse par appel.
+    """
+    requests: List[ToolRequest]  # appels à exécuter
+    max_concurrency: Optional[int] = Field(None, ge=1)  # appels simultanés (plafonné par MCP_BATCH_CONCURRENCY)
+    timeout: Optional[float] = Field(None, gt=0)  # délai max par appel en secondes (plafonné par MCP_BATCH_TIMEOUT)
+
 
 # À quoi sert ce fichier ?
 
@@ -33,6 +42,19 @@ class ToolResponse(BaseModel):
 #   }
 # }
 
+# BatchToolRequest : plusieurs ToolRequest d'un coup (ex. "lavande vs romarin")
+
+# {
+#   "requests": [
+#     {"tool": "fetch_plant_sources", "arguments": {"query": "lavandula"}},
+#     {"tool": "fetch_plant_sources", "arguments": {"query": "rosmarinus"}}
+#   ],
+#   "max_concurrency": 2,
+#   "timeout": 30
+# }
+# → liste de ToolResponse dans le même ordre ; un appel en échec ou hors délai
+#   a "status": "error" sans faire échouer les autres
+
 # ToolResponse : décrit ce que renvoie le MCP
 # Exemple JSON renvoyé par le MCP :
 
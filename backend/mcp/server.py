@@ -1,11 +1,29 @@
 # mcp/server.py
 
-from fastapi import FastAPI, HTTPException
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, PlainTextResponse
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Dict, Any, List
 from mcp.registry import TOOLS, list_tools
+from mcp.dispatch import execute_batch_request, execute_local
+from mcp.jobs import JOBS, JobQueueFull
+from mcp.schemas import BatchToolRequest, ToolResponse
+import telemetry
 
-app = FastAPI(title="MCP Server")
+# Jauges exposées par /metrics : file des jobs async (profondeur = saturation)
+telemetry.register_stats("mcp_jobs", JOBS.stats)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Arrêt : workers des jobs async annulés
+    await JOBS.shutdown()
+
+
+app = FastAPI(title="MCP Server", lifespan=lifespan)
 
 # Schéma pour recevoir les appels de l'IA
 class ToolRequest(BaseModel):
@@ -13,8 +31,9 @@ class ToolRequest(BaseModel):
     arguments: Dict[str, Any] = {}  # arguments du tool
 
 # Route principale pour exécuter un tool
+# ?async=true : réponse 202 immédiate avec un job_id, résultat via GET /jobs/{job_id}
 @app.post("/execute")
-def execute_tool(request: ToolRequest):
+async def execute_tool(request: ToolRequest, run_async: bool = Query(False, alias="async")):
     tool_name = request.tool
     args = request.arguments
 
@@ -22,12 +41,41 @@ def execute_tool(request: ToolRequest):
     if tool_name not in TOOLS:
         raise HTTPException(status_code=400, detail=f"Tool '{tool_name}' non disponible. Outils disponibles : {list_tools()}")
 
-    # Exécution du tool
-    try:
-        result = TOOLS[tool_name](**args)
-        return {"status": "success", "tool": tool_name, "result": result}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Erreur lors de l'exécution du tool : {str(e)}")
+    if run_async:
+        try:
+            job = JOBS.submit(tool_name, args)
+        except JobQueueFull as e:
+            # File pleine : le client réessaie plus tard au lieu d'empiler les requêtes
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "5"})
+        return JSONResponse(
+            status_code=202,
+            content={"job_id": job.id, "status": job.status, "poll": f"/jobs/{job.id}"}
+        )
+
+    # Exécution du tool (même enveloppe que le dispatch local), hors de la boucle asyncio
+    response = await run_in_threadpool(execute_local, tool_name, args)
+    if response["status"] != "success":
+        raise HTTPException(status_code=500, detail=response["message"])
+    return response
+
+# Route pour exécuter plusieurs tools en un seul aller-retour (réponses dans l'ordre)
+@app.post("/execute/batch", response_model=List[ToolResponse])
+async def execute_batch(batch: BatchToolRequest):
+    # Un tool inconnu ou en échec donne une réponse "error" à sa place, sans bloquer le lot
+    return await execute_batch_request(batch)
+
+# Route pour lire un job async ; ?wait=N attend sa fin au plus N secondes (long-poll)
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = Query(0, ge=0)):
+    job = await JOBS.wait(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' inconnu ou expiré")
+    return job.to_dict()
+
+# Métriques Prometheus (async : les stats des jobs se lisent dans la boucle qui les modifie)
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(telemetry.render_metrics(), media_type="text/plain; version=0.0.4")
 
 # Route pour lister tous les tools disponibles
 @app.get("/tools")
@@ -41,6 +89,9 @@ def get_tools():
 # Il reçoit une demande de l’agent IA (quel tool + quels arguments)
 # Il vérifie si le tool est autorisé (via registry.py)
 # Il exécute le tool et retourne le résultat
+# /execute/batch : plusieurs tools en parallèle, une réponse par appel
+# /execute?async=true + /jobs/{id} : les tools longs tournent en arrière-plan (voir jobs.py)
+# /metrics : profondeur de la file des jobs, refus (429), jobs en cours
 # Permet à l’IA de ne pas toucher au scraping directement
 
 # Concrètement : l’IA dit "fetch_plant_sources", le MCP s’assure que ce tool existe, l’exécute et renvoie le résultat.
\ No newline at end of file
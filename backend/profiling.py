@@ -0,0 +1,166 @@
+# backend/profiling.py
+
+import os
+import re
+import time
+import cProfile
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# pyinstrument est optionnel : profileur à échantillonnage qui suit les coroutines
+try:
+    from pyinstrument import Profiler as PyinstrumentProfiler
+except ImportError:
+    PyinstrumentProfiler = None
+
+
+# ============================================================================
+# CONFIGURATION (ENV VARS)
+# ============================================================================
+
+# Seuil (ms) au-delà duquel le profil d'une requête est écrit. 0 = désactivé
+PROFILE_SLOW_MS = float(os.getenv("PROFILE_SLOW_MS", "0"))
+
+# Dossier des profils (.html pour pyinstrument, .prof pour cProfile)
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+
+# "pyinstrument" (pip install pyinstrument, suit l'async) ou "cprofile" (stdlib)
+PROFILER = os.getenv("PROFILER", "pyinstrument").lower()
+
+logger = logging.getLogger(__name__)
+
+if PROFILE_SLOW_MS > 0 and PROFILER == "pyinstrument" and PyinstrumentProfiler is None:
+    logger.warning(
+        "⚠️ PROFILER=pyinstrument mais pyinstrument n'est pas installé : repli sur cProfile. "
+        "Ses profils ne sont fiables qu'avec une seule requête en cours (pip install pyinstrument)"
+    )
+
+
+# ============================================================================
+# PROFIL DES REQUÊTES LENTES
+# ============================================================================
+
+# Un seul profil à la fois : cProfile remplace le hook de profilage du thread
+_ACTIVE = threading.Lock()
+
+
+def _start():
+    if PROFILER == "pyinstrument" and PyinstrumentProfiler is not None:
+        profiler = PyinstrumentProfiler(async_mode="enabled")
+        profiler.start()
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+    return profiler
+
+
+def _stop(profiler) -> None:
+    if isinstance(profiler, cProfile.Profile):
+        profiler.disable()
+    else:
+        profiler.stop()
+
+
+def _dump(profiler, name: str, elapsed_ms: float) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    slug = re.sub(r"[^a-zA-Z0-9]+", "_", name).strip("_") or "root"
+    base = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}-{elapsed_ms:.0f}ms")
+
+    if isinstance(profiler, cProfile.Profile):
+        path = f"{base}.prof"
+        profiler.dump_stats(path)
+    else:
+        path = f"{base}.html"
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(profiler.output_html())
+    return path
+
+
+class SlowProfile:
+    """
+    Profil démarré tout de suite, arrêté par finish() : peut couvrir plus qu'un bloc
+    (ex. une réponse en streaming, finie quand son corps a été envoyé).
+    Écrit seulement si la durée dépasse threshold_ms ; si un autre profil est
+    déjà en cours, rien n'est profilé.
+
+    pyinstrument (async_mode) n'attribue à la requête que le temps de sa propre tâche.
+    cProfile voit tout le thread : pendant les await, le travail des autres requêtes
+    de la boucle est compté aussi, et son coût les ralentit toutes ; ses profils
+    ne sont lisibles qu'avec une seule requête en cours.
+    """
+
+    def __init__(self, name: str, threshold_ms: float = PROFILE_SLOW_MS):
+        self.name = name
+        self.threshold_ms = threshold_ms
+        self._profiler = None
+        self._started = time.perf_counter()
+
+        if threshold_ms <= 0 or not _ACTIVE.acquire(blocking=False):
+            return
+        try:
+            self._profiler = _start()
+        except Exception:
+            _ACTIVE.release()
+            raise
+
+    def finish(self) -> Optional[str]:
+        """Arrête le profil ; retourne le chemin du fichier écrit (None si rapide ou non profilé)."""
+        profiler, self._profiler = self._profiler, None
+        if profiler is None:
+            return None
+
+        _stop(profiler)
+        _ACTIVE.release()
+
+        elapsed_ms = (time.perf_counter() - self._started) * 1000
+        if elapsed_ms < self.threshold_ms:
+            return None
+
+        path = _dump(profiler, self.name, elapsed_ms)
+        logger.info("🐢 %s : %.0f ms, profil écrit dans %s", self.name, elapsed_ms, path)
+        return path
+
+
+class SlowRequestMiddleware:
+    """
+    Middleware ASGI : une requête HTTP = un SlowProfile, fini quand l'application
+    rend la main (réponse envoyée en entier, streaming compris, client parti, ou erreur),
+    même si le corps de la réponse n'a jamais commencé à être lu.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = SlowProfile(f"{scope['method']} {scope['path']}")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profile.finish()
+
+
+@contextmanager
+def profile_if_slow(name: str, threshold_ms: float = PROFILE_SLOW_MS) -> Iterator[None]:
+    """Profile le bloc (voir SlowProfile) et écrit le profil s'il a duré plus de threshold_ms."""
+    profile = SlowProfile(name, threshold_ms)
+    try:
+        yield
+    finally:
+        profile.finish()
+
+
+# 🧠 À quoi sert ce fichier ?
+
+# Profilage à la demande des requêtes lentes, en production comme en local :
+#   PROFILE_SLOW_MS=2000 uvicorn main:app
+# Chaque requête est profilée (une à la fois), jusqu'à la fin de l'envoi de sa réponse
+# (streaming compris) ; seules celles qui dépassent le seuil laissent un fichier dans profiles/
+# Par défaut pyinstrument (page HTML qui suit l'async) ; sans lui, repli sur cProfile,
+# à n'utiliser qu'avec une seule requête à la fois :
+#   python -m pstats profiles/<fichier>.prof   (ou snakeviz)
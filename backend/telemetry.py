@@ -0,0 +1,239 @@
+# backend/telemetry.py
+
+import os
+import time
+import logging
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# ============================================================================
+# CONFIGURATION (ENV VARS)
+# ============================================================================
+
+# Niveau des logs : DEBUG (détail de chaque appel), INFO, WARNING...
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+
+# Histogrammes par étape (0 = spans inactifs, /metrics ne garde que les jauges)
+TELEMETRY_ENABLED = os.getenv("TELEMETRY_ENABLED", "1") == "1"
+
+# Bornes des histogrammes (secondes) : de la détection d'intention (~0,1 ms) à Ollama (minutes)
+STAGE_BUCKETS = (
+    0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0
+)
+
+METRICS_PREFIX = "floria"
+
+logger = logging.getLogger(__name__)
+
+
+def configure_logging(level: str = LOG_LEVEL) -> None:
+    """Format commun à tous les modules (appelé une fois au démarrage)."""
+    logging.basicConfig(
+        level=getattr(logging, level, logging.INFO),
+        format="%(asctime)s %(levelname)s %(name)s : %(message)s"
+    )
+    # httpx journalise chaque requête en INFO : seulement en DEBUG
+    if level != "DEBUG":
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+# ============================================================================
+# HISTOGRAMMES (format texte Prometheus, sans dépendance)
+# ============================================================================
+
+class Histogram:
+    """
+    Histogramme cumulatif par jeu de labels, lu par /metrics.
+    Une observation = une recherche dichotomique + quelques incréments sous verrou.
+    """
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = STAGE_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[Tuple[str, str], ...], Dict] = {}
+
+    def observe(self, seconds: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        position = bisect_left(self.buckets, seconds)
+
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            if position < len(self.buckets):
+                series["counts"][position] += 1
+            series["sum"] += seconds
+            series["count"] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+
+        with self._lock:
+            series = [(key, dict(s, counts=list(s["counts"]))) for key, s in sorted(self._series.items())]
+
+        for key, s in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets, s["counts"]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(key, le=_number(bound))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_labels(key, le='+Inf')} {s['count']}")
+            lines.append(f"{self.name}_sum{_labels(key)} {s['sum']:.6f}")
+            lines.append(f"{self.name}_count{_labels(key)} {s['count']}")
+
+        return lines
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(key: Tuple[Tuple[str, str], ...], **extra: str) -> str:
+    pairs = list(key) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _number(value: float) -> str:
+    return repr(float(value))
+
+
+STAGE_SECONDS = Histogram(
+    f"{METRICS_PREFIX}_stage_seconds",
+    "Durée de chaque étape du traitement d'un message (secondes)"
+)
+
+
+# ============================================================================
+# SPANS (contextvar : suivent la requête à travers await et threads)
+# ============================================================================
+
+class Trace:
+    """Durées cumulées (ms) par étape pour une requête : le champ "timings" de la réponse."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timings: Dict[str, float] = {}
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.timings[name] = round(self.timings.get(name, 0.0) + seconds * 1000, 2)
+
+
+_TRACE: ContextVar[Optional[Trace]] = ContextVar("trace", default=None)
+
+
+@contextmanager
+def trace() -> Iterator[Trace]:
+    """
+    Démarre la collecte des étapes de la requête en cours.
+    Les tâches asyncio et asyncio.to_thread héritent du contexte ;
+    pour un ThreadPoolExecutor, passer par contextvars.copy_context().run.
+    """
+    current = Trace()
+    token = _TRACE.set(current)
+    try:
+        yield current
+    finally:
+        try:
+            _TRACE.reset(token)
+        except ValueError:
+            # Générateur (SSE) refermé depuis un autre contexte : rien à restaurer
+            pass
+
+
+def observe(stage: str, seconds: float, **labels: str) -> None:
+    """Durée mesurée ailleurs (ex. durées renvoyées par Ollama)."""
+    if not TELEMETRY_ENABLED:
+        return
+
+    STAGE_SECONDS.observe(seconds, stage=stage, **labels)
+
+    current = _TRACE.get()
+    if current is not None:
+        name = stage if not labels else f"{stage}:{':'.join(labels.values())}"
+        current.add(name, seconds)
+
+
+@contextmanager
+def span(stage: str, **labels: str) -> Iterator[None]:
+    """
+    Chronomètre un bloc. Un bloc annulé (CancelledError) n'est pas compté :
+    ses durées tronquées fausseraient l'histogramme.
+    """
+    if not TELEMETRY_ENABLED:
+        yield
+        return
+
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        observe(stage, time.perf_counter() - started, **labels)
+        raise
+    observe(stage, time.perf_counter() - started, **labels)
+
+
+# ============================================================================
+# JAUGES (stats des caches et des sessions, lues à chaque /metrics)
+# ============================================================================
+
+_GAUGES: Dict[str, Callable[[], Dict]] = {}
+
+
+def register_stats(name: str, stats: Callable[[], Dict]) -> None:
+    """
+    Expose les valeurs numériques d'un stats() : floria_<name>_<clé>.
+    Un sous-dictionnaire devient une série avec le label key.
+    """
+    _GAUGES[name] = stats
+
+
+def _render_gauges() -> List[str]:
+    lines = []
+
+    for name, stats in _GAUGES.items():
+        try:
+            values = stats()
+        except Exception as e:
+            logger.warning("💥 Stats %s illisibles : %s", name, e)
+            continue
+
+        for field, value in values.items():
+            metric = f"{METRICS_PREFIX}_{name}_{field}"
+            if isinstance(value, dict):
+                points = [((("key", str(k)),), v) for k, v in value.items()]
+            else:
+                points = [((), value)]
+
+            points = [(key, v) for key, v in points if isinstance(v, (int, float))]
+            if not points:
+                continue
+
+            lines.append(f"# TYPE {metric} gauge")
+            lines.extend(f"{metric}{_labels(key)} {_number(v)}" for key, v in points)
+
+    return lines
+
+
+def render_metrics() -> str:
+    """Corps de GET /metrics (format texte Prometheus 0.0.4)."""
+    return "\n".join(STAGE_SECONDS.render() + _render_gauges()) + "\n"
+
+
+# 🧠 À quoi sert ce fichier ?
+
+# Avant : quelques print par message, sans aucune durée
+# Ici, chaque étape (intention, plante, MCP, chaque source, parsing HTML, prompt,
+# pré-remplissage et génération Ollama) est chronométrée avec span("étape")
+# Les durées vont dans un histogramme Prometheus (GET /metrics) et, si le client
+# le demande ("timings": true), dans le champ "timings" de la réponse
+# Les stats des caches et des sessions sont exposées comme jauges
+# configure_logging() remplace les print : LOG_LEVEL=DEBUG pour le détail
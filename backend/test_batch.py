@@ -0,0 +1,100 @@
+# backend/test_batch.py
+
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+import main
+from mcp import dispatch, server
+from mcp.registry import ASYNC_TOOLS, TOOLS
+
+
+@pytest.fixture(params=["main", "mcp"])
+def client(request, monkeypatch):
+    """
+    Les deux routes /execute/batch (backend et serveur MCP), avec deux tools factices :
+    slow (attend seconds puis renvoie son nom) et boom (lève une exception).
+    """
+    running = {"now": 0, "peak": 0}
+
+    async def slow(name: str, seconds: float = 0.0):
+        running["now"] += 1
+        running["peak"] = max(running["peak"], running["now"])
+        try:
+            await asyncio.sleep(seconds)
+            return name
+        finally:
+            running["now"] -= 1
+
+    async def boom():
+        raise RuntimeError("site injoignable")
+
+    for name, fn in (("slow", slow), ("boom", boom)):
+        monkeypatch.setitem(TOOLS, name, fn)
+        monkeypatch.setitem(ASYNC_TOOLS, name, fn)
+
+    app = main.app if request.param == "main" else server.app
+    with TestClient(app) as test_client:
+        test_client.running = running
+        yield test_client
+
+
+def _slow(name: str, seconds: float = 0.0):
+    return {"tool": "slow", "arguments": {"name": name, "seconds": seconds}}
+
+
+# -------------------------
+# 1️⃣ Réponses dans l'ordre, un échec n'affecte pas les autres
+# -------------------------
+def test_results_in_request_order(client):
+    calls = [_slow("a", 0.15), _slow("b", 0.05), _slow("c", 0.0)]
+    responses = client.post("/execute/batch", json={"requests": calls}).json()
+    assert [r["result"] for r in responses] == ["a", "b", "c"]
+
+
+def test_failing_item_leaves_others_intact(client):
+    calls = [_slow("a"), {"tool": "boom"}, {"tool": "inconnu"}, _slow("d")]
+    responses = client.post("/execute/batch", json={"requests": calls}).json()
+
+    assert [r["status"] for r in responses] == ["success", "error", "error", "success"]
+    assert [r["tool"] for r in responses] == ["slow", "boom", "inconnu", "slow"]
+    assert "site injoignable" in responses[1]["message"]
+    assert responses[3]["result"] == "d"
+
+
+# -------------------------
+# 2️⃣ Délai : seul l'appel trop lent échoue
+# -------------------------
+def test_only_slow_item_times_out(client):
+    calls = [_slow("a"), _slow("lent", 2.0), _slow("c")]
+    responses = client.post("/execute/batch", json={"requests": calls, "timeout": 0.2}).json()
+
+    assert [r["status"] for r in responses] == ["success", "error", "success"]
+    assert responses[1]["message"] == "Délai dépassé (0.2 s)"
+
+
+# -------------------------
+# 3️⃣ Plafonds des variables d'environnement
+# -------------------------
+def test_env_caps_concurrency_and_timeout(client, monkeypatch):
+    monkeypatch.setattr(dispatch, "MCP_BATCH_CONCURRENCY", 2)
+    monkeypatch.setattr(dispatch, "MCP_BATCH_TIMEOUT", 0.3)
+
+    calls = [_slow(str(i), 0.05) for i in range(6)] + [_slow("lent", 2.0)]
+    body = {"requests": calls, "max_concurrency": 50, "timeout": 30}
+    responses = client.post("/execute/batch", json=body).json()
+
+    assert client.running["peak"] == 2
+    assert [r["status"] for r in responses] == ["success"] * 6 + ["error"]
+    assert responses[-1]["message"] == "Délai dépassé (0.3 s)"
+
+
+def test_batch_size_cap(client, monkeypatch):
+    monkeypatch.setattr(dispatch, "MCP_BATCH_MAX_ITEMS", 2)
+    r = client.post("/execute/batch", json={"requests": [_slow("a")] * 3})
+    assert r.status_code == 400
+
+
+@pytest.mark.parametrize("field", [{"max_concurrency": 0}, {"timeout": 0}, {"timeout": -1}])
+def test_non_positive_values_rejected(client, field):
+    r = client.post("/execute/batch", json={"requests": [_slow("a")], **field})
+    assert r.status_code == 422
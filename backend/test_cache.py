@@ -0,0 +1,105 @@
+# backend/test_cache.py
+
+import pytest
+from contextlib import contextmanager
+from tools import scraping
+from tools.cache import ScrapeCache, normalize_url
+
+URL = "https://www.aujardin.info/plantes/lavande.php"
+TEXT = "Arrosage : une fois par semaine la première année, puis seulement en cas de sécheresse."
+
+
+class FakeResponse:
+    """Réponse HTTP minimale (celle que _try_scrape_url lit)."""
+
+    def __init__(self, status_code: int, headers=None, body: bytes = b""):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.body = body
+
+    def iter_content(self, chunk_size):
+        yield self.body
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = ScrapeCache(str(tmp_path / "scrape_cache.sqlite3"), ttl=3600, negative_ttl=600)
+    monkeypatch.setattr(scraping, "SCRAPE_CACHE", cache)
+    return cache
+
+
+def _serve(monkeypatch, response):
+    """Remplace le réseau par response ; retourne les en-têtes de chaque requête envoyée."""
+    sent = []
+
+    @contextmanager
+    def fake_stream(url, headers):
+        sent.append(headers)
+        yield response
+
+    monkeypatch.setattr(scraping, "_http_stream", fake_stream)
+    return sent
+
+
+def _expire(cache: ScrapeCache, url: str) -> None:
+    with cache._lock:
+        cache._conn.execute("UPDATE pages SET expires_at = 0 WHERE url = ?", (normalize_url(url),))
+
+
+# -------------------------
+# 1️⃣ TTL : fraîche, puis périmée
+# -------------------------
+def test_entry_expires_after_ttl(tmp_path):
+    fresh = ScrapeCache(str(tmp_path / "fresh.sqlite3"), ttl=3600)
+    expired = ScrapeCache(str(tmp_path / "expired.sqlite3"), ttl=-1)
+    for cache in (fresh, expired):
+        cache.store(URL, TEXT, etag='"v1"')
+
+    assert fresh.get(URL)["fresh"] is True
+    entry = expired.get(URL)
+    assert entry["fresh"] is False and entry["content"] == TEXT and entry["etag"] == '"v1"'
+    assert expired.stats()["stale"] == 1
+
+
+def test_url_normalized_for_key(cache):
+    cache.store("HTTPS://www.Exemple.org:443/p?b=2&a=1#haut", TEXT)
+    assert cache.get("https://www.exemple.org/p?a=1&b=2")["content"] == TEXT
+
+
+# -------------------------
+# 2️⃣ Absences : 404 / 410 mémorisées, 5xx transitoires
+# -------------------------
+@pytest.mark.parametrize("status_code", scraping.MISSING_STATUSES)
+def test_missing_page_cached_as_negative_entry(cache, monkeypatch, status_code):
+    sent = _serve(monkeypatch, FakeResponse(status_code))
+
+    assert scraping._try_scrape_url(URL, "Au Jardin Info") == (None, False)
+    entry = cache.get(URL)
+    assert entry["content"] is None and entry["status_code"] == status_code and entry["fresh"]
+
+    # Absence encore fraîche : servie sans requête
+    assert scraping._try_scrape_url(URL, "Au Jardin Info") == (None, False)
+    assert len(sent) == 1
+
+
+def test_server_error_not_cached(cache, monkeypatch):
+    _serve(monkeypatch, FakeResponse(503))
+
+    assert scraping._try_scrape_url(URL, "Au Jardin Info") == (None, None)
+    assert cache.get(URL) is None
+
+
+# -------------------------
+# 3️⃣ Revalidation : 304 → entrée prolongée, contenu inchangé
+# -------------------------
+def test_stale_entry_revalidated_with_304(cache, monkeypatch):
+    cache.store(URL, TEXT, etag='"v1"', last_modified="Mon, 01 Sep 2025 10:00:00 GMT")
+    _expire(cache, URL)
+    sent = _serve(monkeypatch, FakeResponse(304))
+
+    result, found = scraping._try_scrape_url(URL, "Au Jardin Info")
+
+    assert found is True and result["content"] == TEXT and result["url"] == URL
+    assert sent == [{"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Sep 2025 10:00:00 GMT"}]
+    assert cache.get(URL)["fresh"] is True
+    assert cache.stats()["revalidated"] == 1
@@ -0,0 +1,71 @@
+# backend/test_context.py
+
+from agent.context import build_context, estimate_tokens, strip_scraped_context
+
+SYSTEM = "Tu es FlorIA."
+
+
+def _history(turns, size=40):
+    history = []
+    for i in range(turns):
+        history.append({"role": "user", "content": f"question {i} " + "x" * size})
+        history.append({"role": "assistant", "content": f"réponse {i} " + "y" * size})
+    return history
+
+
+def _tokens(messages):
+    return sum(estimate_tokens(m["content"]) + 4 for m in messages)
+
+
+# -------------------------
+# 1️⃣ Anciens blocs de contexte scrapé
+# -------------------------
+def test_strip_scraped_context():
+    content = "Ma lavande jaunit\n\n[Contexte fiable scraped : arrosage...\nsur deux lignes]"
+    assert strip_scraped_context(content) == "Ma lavande jaunit"
+    assert strip_scraped_context("sans bloc") == "sans bloc"
+
+
+def test_old_scraped_blocks_are_removed():
+    history = [
+        {"role": "user", "content": "Ma lavande ? [Contexte fiable scraped : fiche]"},
+        {"role": "assistant", "content": "Arrosez peu."},
+    ]
+    messages = build_context(SYSTEM, history, {"role": "user", "content": "Et la taille ?"})
+    assert [m["content"] for m in messages] == [SYSTEM, "Ma lavande ?", "Arrosez peu.", "Et la taille ?"]
+
+
+# -------------------------
+# 2️⃣ Fenêtre glissante + résumé
+# -------------------------
+def test_short_history_is_kept_as_is():
+    history = _history(3)
+    user = {"role": "user", "content": "nouvelle question"}
+    assert build_context(SYSTEM, history, user, keep_turns=4) == [{"role": "system", "content": SYSTEM}, *history, user]
+
+
+def test_old_turns_are_folded_by_steps():
+    user = {"role": "user", "content": "nouvelle question"}
+
+    # 5 tours, 4 gardés, paquets de 2 : rien à résumer encore
+    assert len(build_context(SYSTEM, _history(5), user, keep_turns=4, fold_step=2)) == 12
+
+    messages = build_context(SYSTEM, _history(6), user, keep_turns=4, fold_step=2)
+    assert messages[1]["role"] == "system"
+    assert "question 0" in messages[1]["content"] and "question 1" in messages[1]["content"]
+    assert messages[2]["content"].startswith("question 2")
+    assert messages[-1] is user
+
+
+def test_budget_folds_more_turns_but_keeps_new_message():
+    user = {"role": "user", "content": "nouvelle question"}
+    history = _history(4, size=400)
+
+    messages = build_context(SYSTEM, history, user, budget=300, keep_turns=4)
+    assert _tokens(messages) <= 300
+    assert messages[1]["content"].startswith("Résumé des échanges précédents")
+    assert messages[-1] is user
+
+    # Budget intenable : tout est résumé, le nouveau message reste
+    messages = build_context(SYSTEM, history, user, budget=10, keep_turns=4)
+    assert [m["role"] for m in messages] == ["system", "system", "user"]
@@ -0,0 +1,136 @@
+# backend/test_dispatch.py
+
+import json
+import asyncio
+import httpx
+import pytest
+from mcp import dispatch
+from mcp.registry import TOOLS
+
+RESULT = {"query": "lavandula", "summary": "Plein soleil.", "sources": [], "sections": []}
+ENVELOPE_KEYS = {"status", "tool", "result", "message"}
+
+
+# -------------------------
+# 1️⃣ Exécution locale : une seule enveloppe
+# -------------------------
+@pytest.fixture
+def local_tools(monkeypatch):
+    def echo(query: str):
+        return {**RESULT, "query": query}
+
+    def boom():
+        raise RuntimeError("site injoignable")
+
+    monkeypatch.setitem(TOOLS, "echo", echo)
+    monkeypatch.setitem(TOOLS, "boom", boom)
+
+
+def test_local_success_envelope(local_tools):
+    assert dispatch.execute_local("echo", {"query": "lavandula"}) == {
+        "status": "success", "tool": "echo", "result": RESULT, "message": ""
+    }
+
+
+def test_local_errors_are_envelopes(local_tools):
+    failed = dispatch.execute_local("boom")
+    unknown = dispatch.execute_local("inconnu")
+
+    assert set(failed) == set(unknown) == ENVELOPE_KEYS
+    assert failed["status"] == unknown["status"] == "error"
+    assert "site injoignable" in failed["message"]
+    assert "non disponible" in unknown["message"]
+
+
+# -------------------------
+# 2️⃣ MCP distant (httpx.MockTransport) : même enveloppe, jamais d'exception
+# -------------------------
+def _remote(monkeypatch, handler):
+    """execute_remote_async contre un faux serveur MCP."""
+    monkeypatch.setattr(dispatch, "MCP_URL", "http://mcp.test")
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            monkeypatch.setattr(dispatch, "_get_async_client", lambda: client)
+            return await dispatch.execute_remote_async("fetch_plant_sources", {"query": "lavandula"})
+
+    return asyncio.run(run())
+
+
+def test_remote_success(monkeypatch):
+    seen = []
+
+    def handler(request):
+        seen.append((request.url.path, request.content))
+        return httpx.Response(200, json={"status": "success", "tool": "fetch_plant_sources", "result": RESULT})
+
+    assert _remote(monkeypatch, handler) == {
+        "status": "success", "tool": "fetch_plant_sources", "result": RESULT, "message": ""
+    }
+    assert seen[0][0] == "/execute"
+
+
+def test_remote_legacy_double_envelope_unwrapped(monkeypatch):
+    nested = {"status": "success", "tool": "fetch_plant_sources", "result": RESULT, "message": ""}
+
+    def handler(request):
+        return httpx.Response(200, json={"status": "success", "tool": "fetch_plant_sources", "result": nested})
+
+    assert _remote(monkeypatch, handler)["result"] == RESULT
+
+
+def test_remote_http_error(monkeypatch):
+    def handler(request):
+        return httpx.Response(400, json={"detail": "Tool 'x' non disponible"})
+
+    response = _remote(monkeypatch, handler)
+    assert set(response) == ENVELOPE_KEYS
+    assert response["status"] == "error" and response["result"] is None
+    assert response["message"] == "MCP error 400: Tool 'x' non disponible"
+
+
+@pytest.mark.parametrize("body", [b"<html>502 Bad Gateway</html>", b'["pas", "une", "enveloppe"]'])
+def test_remote_malformed_body(monkeypatch, body):
+    def handler(request):
+        return httpx.Response(200, content=body)
+
+    response = _remote(monkeypatch, handler)
+    assert set(response) == ENVELOPE_KEYS
+    assert response["status"] == "error" and response["tool"] == "fetch_plant_sources"
+    assert response["message"].startswith("Réponse MCP invalide")
+
+
+def test_remote_unreachable(monkeypatch):
+    def handler(request):
+        raise httpx.ConnectError("connexion refusée")
+
+    response = _remote(monkeypatch, handler)
+    assert response["status"] == "error" and response["message"].startswith("MCP injoignable")
+
+
+# -------------------------
+# 3️⃣ Version bloquante (requests) : mêmes enveloppes
+# -------------------------
+class FakeResponse:
+    """Réponse requests minimale : status_code, text, json() (ValueError si pas du JSON)."""
+
+    def __init__(self, status_code: int, body: bytes):
+        self.status_code = status_code
+        self.text = body.decode()
+
+    def json(self):
+        return json.loads(self.text)
+
+
+@pytest.mark.parametrize("status_code, body, expected", [
+    (200, b'{"status": "success", "tool": "fetch_plant_sources", "result": {"ok": 1}}', ("success", {"ok": 1}, "")),
+    (500, b'{"detail": "boom"}', ("error", None, "MCP error 500: boom")),
+    (200, b"pas du json", ("error", None, "Réponse MCP invalide : None")),
+])
+def test_remote_sync_envelopes(monkeypatch, status_code, body, expected):
+    monkeypatch.setattr(dispatch, "MCP_URL", "http://mcp.test")
+    monkeypatch.setattr(dispatch.requests, "post", lambda url, json, timeout: FakeResponse(status_code, body))
+
+    response = dispatch.execute_remote("fetch_plant_sources", {"query": "lavandula"})
+    assert (response["status"], response["result"], response["message"]) == expected
+    assert response["tool"] == "fetch_plant_sources"
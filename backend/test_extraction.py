@@ -0,0 +1,99 @@
+# backend/test_extraction.py
+
+import os
+import glob
+import pytest
+import tools.scraping as scraping
+from tools import extraction
+from tools.scraping import _extract_chunks, _finish_text, _parse_page_bs4, _split_bytes
+from tools.extraction import MAX_SECTIONS, PageParser, parse_page
+
+PAGES = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "benchmarks", "pages", "*.html")))
+
+# PARSER_BACKEND=auto choisit lxml dès qu'il est installé : les deux backends sont testés
+BACKENDS = [
+    "stdlib",
+    pytest.param("lxml", marks=pytest.mark.skipif(extraction.etree is None, reason="lxml non installé")),
+]
+
+
+def _read(path: str) -> str:
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _without_repeats(lines):
+    """L'ancien chemin écrit deux fois la section d'un titre à deux mots-clés (lignes consécutives)."""
+    return [line for i, line in enumerate(lines) if i == 0 or line != lines[i - 1]]
+
+
+# -------------------------
+# 1️⃣ Extracteur en une passe = ancien chemin BeautifulSoup
+# -------------------------
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("path", PAGES, ids=os.path.basename)
+def test_single_pass_matches_bs4(path, backend):
+    html = _read(path)
+    old_structured, old_main = _parse_page_bs4(html)
+    structured, main_text = parse_page(html, backend)
+
+    assert main_text == old_main
+
+    old_lines = old_structured.split("\n")
+    lines = structured.split("\n")
+    assert len(lines) == len(set(lines)) <= MAX_SECTIONS
+
+    if len(old_lines) < MAX_SECTIONS:
+        assert lines == _without_repeats(old_lines)
+    else:
+        # Les doublons ne prennent plus de place : des sections au-delà de l'ancienne limite peuvent apparaître
+        kept = _without_repeats(old_lines)
+        assert lines[:len(kept)] == kept
+
+
+# -------------------------
+# 2️⃣ HTML reçu par morceaux (streaming) = page entière
+# -------------------------
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("path", PAGES, ids=os.path.basename)
+def test_chunked_feed_matches_whole_page(path, backend):
+    html = _read(path)
+    parser = PageParser(backend)
+    for i in range(0, len(html), 512):
+        parser.feed(html[i:i + 512])
+    assert parser.close() == parse_page(html, backend)
+
+
+# -------------------------
+# 3️⃣ Téléchargement en streaming avec arrêt anticipé = ancien chemin BeautifulSoup
+# -------------------------
+# Un titre juste avant </main> (paragraphe après), d'autres titres après </main>
+AFTER_MAIN = """<html><body>
+<main><p>La lavande vraie pousse en touffes basses dans les garrigues du sud.</p>
+<h2>Arrosage</h2></main>
+<p>Arroser une fois par semaine la première année, puis seulement en cas de sécheresse.</p>
+<h3>Exposition</h3><p>Plein soleil, dans un sol pauvre, caillouteux et surtout bien drainé.</p>
+<h3>Taille</h3><p>Tailler après la floraison, sans jamais couper dans le vieux bois nu.</p>
+</body></html>"""
+
+
+STREAMED = [pytest.param(_read(p), id=os.path.basename(p)) for p in PAGES] + [pytest.param(AFTER_MAIN, id="after_main")]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("html", STREAMED)
+def test_early_stop_stream_matches_bs4(monkeypatch, html, backend):
+    monkeypatch.setattr(scraping, "SCRAPE_EARLY_STOP", True)
+    monkeypatch.setattr(scraping, "PARSER_BACKEND", backend)
+    monkeypatch.setattr(extraction, "_ACTIVE_BACKEND", backend)
+    monkeypatch.setattr(scraping, "SCRAPE_CHUNK_SIZE", 64)
+
+    old_structured, old_main = _parse_page_bs4(html)
+    kept = _without_repeats(old_structured.split("\n"))[:MAX_SECTIONS]
+
+    streamed = _extract_chunks(_split_bytes(html.encode("utf-8")), "utf-8")
+    assert streamed == _finish_text("\n".join(kept), old_main)
+
+
+def test_pages_found():
+    assert PAGES
@@ -0,0 +1,102 @@
+# backend/test_jobs.py
+
+import asyncio
+import pytest
+from fastapi.testclient import TestClient
+from mcp import jobs, server
+from mcp.dispatch import _envelope
+from mcp.jobs import JobManager, JobQueueFull
+
+RESULT = {"query": "lavande", "summary": "Plein soleil.", "sources": [], "sections": []}
+
+
+@pytest.fixture
+def tool(monkeypatch):
+    """Tool factice : répond après un court délai, sans réseau."""
+    async def fake_execute(tool, arguments):
+        await asyncio.sleep(0.05)
+        return _envelope("success", tool, result=RESULT)
+
+    monkeypatch.setattr(jobs, "execute_local_async", fake_execute)
+
+
+# -------------------------
+# 1️⃣ File pleine : JobQueueFull, 429 côté serveur
+# -------------------------
+def test_full_queue_raises(tool):
+    manager = JobManager(workers=0, queue_max=2)
+
+    async def run():
+        manager.submit("fetch_plant_sources")
+        manager.submit("fetch_plant_sources")
+        with pytest.raises(JobQueueFull):
+            manager.submit("fetch_plant_sources")
+
+    asyncio.run(run())
+    assert manager.stats()["rejected"] == 1
+
+
+def test_full_queue_returns_429(tool, monkeypatch):
+    monkeypatch.setattr(server, "JOBS", JobManager(workers=0, queue_max=1))
+
+    with TestClient(server.app) as client:
+        first = client.post("/execute?async=true", json={"tool": "fetch_plant_sources"})
+        second = client.post("/execute?async=true", json={"tool": "fetch_plant_sources"})
+
+    assert first.status_code == 202
+    assert second.status_code == 429
+    assert second.headers["Retry-After"] == "5"
+
+
+# -------------------------
+# 2️⃣ Jobs terminés oubliés après leur TTL
+# -------------------------
+def test_finished_jobs_pruned_after_ttl(tool):
+    manager = JobManager(workers=1, ttl=60)
+
+    async def run():
+        job = manager.submit("fetch_plant_sources")
+        await manager.wait(job.id, 5)
+        assert manager.get(job.id) is job
+
+        job.finished_at -= 61
+        assert manager.get(job.id) is None
+        await manager.shutdown()
+
+    asyncio.run(run())
+
+
+# -------------------------
+# 3️⃣ Long-poll : enveloppe à plat
+# -------------------------
+def test_long_poll_returns_flat_envelope(tool, monkeypatch):
+    monkeypatch.setattr(server, "JOBS", JobManager(workers=1))
+
+    with TestClient(server.app) as client:
+        job_id = client.post("/execute?async=true", json={"tool": "fetch_plant_sources"}).json()["job_id"]
+        body = client.get(f"/jobs/{job_id}", params={"wait": 5}).json()
+
+    assert body["job_id"] == job_id
+    assert {k: body[k] for k in ("status", "tool", "result", "message")} == {
+        "status": "success",
+        "tool": "fetch_plant_sources",
+        "result": RESULT,
+        "message": "",
+    }
+
+
+# -------------------------
+# 4️⃣ Boucle changée : les jobs restés en file passent en erreur
+# -------------------------
+def test_pending_jobs_fail_when_loop_changes(tool):
+    manager = JobManager(workers=0)
+
+    async def submit():
+        return manager.submit("fetch_plant_sources")
+
+    stranded = asyncio.run(submit())
+    asyncio.run(submit())
+
+    assert stranded.status == "error"
+    assert stranded.done.is_set()
+    assert "Boucle du serveur redémarrée" in stranded.to_dict()["message"]
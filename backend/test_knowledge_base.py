@@ -0,0 +1,26 @@
+# backend/test_knowledge_base.py
+
+from tools.knowledge_base import KnowledgeBase, plant_key
+
+TEXT = "Exposition : plein soleil, sol pauvre et bien drainé, à l'abri des vents froids."
+
+
+# -------------------------
+# 1️⃣ Clé : tirets et espaces équivalents
+# -------------------------
+def test_plant_key_treats_hyphens_as_spaces():
+    assert plant_key("Lavandula angustifolia") == "lavandula angustifolia"
+    assert plant_key("lavandula-angustifolia") == "lavandula angustifolia"
+    assert plant_key("  Lavandula   Angustifolia ") == "lavandula angustifolia"
+
+
+# -------------------------
+# 2️⃣ Fiche crawlée (nom brut) retrouvée avec le nom envoyé par le chat
+# -------------------------
+def test_crawled_name_found_by_chat_query(tmp_path):
+    kb = KnowledgeBase(str(tmp_path / "knowledge_base.sqlite3"))
+    kb.store("Lavandula angustifolia", "Au Jardin Info", "https://www.aujardin.info/plantes/lavande.php", TEXT)
+
+    entries = kb.lookup("lavandula-angustifolia")
+    assert entries["Au Jardin Info"]["content"] == TEXT
+    assert kb.is_fresh("lavandula-angustifolia", "Au Jardin Info")
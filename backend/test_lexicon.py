@@ -0,0 +1,94 @@
+# backend/test_lexicon.py
+
+from agent.lexicon import PLANT_LEXICON, PlantLexicon, normaliser
+
+ENTRIES = [
+    {"nom_vernaculaire": "lavande", "nom_latin": "lavandula"},
+    {"nom_vernaculaire": "belle de nuit", "nom_latin": "mirabilis"},
+    {"nom_vernaculaire": "belle", "nom_latin": "bellis"},
+    {"nom_vernaculaire": "monstera", "nom_latin": "monstera"},
+    {"nom_vernaculaire": "lavande vraie", "nom_latin": "lavandula angustifolia"},
+    {"nom_vernaculaire": "lavande", "nom_latin": "doublon ignore"},
+]
+LEXICON = PlantLexicon(ENTRIES)
+
+
+def _resolve(message, lexicon=LEXICON):
+    return lexicon.resolve(normaliser(message))
+
+
+# -------------------------
+# 1️⃣ Normalisation
+# -------------------------
+def test_normaliser_splits_hyphens_and_apostrophes():
+    assert normaliser("Ma Belle-de-Nuit et l'if !") == ["ma", "belle", "de", "nuit", "et", "l", "if"]
+
+
+# -------------------------
+# 2️⃣ Noms exacts : multi-mots, plus long d'abord, premier du fichier gagne
+# -------------------------
+def test_exact_names():
+    assert _resolve("ma lavande jaunit") == ("lavandula", 1.0)
+    assert _resolve("ma belle-de-nuit ne fleurit pas") == ("mirabilis", 1.0)
+    assert _resolve("une belle plante") == ("bellis", 1.0)
+    assert _resolve("la lavande vraie") == ("lavandula angustifolia", 1.0)
+    assert _resolve("le genre lavandula") == ("lavandula", 1.0)
+
+
+def test_find_returns_span():
+    assert LEXICON.find(["arroser", "ma", "belle", "de", "nuit"]) == ("mirabilis", 2, 5)
+    assert LEXICON.find(["rien", "ici"]) is None
+
+
+# -------------------------
+# 3️⃣ Pluriels et fautes de frappe
+# -------------------------
+def test_plural_and_typo():
+    assert _resolve("mes lavandes") == ("lavandula", 0.95)
+    latin, score = _resolve("ma monsterra a des taches")
+    assert latin == "monstera" and 0.8 <= score < 1.0
+
+
+def test_stopwords_and_unknown_words_are_not_plants():
+    assert _resolve("comment arroser en hiver") is None
+    assert _resolve("mon balcon au soleil") is None
+
+
+def test_common_words_are_not_corrected_into_plants():
+    # À une lettre de myrte, sureau, casse : autant de scrapings inutiles
+    for message in (
+        "ma plante est morte",
+        "mon bureau est sombre",
+        "une tasse de thé renversée sur ma plante",
+        "mon pot est tombé, la tige est cassée",
+    ):
+        assert _resolve(message, PLANT_LEXICON) is None, message
+
+
+def test_typos_and_plurals_still_resolve():
+    assert _resolve("ma monsterra", PLANT_LEXICON)[0] == "monstera"
+    assert _resolve("mes lavandes", PLANT_LEXICON) == ("lavandula", 0.95)
+    latin, score = _resolve("mon orchidé fane", PLANT_LEXICON)
+    assert latin == "phalaenopsis" and 0.85 <= score < 1.0
+
+
+# -------------------------
+# 4️⃣ Lexique livré (agent/data/plants.json)
+# -------------------------
+def test_shipped_lexicon():
+    assert PLANT_LEXICON.size > 0
+    assert _resolve("ma lavande", PLANT_LEXICON)[0] == "lavandula"
+    assert _resolve("mon aloe vera", PLANT_LEXICON) == ("aloe", 1.0)
+
+
+def test_common_plants_without_freeform_fallback():
+    # Résolues autrefois par le repli "mon/ma/mes <mot>" (PLANT_FREEFORM_FALLBACK, désactivé)
+    expected = {
+        "ma fougère jaunit": "nephrolepis",
+        "mon cactus est mou": "cactaceae",
+        "mes oliviers perdent leurs feuilles": "olea",
+        "mon palmier a des taches": "arecaceae",
+        "mon citronnier ne fleurit pas": "citrus",
+    }
+    for message, latin in expected.items():
+        assert _resolve(message, PLANT_LEXICON)[0] == latin
@@ -0,0 +1,126 @@
+# backend/test_memory.py
+
+import time
+import asyncio
+import sqlite3
+import threading
+from agent import orchestrator
+from agent.memory import InMemorySessionStore, SQLiteSessionStore
+
+
+def _turn(i: int, size: int = 100):
+    return {"role": "user", "content": f"{i}" * size}, {"role": "assistant", "content": "r" * size}
+
+
+# -------------------------
+# 1️⃣ Budget mémoire : les sessions les moins récentes partent d'abord
+# -------------------------
+def test_budget_evicts_oldest_session():
+    store = InMemorySessionStore(max_bytes=500)
+    store.append("a", *_turn(1))
+    store.append("b", *_turn(2))
+    store.append("c", *_turn(3))
+
+    assert "a" not in store
+    assert store.stats()["bytes"] <= 500
+    assert store.stats()["evicted_budget"] == 1
+
+
+# -------------------------
+# 2️⃣ Une seule session trop grosse : ses plus anciens tours partent
+# -------------------------
+def test_budget_trims_oldest_turns_of_last_session():
+    store = InMemorySessionStore(max_bytes=500, max_turns=20)
+    for i in range(5):
+        store.append("a", *_turn(i))
+
+    history = store.history("a")
+    assert [m["content"][0] for m in history] == ["3", "r", "4", "r"]
+    assert store.stats()["bytes"] == 400
+    assert store.stats()["trimmed_messages"] == 6
+
+
+# -------------------------
+# 3️⃣ SQLite : fichier partagé entre workers
+# -------------------------
+def _sqlite(tmp_path, **kwargs) -> SQLiteSessionStore:
+    return SQLiteSessionStore(str(tmp_path / "sessions.sqlite3"), **kwargs)
+
+
+def test_sqlite_history_shared_between_instances(tmp_path):
+    worker_a, worker_b = _sqlite(tmp_path), _sqlite(tmp_path)
+    worker_a.append("s", *_turn(1, size=10))
+    worker_b.append("s", *_turn(2, size=10))
+
+    assert [m["content"] for m in worker_a.history("s")] == ["1" * 10, "r" * 10, "2" * 10, "r" * 10]
+    assert worker_b.history("s") == worker_a.history("s")
+    assert "s" in worker_b and "autre" not in worker_b
+
+
+def test_sqlite_uses_wal(tmp_path):
+    _sqlite(tmp_path)
+    conn = sqlite3.connect(str(tmp_path / "sessions.sqlite3"))
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+
+def test_sqlite_prune_drops_expired_extra_sessions_and_old_turns(tmp_path):
+    store = _sqlite(tmp_path, max_sessions=2, max_turns=1, ttl=3600, prune_every=10_000)
+    for session_id in ("expiree", "ancienne", "recente", "courante"):
+        store.append(session_id, *_turn(1, size=10), *_turn(2, size=10))
+
+    conn = sqlite3.connect(str(tmp_path / "sessions.sqlite3"))
+    now = time.time()
+    for session_id, age in (("expiree", 7200), ("ancienne", 300), ("recente", 200), ("courante", 100)):
+        conn.execute("UPDATE sessions SET last_seen = ? WHERE session_id = ?", (now - age, session_id))
+    conn.commit()
+    conn.close()
+
+    # Expirée : plus relue avant même le nettoyage
+    assert store.history("expiree") == []
+
+    store.prune()
+    stats = store.stats()
+    assert stats["sessions"] == 2
+    assert stats["pruned_sessions"] == 2
+    assert stats["messages"] == 4  # 1 tour gardé par session restante
+    assert [m["content"][0] for m in store.history("courante")] == ["2", "r"]
+    assert store.history("ancienne") == []
+
+
+# -------------------------
+# 4️⃣ Lecture / écriture de l'historique hors de la boucle asyncio
+# -------------------------
+def test_async_chat_reads_and_writes_sessions_off_the_loop(tmp_path, monkeypatch):
+    threads = []
+
+    class RecordingStore(SQLiteSessionStore):
+        def history(self, session_id):
+            threads.append(threading.get_ident())
+            return super().history(session_id)
+
+        def append(self, session_id, *messages):
+            threads.append(threading.get_ident())
+            super().append(session_id, *messages)
+
+    store = RecordingStore(str(tmp_path / "sessions.sqlite3"))
+    monkeypatch.setattr(orchestrator, "CHAT_MEMORY", store)
+    monkeypatch.setattr(orchestrator, "RESPONSE_CACHE", None)
+    monkeypatch.setattr(orchestrator, "SEMANTIC_CACHE", None)
+
+    async def no_context(message):
+        return None, [], [], None
+
+    async def fake_ollama(messages):
+        return "Arrose peu en hiver."
+
+    monkeypatch.setattr(orchestrator, "_gather_context_async", no_context)
+    monkeypatch.setattr(orchestrator, "_call_ollama_async", fake_ollama)
+
+    async def run():
+        await orchestrator.handle_message_async("comment arroser ?", "s")
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert len(threads) == 2 and loop_thread not in threads
+    assert store.history("s")[-1]["content"] == "Arrose peu en hiver."
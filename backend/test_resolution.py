@@ -0,0 +1,42 @@
+# backend/test_resolution.py
+
+from tools.resolution import RESOLUTION_MIN_ATTEMPTS, UrlResolver
+
+URLS = ["https://example.org/plantes/lavande", "https://example.org/recherche?q=lavande"]
+
+
+def _resolver(tmp_path) -> UrlResolver:
+    return UrlResolver(str(tmp_path / "resolution.sqlite3"))
+
+
+# -------------------------
+# 1️⃣ Absences certaines
+# -------------------------
+def test_definitive_misses_skip_the_source(tmp_path):
+    resolver = _resolver(tmp_path)
+    resolver.record("Source", "Lavande", URLS, {URLS[0]: False, URLS[1]: False})
+    assert resolver.order("Source", "lavande", URLS) == []
+
+
+def test_winner_is_tried_alone(tmp_path):
+    resolver = _resolver(tmp_path)
+    resolver.record("Source", "Lavande", URLS, {URLS[0]: False, URLS[1]: True})
+    assert resolver.order("Source", "lavande", URLS) == [URLS[1]]
+
+
+# -------------------------
+# 2️⃣ Échecs transitoires (timeout, 5xx)
+# -------------------------
+def test_transient_failures_do_not_mark_the_source_absent(tmp_path):
+    resolver = _resolver(tmp_path)
+    resolver.record("Source", "Lavande", URLS, {URLS[0]: None, URLS[1]: False})
+    assert resolver.order("Source", "lavande", URLS) == URLS
+
+
+def test_transient_failures_do_not_drop_a_pattern(tmp_path):
+    resolver = _resolver(tmp_path)
+    for i in range(RESOLUTION_MIN_ATTEMPTS + 5):
+        resolver.record("Source", f"plante {i}", URLS, {URLS[0]: None, URLS[1]: False})
+    # Modèle 0 : jamais compté, gardé ; modèle 1 : toujours absent, abandonné
+    assert resolver.order("Source", "menthe", URLS) == [URLS[0]]
+    assert resolver.stats()["patterns"] == {"Source#1": 0.0}
@@ -0,0 +1,93 @@
+# backend/test_response_cache.py
+
+import time
+import pytest
+from agent import orchestrator
+from agent.memory import InMemorySessionStore
+from agent.response_cache import ResponseCache, response_key
+
+
+# -------------------------
+# 1️⃣ Clé : message normalisé, plante et contexte scrapé
+# -------------------------
+def test_key_depends_on_plant_and_context():
+    key = response_key("Comment arroser ?", "arrosage", "Lavandula", "Plein soleil.")
+    assert key == response_key("comment  arroser", "arrosage", "Lavandula", "Plein soleil.")
+    assert key != response_key("Comment arroser ?", "arrosage", "Rosa", "Plein soleil.")
+    assert key != response_key("Comment arroser ?", "arrosage", "Lavandula", "Mi-ombre.")
+
+
+# -------------------------
+# 2️⃣ Éviction LRU (nombre, octets) et TTL
+# -------------------------
+def test_lru_evicts_least_recently_used():
+    cache = ResponseCache(max_entries=2)
+    cache.put("a", "réponse a")
+    cache.put("b", "réponse b")
+    cache.get("a")
+    cache.put("c", "réponse c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "réponse a" and cache.get("c") == "réponse c"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_cap_evicts_oldest():
+    cache = ResponseCache(max_bytes=25)
+    cache.put("a", "x" * 10)
+    cache.put("b", "y" * 10)
+    cache.put("c", "z" * 10)
+
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 20
+
+    cache.put("trop", "w" * 26)  # plus grand que le budget : jamais gardé
+    assert cache.get("trop") is None and cache.get("b") == "y" * 10
+
+
+def test_entry_expires_after_ttl(monkeypatch):
+    cache = ResponseCache(ttl=60)
+    cache.put("a", "réponse a")
+    assert cache.get("a") == "réponse a"
+
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 61)
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+# -------------------------
+# 3️⃣ Seuls les premiers messages passent par le cache
+# -------------------------
+@pytest.fixture
+def chat(monkeypatch):
+    """Orchestrator sans réseau : pas de plante, Ollama factice, cache de réponses neuf."""
+    cache = ResponseCache()
+    calls = []
+
+    def fake_ollama(messages):
+        calls.append(messages)
+        return f"Réponse n°{len(calls)}"
+
+    monkeypatch.setattr(orchestrator, "CHAT_MEMORY", InMemorySessionStore())
+    monkeypatch.setattr(orchestrator, "RESPONSE_CACHE", cache)
+    monkeypatch.setattr(orchestrator, "SEMANTIC_CACHE", None)
+    monkeypatch.setattr(orchestrator, "_extract_plant", lambda message: None)
+    monkeypatch.setattr(orchestrator, "_call_ollama", fake_ollama)
+    return cache, calls
+
+
+def test_history_skips_response_cache(chat):
+    cache, calls = chat
+
+    first = orchestrator.handle_message("Comment arroser ?", "alice")["reply"]
+    # Autre session, 1er message : réponse servie par le cache
+    assert orchestrator.handle_message("Comment arroser ?", "bob")["reply"] == first
+    assert len(calls) == 1
+
+    # Même question avec un historique : ni lue ni écrite dans le cache
+    before = cache.stats()
+    assert orchestrator.handle_message("Comment arroser ?", "alice")["reply"] == "Réponse n°2"
+    assert len(calls) == 2
+    after = cache.stats()
+    assert (after["hits"], after["misses"], after["stores"]) == (before["hits"], before["misses"], before["stores"])
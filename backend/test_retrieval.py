@@ -0,0 +1,54 @@
+# backend/test_retrieval.py
+
+from tools.retrieval import BM25, select_sections, split_sections, tokenize
+
+SECTIONS = [
+    "Exposition: plein soleil, à l'abri des vents froids du nord en hiver.",
+    "Arrosage: arroser peu, laisser sécher le substrat entre deux arrosages.",
+    "Taille: tailler après la floraison, sans couper dans le vieux bois.",
+    "Maladies: les feuilles jaunissent quand les racines pourrissent.",
+]
+
+
+# -------------------------
+# 1️⃣ Découpage + tokens
+# -------------------------
+def test_split_sections_drops_short_lines():
+    assert split_sections("Titre\n" + SECTIONS[0] + "\n\n  " + SECTIONS[1] + "  ") == SECTIONS[:2]
+
+
+def test_tokenize_strips_accents_stopwords_and_stems():
+    assert tokenize("Comment arroser les lavandes ?") == ["arros", "lavan"]
+    assert tokenize("Arrosage") == tokenize("arroser")
+    assert tokenize("Lumière") == ["lumie"]
+
+
+# -------------------------
+# 2️⃣ BM25
+# -------------------------
+def test_bm25_ranks_matching_section_first():
+    scores = BM25(SECTIONS).scores("quand arroser ?")
+    assert scores.index(max(scores)) == 1
+    assert scores[0] == scores[2] == 0
+
+
+# -------------------------
+# 3️⃣ Sélection sous budget
+# -------------------------
+def test_select_keeps_relevant_sections_in_original_order():
+    picked = select_sections(SECTIONS, "feuilles jaunes, faut-il moins arroser ?", budget=1000)
+    assert picked == [SECTIONS[1], SECTIONS[3]]
+
+
+def test_select_respects_budget_and_top_k():
+    assert sum(len(s) + 1 for s in select_sections(SECTIONS * 3, "taille", budget=100)) <= 100
+    assert len(select_sections(SECTIONS, "", budget=1000, top_k=2)) == 2
+
+
+def test_select_without_match_keeps_first_sections():
+    assert select_sections(SECTIONS, "bonjour", budget=1000, top_k=2) == SECTIONS[:2]
+
+
+def test_select_truncates_best_section_when_nothing_fits():
+    assert select_sections(SECTIONS, "tailler", budget=20) == [SECTIONS[2][:17] + "..."]
+    assert select_sections([], "arroser") == []
@@ -0,0 +1,60 @@
+# backend/test_semantic_cache.py
+
+import asyncio
+import pytest
+from agent import orchestrator
+from agent.memory import InMemorySessionStore
+
+
+class RecordingCache:
+    """Cache sémantique factice : note les plantes cherchées / enregistrées, ne trouve jamais."""
+
+    def __init__(self):
+        self.lookups = []
+        self.stores = []
+
+    async def lookup_async(self, message, plant, context):
+        self.lookups.append(plant)
+        return None, [1.0, 0.0]
+
+    def store(self, vector, plant, context, reply):
+        self.stores.append(plant)
+
+
+@pytest.fixture
+def chat(monkeypatch):
+    cache = RecordingCache()
+    monkeypatch.setattr(orchestrator, "CHAT_MEMORY", InMemorySessionStore())
+    monkeypatch.setattr(orchestrator, "RESPONSE_CACHE", None)
+    monkeypatch.setattr(orchestrator, "SEMANTIC_CACHE", cache)
+
+    async def fake_ollama(messages):
+        return "Arrose peu en hiver."
+
+    monkeypatch.setattr(orchestrator, "_call_ollama_async", fake_ollama)
+    return cache
+
+
+def _plant(monkeypatch, plant):
+    async def context(message):
+        return plant, [], [], None
+
+    monkeypatch.setattr(orchestrator, "_gather_context_async", context)
+
+
+# -------------------------
+# 1️⃣ Plante détectée : cache sémantique consulté puis rempli
+# -------------------------
+def test_plant_question_uses_semantic_cache(chat, monkeypatch):
+    _plant(monkeypatch, "Lavandula")
+    asyncio.run(orchestrator.handle_message_async("comment arroser ma lavande ?", "s"))
+    assert chat.lookups == chat.stores == ["Lavandula"]
+
+
+# -------------------------
+# 2️⃣ Sans plante : jamais d'index commun à toutes les questions génériques
+# -------------------------
+def test_question_without_plant_skips_semantic_cache(chat, monkeypatch):
+    _plant(monkeypatch, None)
+    asyncio.run(orchestrator.handle_message_async("comment rempoter ?", "s"))
+    assert chat.lookups == chat.stores == []
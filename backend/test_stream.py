@@ -0,0 +1,81 @@
+# backend/test_stream.py
+
+import asyncio
+import pytest
+from agent import orchestrator
+from agent.memory import InMemorySessionStore
+
+TOKENS = ["Arrose ", "peu ", "en ", "hiver."]
+
+
+@pytest.fixture
+def chat(monkeypatch):
+    """Orchestrator sans réseau : pas de sources, Ollama factice, sessions en RAM."""
+    memory = InMemorySessionStore()
+    monkeypatch.setattr(orchestrator, "CHAT_MEMORY", memory)
+    monkeypatch.setattr(orchestrator, "RESPONSE_CACHE", None)
+    monkeypatch.setattr(orchestrator, "SEMANTIC_CACHE", None)
+
+    async def no_context(message):
+        return None, [], [], None
+
+    monkeypatch.setattr(orchestrator, "_gather_context_async", no_context)
+    return memory
+
+
+def _ollama(monkeypatch, fail_after=None):
+    async def fake_stream(messages):
+        for i, token in enumerate(TOKENS):
+            if i == fail_after:
+                raise ConnectionError("Ollama coupé")
+            yield token
+
+    monkeypatch.setattr(orchestrator, "_stream_ollama_async", fake_stream)
+
+
+# -------------------------
+# 1️⃣ Réponse complète : sauvegardée après "done"
+# -------------------------
+def test_full_stream_saves_turn(chat, monkeypatch):
+    _ollama(monkeypatch)
+
+    async def run():
+        return [e async for e in orchestrator.stream_message("comment arroser ?", "complet")]
+
+    events = asyncio.run(run())
+    assert [e["event"] for e in events] == ["sources"] + ["token"] * len(TOKENS) + ["done"]
+    assert chat.history("complet") == [
+        {"role": "user", "content": "comment arroser ?"},
+        {"role": "assistant", "content": "Arrose peu en hiver."},
+    ]
+
+
+# -------------------------
+# 2️⃣ Client déconnecté après le premier token : rien n'est sauvegardé
+# -------------------------
+def test_disconnect_mid_stream_saves_nothing(chat, monkeypatch):
+    _ollama(monkeypatch)
+
+    async def run():
+        stream = orchestrator.stream_message("comment arroser ?", "coupe")
+        async for event in stream:
+            if event["event"] == "token":
+                break
+        await stream.aclose()
+
+    asyncio.run(run())
+    assert chat.history("coupe") == []
+
+
+# -------------------------
+# 3️⃣ Ollama coupé en cours de génération : événement error, rien n'est sauvegardé
+# -------------------------
+def test_ollama_failure_mid_stream_saves_nothing(chat, monkeypatch):
+    _ollama(monkeypatch, fail_after=2)
+
+    async def run():
+        return [e async for e in orchestrator.stream_message("comment arroser ?", "erreur")]
+
+    events = asyncio.run(run())
+    assert events[-1] == {"event": "error", "data": {"message": "Génération interrompue", "reply": "Arrose peu"}}
+    assert chat.history("erreur") == []
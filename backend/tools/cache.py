@@ -0,0 +1,179 @@
+# tools/cache.py
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# ============================================================================
+# CONFIGURATION (ENV VARS)
+# ============================================================================
+
+SCRAPE_CACHE_ENABLED = os.getenv("SCRAPE_CACHE_ENABLED", "1") == "1"
+SCRAPE_CACHE_PATH = os.getenv("SCRAPE_CACHE_PATH", "scrape_cache.sqlite3")
+
+# Durée de vie d'une page trouvée (7 jours) / d'un échec (404, page vide : 6 h)
+SCRAPE_CACHE_TTL = int(os.getenv("SCRAPE_CACHE_TTL", str(7 * 24 * 3600)))
+SCRAPE_CACHE_NEGATIVE_TTL = int(os.getenv("SCRAPE_CACHE_NEGATIVE_TTL", str(6 * 3600)))
+
+
+# ============================================================================
+# NORMALISATION DES URLS (clé du cache)
+# ============================================================================
+
+def normalize_url(url: str) -> str:
+    """
+    Clé de cache : schéma et hôte en minuscules, port par défaut retiré,
+    paramètres triés, fragment ignoré.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+
+# ============================================================================
+# CACHE SQLITE
+# ============================================================================
+
+class ScrapeCache:
+    """
+    Cache disque des pages scrapées (contenu déjà extrait, pas le HTML).
+
+    - entrée positive : content + ETag / Last-Modified pour revalider
+    - entrée négative : content = NULL (404, page sans texte utile)
+    """
+
+    def __init__(self, path: str, ttl: int = SCRAPE_CACHE_TTL, negative_ttl: int = SCRAPE_CACHE_NEGATIVE_TTL):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "negative_hits": 0,
+            "misses": 0,
+            "stale": 0,
+            "revalidated": 0,
+            "stores": 0,
+        }
+
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """
+        Connexion ouverte au premier usage (appelé sous self._lock) :
+        importer le module ne crée pas le fichier.
+        """
+        if self._db is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    url TEXT PRIMARY KEY,
+                    content TEXT,
+                    status_code INTEGER,
+                    etag TEXT,
+                    last_modified TEXT,
+                    fetched_at REAL,
+                    expires_at REAL
+                )
+                """
+            )
+            self._db = conn
+        return self._db
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        Retourne l'entrée (fraîche ou périmée) ou None si l'URL est inconnue.
+        Le champ "fresh" indique si l'entrée peut être servie sans requête.
+        """
+        key = normalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, status_code, etag, last_modified, expires_at FROM pages WHERE url = ?",
+                (key,)
+            ).fetchone()
+
+            if row is None:
+                self._counters["misses"] += 1
+                return None
+
+            content, status_code, etag, last_modified, expires_at = row
+            fresh = expires_at > time.time()
+
+            if not fresh:
+                self._counters["stale"] += 1
+            elif content is None:
+                self._counters["negative_hits"] += 1
+            else:
+                self._counters["hits"] += 1
+
+        return {
+            "content": content,
+            "status_code": status_code,
+            "etag": etag,
+            "last_modified": last_modified,
+            "fresh": fresh,
+        }
+
+    def store(self, url: str, content: str, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        """Enregistre une page trouvée (TTL normal)."""
+        self._write(url, content, 200, etag, last_modified, self.ttl)
+
+    def store_miss(self, url: str, status_code: int) -> None:
+        """Enregistre un échec (TTL négatif, plus court)."""
+        self._write(url, None, status_code, None, None, self.negative_ttl)
+
+    def refresh(self, url: str) -> None:
+        """Réponse 304 : la page n'a pas changé, on prolonge l'entrée."""
+        now = time.time()
+        with self._lock:
+            self._counters["revalidated"] += 1
+            self._conn.execute(
+                "UPDATE pages SET fetched_at = ?, expires_at = ? WHERE url = ?",
+                (now, now + self.ttl, normalize_url(url))
+            )
+
+    def stats(self) -> Dict[str, int]:
+        """Compteurs hit / miss depuis le démarrage + nombre d'entrées."""
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            return {**self._counters, "entries": entries}
+
+    def _write(self, url, content, status_code, etag, last_modified, ttl) -> None:
+        now = time.time()
+        with self._lock:
+            self._counters["stores"] += 1
+            self._conn.execute(
+                """
+                INSERT OR REPLACE INTO pages
+                    (url, content, status_code, etag, last_modified, fetched_at, expires_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                """,
+                (normalize_url(url), content, status_code, etag, last_modified, now, now + ttl)
+            )
+
+
+# Instance partagée (None si le cache est désactivé)
+SCRAPE_CACHE: Optional[ScrapeCache] = ScrapeCache(SCRAPE_CACHE_PATH) if SCRAPE_CACHE_ENABLED else None
+
+
+# 🧠 À quoi sert ce fichier ?
+
+# Les mêmes plantes (ficus, rosa, lavandula…) reviennent sans arrêt
+# Ce cache garde le texte extrait de chaque page sur disque (SQLite)
+# Une page fraîche est servie sans aucune requête réseau
+# Une page périmée est revalidée (If-None-Match / If-Modified-Since → 304)
+# Les 404 et pages vides sont aussi mémorisés, mais moins longtemps
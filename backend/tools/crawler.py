@@ -0,0 +1,153 @@
+# tools/crawler.py
+
+import os
+import json
+import time
+import logging
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from agent.lexicon import PLANT_LEXICON_PATH
+from tools.knowledge_base import KNOWLEDGE_BASE, KnowledgeBase
+from tools.resolution import URL_RESOLVER
+from tools.scraping import SEARCH_STRATEGIES, SOURCES, _try_scrape_url, is_plant_page, source_urls
+from telemetry import configure_logging
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# CONFIGURATION (ENV VARS)
+# ============================================================================
+
+# Fiches crawlées en parallèle (la limite par hôte du scraping s'applique aussi)
+CRAWL_WORKERS = int(os.getenv("CRAWL_WORKERS", "4"))
+
+# Pause après chaque fiche (secondes), pour rester poli avec les sites
+CRAWL_DELAY = float(os.getenv("CRAWL_DELAY", "0.5"))
+
+
+# ============================================================================
+# CRAWL
+# ============================================================================
+
+def known_plants(path: str = PLANT_LEXICON_PATH) -> List[str]:
+    """Noms latins de data/plants.json, sans doublon, dans l'ordre du fichier."""
+    with open(path, encoding="utf-8") as f:
+        entries = json.load(f)
+    return list(dict.fromkeys(e["nom_latin"] for e in entries))
+
+
+def crawl_source(kb: KnowledgeBase, plant: str, source_name: str) -> bool:
+    """
+    Essaie les URLs candidates de la source, dans l'ordre (URL déjà résolue d'abord),
+    et enregistre le résultat (fiche trouvée ou absence certaine ; pas les pages de recherche).
+    Passe par _try_scrape_url : cache HTTP, revalidation et extraction identiques au chat.
+    """
+    tried = {}
+    found = None
+    for url in source_urls(source_name, plant):
+        result, tried[url] = _try_scrape_url(url, source_name)
+        if result:
+            found = result
+            break
+
+    if URL_RESOLVER is not None and tried:
+        URL_RESOLVER.record(source_name, plant, SEARCH_STRATEGIES[source_name](plant), tried)
+
+    if found is None and None in tried.values():
+        # Échec transitoire (timeout, 5xx…) : rien en base, la fiche sera recrawlée
+        logger.info("⏳ %s / %s : échec transitoire, non enregistré", plant, source_name)
+    elif found is None:
+        kb.store_absent(plant, source_name)
+    elif is_plant_page(found["url"]):
+        kb.store(plant, source_name, found["url"], found["content"])
+    else:
+        # Seule une page de recherche répond : rien en base, le chat la scrape en direct
+        logger.debug("🔎 %s / %s : page de recherche, non enregistrée", plant, source_name)
+        found = None
+
+    time.sleep(CRAWL_DELAY)
+    return found is not None
+
+
+def crawl(
+    plants: Optional[List[str]] = None,
+    force: bool = False,
+    kb: Optional[KnowledgeBase] = None,
+    workers: int = CRAWL_WORKERS
+) -> Dict[str, int]:
+    """
+    Remplit la base pour chaque (plante, source).
+    Recrawl incrémental : les fiches encore fraîches sont sautées (sauf force=True).
+    """
+    kb = kb or KNOWLEDGE_BASE
+    if kb is None:
+        raise RuntimeError("Base de connaissances désactivée (KB_ENABLED=0)")
+
+    jobs = [
+        (plant, source["name"])
+        for plant in (plants or known_plants())
+        for source in SOURCES
+        if source["name"] in SEARCH_STRATEGIES
+    ]
+    todo = [job for job in jobs if force or not kb.is_fresh(*job)]
+
+    logger.info("🕷️ Crawl : %d fiche(s) à (re)crawler sur %d", len(todo), len(jobs))
+
+    report = {"skipped": len(jobs) - len(todo), "found": 0, "absent": 0}
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="crawl") as pool:
+        for found in pool.map(lambda job: crawl_source(kb, *job), todo):
+            report["found" if found else "absent"] += 1
+
+    logger.info("📊 Crawl terminé : %s", report)
+    return report
+
+
+# ============================================================================
+# LIGNE DE COMMANDE
+# ============================================================================
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(prog="python -m tools.crawler")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    crawl_cmd = commands.add_parser("crawl", help="Crawl des plantes connues (fiches périmées seulement)")
+    crawl_cmd.add_argument("--plant", action="append", help="Limiter à cette plante (répétable)")
+    crawl_cmd.add_argument("--force", action="store_true", help="Recrawler même les fiches fraîches")
+    crawl_cmd.add_argument("--workers", type=int, default=CRAWL_WORKERS)
+
+    search_cmd = commands.add_parser("search", help="Recherche plein texte dans la base")
+    search_cmd.add_argument("text")
+    search_cmd.add_argument("--limit", type=int, default=5)
+
+    commands.add_parser("stats", help="Nombre de fiches trouvées / absentes")
+
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    if KNOWLEDGE_BASE is None:
+        parser.error("Base de connaissances désactivée (KB_ENABLED=0)")
+
+    if args.command == "crawl":
+        crawl(args.plant, force=args.force, workers=args.workers)
+    elif args.command == "search":
+        for plant, source_name, snippet in KNOWLEDGE_BASE.search(args.text, args.limit):
+            print(f"🌿 {plant} ({source_name}) : {snippet}")
+    else:
+        print(KNOWLEDGE_BASE.stats())
+
+
+if __name__ == "__main__":
+    main()
+
+
+# 🧠 À quoi sert ce fichier ?
+
+# Commande d'ingestion de la base de connaissances (tools/knowledge_base.py)
+# Elle parcourt toutes les plantes de data/plants.json × toutes les sources
+# et enregistre le texte extrait (ou l'absence de fiche)
+# À relancer régulièrement (cron) : seules les fiches périmées sont recrawlées
+#   python -m tools.crawler crawl
+#   python -m tools.crawler crawl --plant "Lavandula angustifolia" --force
+#   python -m tools.crawler search "arrosage hiver"
@@ -0,0 +1,402 @@
+# tools/extraction.py
+
+import os
+import re
+import codecs
+import logging
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+# lxml est optionnel : son parseur C appelle le même "target" que le parseur stdlib
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+
+# ============================================================================
+# CONFIGURATION (ENV VARS)
+# ============================================================================
+
+# "auto" (lxml si installé, sinon stdlib), "lxml", "stdlib", ou "bs4" (ancien chemin)
+PARSER_BACKEND = os.getenv("PARSER_BACKEND", "auto").lower()
+
+
+# ============================================================================
+# RÈGLES D'EXTRACTION (celles de l'ancien pipeline BeautifulSoup)
+# ============================================================================
+
+# Seule différence : un titre qui contient deux mots-clés ne donne plus qu'une section
+# (l'ancien chemin l'écrivait deux fois, doublon compté dans les MAX_SECTIONS)
+
+# Éléments retirés avec tout leur contenu
+_SKIP_TAGS = {
+    "script", "style", "noscript", "svg", "canvas", "iframe",
+    "header", "footer", "nav", "aside", "form", "button"
+}
+_SKIP_CLASS = re.compile(r"(ad|pub|tracking|social|share|cookie)", re.I)
+
+# Titres de section + mots-clés (voir _extract_structured_info)
+_HEADING_TAGS = {"h2", "h3", "h4", "strong", "b"}
+_SECTION_TAGS = {"p", "div", "ul"}
+SECTION_KEYWORDS = [
+    "entretien", "arrosage", "exposition", "lumière", "température",
+    "substrat", "terreau", "engrais", "rempotage", "taille",
+    "multiplication", "maladies", "parasites", "toxicité"
+]
+MAX_SECTIONS = 10
+
+# Candidats "contenu principal", par ordre de priorité (voir _extract_main_text)
+_MAIN_ID = re.compile(r"(content|contenu|main|page|article)", re.I)
+_MAIN_CLASS = re.compile(r"(content|contenu|entry|post|article|main)", re.I)
+_PLANT_CLASS = re.compile(r"(description|info|plant)", re.I)
+
+# Balises sans fermeture : jamais empilées
+_VOID_TAGS = {
+    "area", "base", "br", "col", "embed", "hr", "img", "input",
+    "link", "meta", "param", "source", "track", "wbr"
+}
+
+
+def _class_matches(pattern: re.Pattern, value: Optional[str]) -> bool:
+    """Comme BeautifulSoup : chaque classe, puis l'attribut complet."""
+    if not value:
+        return False
+    return any(pattern.search(c) for c in value.split()) or bool(pattern.search(value))
+
+
+# ============================================================================
+# EXTRACTEUR EN UNE PASSE
+# ============================================================================
+
+class SinglePassExtractor:
+    """
+    Reçoit les événements du parseur (start / end / data / close) et fait,
+    pendant l'unique parcours du document :
+
+    - le nettoyage (zones ignorées au lieu d'être supprimées de l'arbre)
+    - la capture des sections "titre → paragraphe suivant"
+    - le repérage du contenu principal (main, article, #content, …)
+
+    Les morceaux de texte (déjà strippés) sont rangés dans une seule liste ;
+    chaque zone capturée n'est qu'un intervalle [début, fin) de cette liste.
+    """
+
+    def __init__(self):
+        self.pieces: List[str] = []
+        self._buffer: List[str] = []
+
+        # Pile : [tag, ignoré ?, actions à la fermeture]
+        self._stack: List[list] = []
+        self._skip_depth = 0
+
+        # Titres : [début, fin, (début, fin) de la section ou None]
+        self._headings: List[list] = []
+        self._waiting: List[list] = []
+
+        # Contenu principal : priorité → [début, fin]
+        self._main: Dict[int, list] = {}
+        self._body: Optional[list] = None
+
+    # --- Interface "target" (lxml) --------------------------------------------
+
+    def start(self, tag: str, attrs: Dict[str, str]) -> None:
+        self._flush()
+        tag = tag.lower()
+        void = tag in _VOID_TAGS
+
+        if self._skip_depth:
+            if not void:
+                self._stack.append([tag, False, []])
+            return
+
+        if tag in _SKIP_TAGS or _class_matches(_SKIP_CLASS, attrs.get("class")):
+            if not void:
+                self._skip_depth += 1
+                self._stack.append([tag, True, []])
+            return
+
+        if void:
+            return
+
+        closers = []
+        here = len(self.pieces)
+
+        # Paragraphe suivant des titres en attente
+        if tag in _SECTION_TAGS and self._waiting:
+            span = [here, None]
+            for heading in self._waiting:
+                heading[2] = span
+            self._waiting = []
+            closers.append(span)
+
+        if tag in _HEADING_TAGS:
+            heading = [here, None, None]
+            self._headings.append(heading)
+            self._waiting.append(heading)
+            closers.append(heading)
+
+        for priority in self._main_candidates(tag, attrs):
+            span = self._main[priority] = [here, None]
+            closers.append(span)
+
+        if tag == "body" and self._body is None:
+            self._body = [here, None]
+            closers.append(self._body)
+
+        self._stack.append([tag, False, closers])
+
+    def end(self, tag: str) -> None:
+        self._flush()
+        tag = tag.lower()
+
+        # Fermeture implicite des balises ouvertes après celle-ci (comme BeautifulSoup)
+        for i in range(len(self._stack) - 1, -1, -1):
+            if self._stack[i][0] == tag:
+                while len(self._stack) > i:
+                    self._pop()
+                return
+
+    def data(self, text: str) -> None:
+        if not self._skip_depth:
+            self._buffer.append(text)
+
+    def close(self) -> Tuple[str, str]:
+        """Fin du document : (sections structurées, texte principal)."""
+        self._flush()
+        while self._stack:
+            self._pop()
+        return self.structured_text(), self.main_text()
+
+    # --- Résultats -------------------------------------------------------------
+
+    @property
+    def done(self) -> bool:
+        """
+        Plus rien d'utile à attendre du reste de la page : les MAX_SECTIONS premières
+        sections sont complètes, et aucun titre placé avant elles n'attend encore la sienne.
+        (Pas sur </main> : des titres peuvent suivre, et l'ancien chemin lit toute la page.)
+        """
+        sections, complete = self._scan()
+        return complete and len(sections) >= MAX_SECTIONS
+
+    def structured_text(self) -> str:
+        return "\n".join(self._sections())
+
+    def _sections(self) -> List[str]:
+        return self._scan()[0]
+
+    def _scan(self) -> Tuple[List[str], bool]:
+        """
+        (sections complètes, MAX_SECTIONS au plus ; vrai si aucun titre avant la dernière
+        n'est encore ouvert ou en attente de son paragraphe).
+        """
+        sections = []
+        complete = True
+        for start, end, span in self._headings:
+            if end is None:
+                complete = False
+                continue
+
+            title = "".join(self.pieces[start:end])
+            if not any(keyword in title.lower() for keyword in SECTION_KEYWORDS):
+                continue
+
+            if span is None or span[1] is None:
+                complete = False
+                continue
+
+            section_text = " ".join(self.pieces[span[0]:span[1]])
+            if len(section_text) > 30:
+                sections.append(f"{title}: {section_text}")
+                if len(sections) >= MAX_SECTIONS:
+                    break
+
+        return sections, complete
+
+    def main_text(self) -> str:
+        span = next((self._main[p] for p in sorted(self._main)), self._body)
+        start, end = (span[0], span[1]) if span else (0, len(self.pieces))
+
+        text = "\n".join(self.pieces[start:end])
+        text = re.sub(r"\n{3,}", "\n\n", text)
+        text = re.sub(r"[ \t]{2,}", " ", text)
+        return text.strip()
+
+    # --- Interne ---------------------------------------------------------------
+
+    def _main_candidates(self, tag: str, attrs: Dict[str, str]) -> List[int]:
+        """Priorités (0 = meilleure) dont cet élément est le premier représentant."""
+        matches = []
+        if tag == "main":
+            matches.append(0)
+        if tag == "article":
+            matches.append(1)
+        if attrs.get("id") and _MAIN_ID.search(attrs["id"]):
+            matches.append(2)
+        if _class_matches(_MAIN_CLASS, attrs.get("class")):
+            matches.append(3)
+        if tag == "div" and _class_matches(_PLANT_CLASS, attrs.get("class")):
+            matches.append(4)
+        return [p for p in matches if p not in self._main]
+
+    def _flush(self) -> None:
+        if self._buffer:
+            text = "".join(self._buffer).strip()
+            self._buffer = []
+            if text:
+                self.pieces.append(text)
+
+    def _pop(self) -> None:
+        _, skipped, closers = self._stack.pop()
+        if skipped:
+            self._skip_depth -= 1
+            return
+
+        end = len(self.pieces)
+        for span in closers:
+            span[1] = end
+
+
+# ============================================================================
+# BACKENDS DE PARSING
+# ============================================================================
+
+class _StdlibParser(HTMLParser):
+    """Adaptateur html.parser → interface target (sans dépendance)."""
+
+    def __init__(self, target: SinglePassExtractor):
+        super().__init__(convert_charrefs=True)
+        self.target = target
+
+    def handle_starttag(self, tag, attrs):
+        self.target.start(tag, {k: v or "" for k, v in attrs})
+
+    def handle_endtag(self, tag):
+        self.target.end(tag)
+
+    def handle_data(self, data):
+        self.target.data(data)
+
+
+def resolve_backend(name: str = PARSER_BACKEND) -> str:
+    """Backend réellement utilisé ("auto" → lxml si installé)."""
+    if name == "auto":
+        return "lxml" if etree is not None else "stdlib"
+    if name == "lxml" and etree is None:
+        logging.getLogger(__name__).warning("⚠️ lxml non installé : parseur stdlib utilisé")
+        return "stdlib"
+    return name
+
+
+# Backend choisi une fois au démarrage
+_ACTIVE_BACKEND = resolve_backend() if PARSER_BACKEND != "bs4" else "stdlib"
+
+
+class PageParser:
+    """
+    Parseur incrémental : feed() au fil du téléchargement, close() à la fin
+    (ou dès que done est vrai) → (sections structurées, texte principal).
+    """
+
+    def __init__(self, backend: Optional[str] = None):
+        self.backend = resolve_backend(backend) if backend else _ACTIVE_BACKEND
+        self.target = SinglePassExtractor()
+
+        if self.backend == "lxml":
+            self._parser = etree.HTMLParser(target=self.target, remove_comments=True)
+        else:
+            self._parser = _StdlibParser(self.target)
+
+    @property
+    def done(self) -> bool:
+        return self.target.done
+
+    def feed(self, html: str) -> None:
+        self._parser.feed(html)
+
+    def close(self) -> Tuple[str, str]:
+        if self.backend == "lxml":
+            return self._parser.close()
+        self._parser.close()
+        return self.target.close()
+
+
+def parse_page(html: str, backend: Optional[str] = None) -> Tuple[str, str]:
+    """
+    HTML → (sections structurées, texte principal), en une passe.
+    Le backend "bs4" n'est pas géré ici (voir tools/scraping.py).
+    """
+    parser = PageParser(backend)
+    parser.feed(html)
+    return parser.close()
+
+
+# ============================================================================
+# DÉCODAGE (charset de l'en-tête ou de la balise <meta>)
+# ============================================================================
+
+_CHARSET_PARAM = re.compile(r"charset=[\"']?([\w.:-]+)", re.I)
+_META_CHARSET = re.compile(rb"<meta[^>]+charset\s*=\s*[\"']?\s*([\w.:-]+)", re.I)
+
+# Le <meta charset> doit se trouver dans les 1024 premiers octets (spécification HTML)
+_SNIFF_BYTES = 1024
+
+
+def charset_from_content_type(content_type: Optional[str]) -> Optional[str]:
+    """Charset annoncé dans l'en-tête Content-Type (None si absent)."""
+    match = _CHARSET_PARAM.search(content_type or "")
+    return match.group(1) if match else None
+
+
+class HtmlDecoder:
+    """
+    Octets → texte, morceau par morceau, sans jamais décoder deux fois.
+    Encodage : en-tête HTTP, sinon <meta charset> du début de page, sinon UTF-8.
+    """
+
+    def __init__(self, encoding: Optional[str] = None):
+        self.encoding = encoding
+        self._head = b""
+        self._decoder = None
+        if encoding:
+            self._start(encoding)
+
+    def feed(self, data: bytes) -> str:
+        if self._decoder is None:
+            self._head += data
+            if len(self._head) < _SNIFF_BYTES:
+                return ""
+            data, self._head = self._head, b""
+            self._start(self._sniff(data))
+        return self._decoder.decode(data)
+
+    def flush(self) -> str:
+        if self._decoder is None:
+            data, self._head = self._head, b""
+            self._start(self._sniff(data))
+            return self._decoder.decode(data, final=True)
+        return self._decoder.decode(b"", final=True)
+
+    def _sniff(self, head: bytes) -> str:
+        match = _META_CHARSET.search(head[:_SNIFF_BYTES])
+        return match.group(1).decode("ascii", "ignore") if match else "utf-8"
+
+    def _start(self, encoding: str) -> None:
+        try:
+            self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        except LookupError:
+            encoding = "utf-8"
+            self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        self.encoding = encoding
+
+
+# 🧠 À quoi sert ce fichier ?
+
+# L'ancien pipeline (BeautifulSoup) parcourt l'arbre HTML une dizaine de fois :
+# nettoyage en 3 balayages, titres × mots-clés, 5 recherches du contenu principal
+# Ici tout se fait pendant la lecture du HTML, en une seule passe, sans construire d'arbre
+# Le parseur est interchangeable : lxml (C, rapide) s'il est installé, sinon html.parser
+# PARSER_BACKEND=bs4 garde l'ancien chemin (comparaison : benchmarks/bench_parsers.py)
+# Le HTML peut arriver par morceaux (téléchargement en streaming) : la lecture
+# s'arrête dès que le contenu utile est complet (done)
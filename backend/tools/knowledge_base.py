@@ -0,0 +1,215 @@
+# tools/knowledge_base.py
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+
+# ============================================================================
+# CONFIGURATION (ENV VARS)
+# ============================================================================
+
+KB_ENABLED = os.getenv("KB_ENABLED", "1") == "1"
+KB_PATH = os.getenv("KB_PATH", "knowledge_base.sqlite3")
+
+# Âge au-delà duquel une fiche n'est plus servie au chat et est recrawlée (30 jours)
+KB_MAX_AGE = int(os.getenv("KB_MAX_AGE", str(30 * 24 * 3600)))
+
+# Une absence ("rien trouvé sur ce site") n'est crue que 24 h : ensuite, nouvel essai en direct
+KB_ABSENT_MAX_AGE = int(os.getenv("KB_ABSENT_MAX_AGE", str(24 * 3600)))
+
+
+# ============================================================================
+# BASE SQLITE + FTS5
+# ============================================================================
+
+def plant_key(plant: str) -> str:
+    """
+    Clé d'une plante : nom latin en minuscules, tirets = espaces
+    (le crawler écrit "Lavandula angustifolia", le chat cherche "lavandula-angustifolia").
+    """
+    return " ".join(plant.lower().replace("-", " ").split())
+
+
+class KnowledgeBase:
+    """
+    Fiches déjà extraites, une par (plante, source).
+
+    - status "found"  : url + contenu extrait (même pipeline que le scraping direct)
+    - status "absent" : la source n'a rien d'utile pour cette plante
+    - documents_fts   : index plein texte (FTS5) sur les contenus trouvés
+    """
+
+    def __init__(self, path: str, max_age: int = KB_MAX_AGE, absent_max_age: int = KB_ABSENT_MAX_AGE):
+        self.max_age = max_age
+        self.absent_max_age = absent_max_age
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "absent_hits": 0, "misses": 0, "stores": 0}
+
+        self.path = path
+        self.fts = False
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """
+        Connexion ouverte au premier usage (appelé sous self._lock) :
+        importer le module ne crée pas le fichier.
+        """
+        if self._db is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS documents (
+                    plant TEXT NOT NULL,
+                    source_name TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    url TEXT,
+                    content TEXT,
+                    crawled_at REAL,
+                    PRIMARY KEY (plant, source_name)
+                )
+                """
+            )
+
+            # FTS5 absent de certaines compilations de SQLite : la recherche est alors désactivée
+            try:
+                conn.execute(
+                    """
+                    CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+                        content, plant UNINDEXED, source_name UNINDEXED,
+                        tokenize = 'unicode61 remove_diacritics 2'
+                    )
+                    """
+                )
+                self.fts = True
+            except sqlite3.OperationalError:
+                self.fts = False
+            self._db = conn
+        return self._db
+
+    def lookup(self, plant: str) -> Dict[str, Dict]:
+        """
+        Fiches connues d'une plante, par source.
+        Les fiches plus vieilles que max_age (absences : absent_max_age) sont ignorées :
+        la source sera scrapée en direct, et la fiche remplacée.
+        """
+        now = time.time()
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source_name, status, url, content, crawled_at FROM documents WHERE plant = ?",
+                (plant_key(plant),)
+            ).fetchall()
+
+            entries = {}
+            for source_name, status, url, content, crawled_at in rows:
+                max_age = self.max_age if status == "found" else self.absent_max_age
+                if crawled_at + max_age <= now:
+                    continue
+                entries[source_name] = {"status": status, "url": url, "content": content}
+                self._counters["hits" if status == "found" else "absent_hits"] += 1
+
+            if not entries:
+                self._counters["misses"] += 1
+
+        return entries
+
+    def store(self, plant: str, source_name: str, url: str, content: str) -> None:
+        """Enregistre (ou remplace) la fiche trouvée sur une source."""
+        self._write(plant, source_name, "found", url, content)
+
+    def store_absent(self, plant: str, source_name: str) -> None:
+        """Enregistre qu'une source n'a rien pour cette plante."""
+        self._write(plant, source_name, "absent", None, None)
+
+    def is_fresh(self, plant: str, source_name: str) -> bool:
+        """Fiche crawlée il y a moins de max_age (absence : absent_max_age)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT status, crawled_at FROM documents WHERE plant = ? AND source_name = ?",
+                (plant_key(plant), source_name)
+            ).fetchone()
+
+        if row is None:
+            return False
+        status, crawled_at = row
+        max_age = self.max_age if status == "found" else self.absent_max_age
+        return crawled_at + max_age > time.time()
+
+    def search(self, text: str, limit: int = 5) -> List[Tuple[str, str, str]]:
+        """Recherche plein texte : [(plante, source, extrait)], meilleurs résultats d'abord."""
+        terms = [t for t in text.replace('"', " ").split() if t]
+        if not terms:
+            return []
+
+        match = " OR ".join(f'"{t}"' for t in terms)
+        with self._lock:
+            conn = self._conn
+            if not self.fts:
+                return []
+            return conn.execute(
+                """
+                SELECT plant, source_name, snippet(documents_fts, 0, '[', ']', '…', 16)
+                FROM documents_fts WHERE documents_fts MATCH ?
+                ORDER BY rank LIMIT ?
+                """,
+                (match, limit)
+            ).fetchall()
+
+    def stats(self) -> Dict[str, int]:
+        """Compteurs depuis le démarrage + nombre de fiches par statut."""
+        with self._lock:
+            counts = dict(self._conn.execute(
+                "SELECT status, COUNT(*) FROM documents GROUP BY status"
+            ).fetchall())
+            return {
+                **self._counters,
+                "found": counts.get("found", 0),
+                "absent": counts.get("absent", 0),
+            }
+
+    def _write(self, plant, source_name, status, url, content) -> None:
+        key = plant_key(plant)
+        with self._lock:
+            self._counters["stores"] += 1
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    """
+                    INSERT OR REPLACE INTO documents
+                        (plant, source_name, status, url, content, crawled_at)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                    (key, source_name, status, url, content, time.time())
+                )
+                if self.fts:
+                    self._conn.execute(
+                        "DELETE FROM documents_fts WHERE plant = ? AND source_name = ?",
+                        (key, source_name)
+                    )
+                    if content:
+                        self._conn.execute(
+                            "INSERT INTO documents_fts (content, plant, source_name) VALUES (?, ?, ?)",
+                            (content, key, source_name)
+                        )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+
+# Instance partagée (None si la base est désactivée)
+KNOWLEDGE_BASE: Optional[KnowledgeBase] = KnowledgeBase(KB_PATH) if KB_ENABLED else None
+
+
+# 🧠 À quoi sert ce fichier ?
+
+# C'est la base de connaissances locale de FlorIA
+# Les fiches des plantes connues sont crawlées à l'avance (python -m tools.crawler)
+# avec le même pipeline d'extraction que le scraping direct
+# fetch_plant_sources lit ici d'abord : le chat ne dépend plus de la vitesse des sites
+# Le scraping direct ne sert plus qu'aux plantes (ou sources) absentes de la base
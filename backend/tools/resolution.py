@@ -0,0 +1,210 @@
+# tools/resolution.py
+
+import os
+import time
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+
+# ============================================================================
+# CONFIGURATION (ENV VARS)
+# ============================================================================
+
+RESOLUTION_ENABLED = os.getenv("RESOLUTION_ENABLED", "1") == "1"
+RESOLUTION_PATH = os.getenv("RESOLUTION_PATH", "url_resolution.sqlite3")
+
+# Durée de vie d'une URL qui a marché (30 jours) / d'une absence (24 h)
+RESOLUTION_TTL = int(os.getenv("RESOLUTION_TTL", str(30 * 24 * 3600)))
+RESOLUTION_ABSENT_TTL = int(os.getenv("RESOLUTION_ABSENT_TTL", str(24 * 3600)))
+
+# Un modèle d'URL essayé au moins N fois avec un taux de succès sous le seuil n'est plus tenté
+RESOLUTION_MIN_ATTEMPTS = int(os.getenv("RESOLUTION_MIN_ATTEMPTS", "20"))
+RESOLUTION_DROP_RATE = float(os.getenv("RESOLUTION_DROP_RATE", "0.05"))
+
+
+# ============================================================================
+# MÉMOIRE DE RÉSOLUTION (SQLITE)
+# ============================================================================
+
+def query_key(query: str) -> str:
+    """Requête normalisée : minuscules, espaces simples."""
+    return " ".join(query.lower().split())
+
+
+class UrlResolver:
+    """
+    Pour chaque (source, requête) : l'URL qui a marché la dernière fois, ou "absent".
+    Pour chaque (source, n° de modèle d'URL) : essais / succès, pour ordonner les candidats.
+
+    Le n° de modèle est la position de l'URL dans la liste de SEARCH_STRATEGIES.
+    """
+
+    def __init__(self, path: str, ttl: int = RESOLUTION_TTL, absent_ttl: int = RESOLUTION_ABSENT_TTL):
+        self.ttl = ttl
+        self.absent_ttl = absent_ttl
+        self._lock = threading.Lock()
+        self._counters = {"resolved": 0, "absent": 0, "unknown": 0}
+
+        self.path = path
+        self._db: Optional[sqlite3.Connection] = None
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """
+        Connexion ouverte au premier usage (appelé sous self._lock) :
+        importer le module ne crée pas le fichier.
+        """
+        if self._db is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS resolutions (
+                    source_name TEXT NOT NULL,
+                    query TEXT NOT NULL,
+                    url TEXT,
+                    updated_at REAL,
+                    PRIMARY KEY (source_name, query)
+                )
+                """
+            )
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS patterns (
+                    source_name TEXT NOT NULL,
+                    pattern INTEGER NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    successes INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (source_name, pattern)
+                )
+                """
+            )
+            self._db = conn
+        return self._db
+
+    def order(self, source_name: str, query: str, urls: List[str]) -> List[str]:
+        """
+        URLs à essayer pour cette source, dans l'ordre :
+
+        - URL connue et encore valable → elle seule
+        - absence connue               → aucune (la source est sautée)
+        - sinon                        → modèles triés par taux de succès,
+                                         les modèles qui n'aboutissent jamais sont retirés
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, updated_at FROM resolutions WHERE source_name = ? AND query = ?",
+                (source_name, query_key(query))
+            ).fetchone()
+
+            if row is not None:
+                url, updated_at = row
+                if url is not None and updated_at + self.ttl > now:
+                    self._counters["resolved"] += 1
+                    return [url]
+                if url is None and updated_at + self.absent_ttl > now:
+                    self._counters["absent"] += 1
+                    return []
+
+            self._counters["unknown"] += 1
+            stats = dict(
+                (pattern, (attempts, successes))
+                for pattern, attempts, successes in self._conn.execute(
+                    "SELECT pattern, attempts, successes FROM patterns WHERE source_name = ?",
+                    (source_name,)
+                )
+            )
+
+        def rate(i: int) -> float:
+            attempts, successes = stats.get(i, (0, 0))
+            return (successes + 1) / (attempts + 2)
+
+        def dropped(i: int) -> bool:
+            attempts, successes = stats.get(i, (0, 0))
+            return attempts >= RESOLUTION_MIN_ATTEMPTS and successes / attempts < RESOLUTION_DROP_RATE
+
+        indexes = sorted(range(len(urls)), key=lambda i: (-rate(i), i))
+        kept = [i for i in indexes if not dropped(i)] or indexes
+        return [urls[i] for i in kept]
+
+    def record(
+        self,
+        source_name: str,
+        query: str,
+        patterns: List[str],
+        tried: Dict[str, Optional[bool]]
+    ) -> None:
+        """
+        Résultat des URLs essayées pour une source.
+        tried : url → True (trouvée), False (absence certaine : 404 / 410, pas de texte utile),
+        None (échec transitoire ou requête annulée, ne compte pas).
+        """
+        finished = {url: ok for url, ok in tried.items() if ok is not None}
+        if not finished:
+            return
+
+        winner = next((url for url, ok in finished.items() if ok), None)
+        all_failed = winner is None and len(finished) == len(tried)
+        now = time.time()
+
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for url, ok in finished.items():
+                    if url not in patterns:
+                        continue
+                    self._conn.execute(
+                        """
+                        INSERT INTO patterns (source_name, pattern, attempts, successes)
+                        VALUES (?, ?, 1, ?)
+                        ON CONFLICT (source_name, pattern) DO UPDATE SET
+                            attempts = attempts + 1,
+                            successes = successes + excluded.successes
+                        """,
+                        (source_name, patterns.index(url), int(ok))
+                    )
+
+                key = (source_name, query_key(query))
+                previous = self._conn.execute(
+                    "SELECT url FROM resolutions WHERE source_name = ? AND query = ?", key
+                ).fetchone()
+
+                if all_failed and previous and previous[0] in tried:
+                    # L'URL connue ne marche plus : tous les modèles seront réessayés
+                    self._conn.execute("DELETE FROM resolutions WHERE source_name = ? AND query = ?", key)
+                elif winner is not None or all_failed:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO resolutions (source_name, query, url, updated_at) VALUES (?, ?, ?, ?)",
+                        (*key, winner, now)
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def stats(self) -> Dict:
+        """Compteurs depuis le démarrage + taux de succès par modèle d'URL."""
+        with self._lock:
+            patterns = {
+                f"{source_name}#{pattern}": round(successes / attempts, 3) if attempts else None
+                for source_name, pattern, attempts, successes in self._conn.execute(
+                    "SELECT source_name, pattern, attempts, successes FROM patterns ORDER BY source_name, pattern"
+                )
+            }
+            return {**self._counters, "patterns": patterns}
+
+
+# Instance partagée (None si désactivée)
+URL_RESOLVER: Optional[UrlResolver] = UrlResolver(RESOLUTION_PATH) if RESOLUTION_ENABLED else None
+
+
+# 🧠 À quoi sert ce fichier ?
+
+# Chaque source a 2 URLs candidates par plante, dont une échoue presque toujours
+# Ici on retient, par source et par plante, l'URL qui a marché (ou "rien trouvé")
+# La fois suivante, une seule requête au lieu de deux (ou aucune)
+# Pour une plante jamais vue, les modèles d'URL sont essayés du plus au moins fiable,
+# et ceux qui n'aboutissent jamais sont abandonnés
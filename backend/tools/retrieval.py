@@ -0,0 +1,143 @@
+# tools/retrieval.py
+
+import os
+import re
+import math
+import unicodedata
+from collections import Counter
+from typing import List
+
+
+# ============================================================================
+# CONFIGURATION (ENV VARS)
+# ============================================================================
+
+# Taille max du contexte scrapé envoyé au LLM (caractères) / nombre max de sections
+RETRIEVAL_CHAR_BUDGET = int(os.getenv("RETRIEVAL_CHAR_BUDGET", "800"))
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "4"))
+
+# Paramètres BM25 classiques
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Mots vides : trop fréquents pour départager deux sections
+_STOPWORDS = {
+    "les", "des", "une", "est", "sont", "pour", "par", "dans", "sur", "avec", "que",
+    "qui", "pas", "plus", "mon", "mes", "comment", "quand", "quel", "quelle",
+    "elle", "ils", "elles", "cette", "ces", "son", "ses", "aux", "faut", "peut",
+    "entre", "tres", "bien", "the", "and"
+}
+
+# Préfixe gardé par mot : "arroser" / "arrosage" → "arros", "jaunit" / "jaunissent" → "jauni"
+_STEM_LENGTH = 5
+
+
+# ============================================================================
+# DÉCOUPAGE + TOKENS
+# ============================================================================
+
+def split_sections(text: str, min_len: int = 30) -> List[str]:
+    """
+    Sections d'un texte extrait : une par ligne.
+    _extract_structured_info produit déjà une ligne "Titre: texte" par section,
+    et _keep_useful_lines une ligne par paragraphe.
+    """
+    return [line.strip() for line in text.split("\n") if len(line.strip()) >= min_len]
+
+
+def tokenize(text: str) -> List[str]:
+    """Mots sans accents, en minuscules, réduits à leur préfixe."""
+    text = unicodedata.normalize("NFD", text).encode("ascii", "ignore").decode("ascii").lower()
+    return [
+        word[:_STEM_LENGTH]
+        for word in re.findall(r"[a-z0-9]+", text)
+        if len(word) >= 3 and word not in _STOPWORDS
+    ]
+
+
+# ============================================================================
+# BM25
+# ============================================================================
+
+class BM25:
+    """
+    Index BM25 d'une poignée de sections (celles d'une plante).
+    Construit à la demande : quelques dizaines de sections, moins d'une milliseconde.
+    """
+
+    def __init__(self, sections: List[str]):
+        self.docs = [Counter(tokenize(s)) for s in sections]
+        self.lengths = [sum(d.values()) for d in self.docs]
+        self.avg_length = (sum(self.lengths) / len(self.docs)) if self.docs else 0.0
+
+        df = Counter(term for d in self.docs for term in d)
+        n = len(self.docs)
+        self.idf = {term: math.log(1 + (n - f + 0.5) / (f + 0.5)) for term, f in df.items()}
+
+    def scores(self, query: str) -> List[float]:
+        terms = [t for t in set(tokenize(query)) if t in self.idf]
+        results = []
+
+        for doc, length in zip(self.docs, self.lengths):
+            norm = BM25_K1 * (1 - BM25_B + BM25_B * length / (self.avg_length or 1))
+            score = 0.0
+            for term in terms:
+                tf = doc.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (BM25_K1 + 1) / (tf + norm)
+            results.append(score)
+
+        return results
+
+
+# ============================================================================
+# SÉLECTION SOUS BUDGET
+# ============================================================================
+
+def select_sections(
+    sections: List[str],
+    query: str,
+    budget: int = RETRIEVAL_CHAR_BUDGET,
+    top_k: int = RETRIEVAL_TOP_K
+) -> List[str]:
+    """
+    Les sections les plus pertinentes pour la question, sans dépasser budget caractères.
+    Rendues dans leur ordre d'origine (le texte reste lisible).
+    Si rien ne correspond à la question, les premières sections sont gardées.
+    """
+    unique = list(dict.fromkeys(sections))
+    if not unique:
+        return []
+
+    scores = BM25(unique).scores(query)
+    ranked = sorted(range(len(unique)), key=lambda i: scores[i], reverse=True)
+    if scores[ranked[0]] <= 0:
+        ranked = list(range(len(unique)))
+
+    picked, used = [], 0
+    for i in ranked:
+        if len(picked) >= top_k:
+            break
+        if scores[i] <= 0 and picked and scores[ranked[0]] > 0:
+            break
+
+        size = len(unique[i]) + 1
+        if used + size > budget:
+            continue
+        picked.append(i)
+        used += size
+
+    # Aucune section ne tient dans le budget : la meilleure, tronquée
+    if not picked:
+        return [unique[ranked[0]][:max(0, budget - 3)] + "..."]
+
+    return [unique[i] for i in sorted(picked)]
+
+
+# 🧠 À quoi sert ce fichier ?
+
+# Avant : le contexte scrapé était coupé aux 500 premiers caractères,
+# et la partie utile ("arrosage", "maladies") passait souvent à la trappe
+# Ici, le texte est découpé en sections, notées par BM25 selon la question
+# et l'intention, et seules les meilleures sont envoyées (budget en caractères)
+# Prompt plus court et plus pertinent → pré-remplissage Ollama plus rapide
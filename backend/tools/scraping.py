@@ -1,10 +1,71 @@
 # tools/scraping.py
 
+import os
 import re
+import time
+import asyncio
+import logging
+import threading
+import contextvars
+import multiprocessing
+import httpx
 import requests
 from bs4 import BeautifulSoup
-from typing import Dict, List, Optional
-from urllib.parse import quote, urljoin
+from contextlib import asynccontextmanager, contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool
+from requests.adapters import HTTPAdapter
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import quote, urljoin, urlsplit
+from urllib3.util.retry import Retry
+from tools.cache import SCRAPE_CACHE
+from tools.knowledge_base import KNOWLEDGE_BASE
+from tools.resolution import URL_RESOLVER
+from tools.retrieval import split_sections
+from tools.extraction import PARSER_BACKEND, HtmlDecoder, PageParser, charset_from_content_type, parse_page
+from telemetry import observe, span
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# CONFIGURATION (ENV VARS)
+# ============================================================================
+
+# En-têtes envoyés aux sites (sync + async)
+HEADERS = {'User-Agent': 'FlorIA-Bot/1.0 (Educational Project)'}
+
+# Timeout d'une requête (secondes)
+SCRAPE_TIMEOUT = int(os.getenv("SCRAPE_TIMEOUT", "10"))
+
+# Toutes les URLs candidates partent en parallèle : durée max d'une recherche
+SCRAPE_DEADLINE = float(os.getenv("SCRAPE_DEADLINE", str(SCRAPE_TIMEOUT + 2)))
+
+# Taille du pool de threads partagé par les recherches synchrones
+SCRAPE_WORKERS = int(os.getenv("SCRAPE_WORKERS", "16"))
+
+# Connexions keep-alive gardées par hôte / requêtes simultanées max par hôte
+SCRAPE_POOL_SIZE = int(os.getenv("SCRAPE_POOL_SIZE", "8"))
+SCRAPE_MAX_PER_HOST = int(os.getenv("SCRAPE_MAX_PER_HOST", "4"))
+
+# Nouvelles tentatives (5xx, connexion coupée) avec backoff exponentiel
+SCRAPE_RETRIES = int(os.getenv("SCRAPE_RETRIES", "2"))
+SCRAPE_BACKOFF = float(os.getenv("SCRAPE_BACKOFF", "0.5"))
+RETRY_STATUSES = (500, 502, 503, 504)
+
+# Téléchargement en streaming : taille max lue par page (octets) / taille des morceaux
+SCRAPE_MAX_BYTES = int(os.getenv("SCRAPE_MAX_BYTES", str(2 * 1024 * 1024)))
+SCRAPE_CHUNK_SIZE = int(os.getenv("SCRAPE_CHUNK_SIZE", str(16 * 1024)))
+
+# Arrêt de la lecture dès que le contenu utile est complet (0/1)
+SCRAPE_EARLY_STOP = os.getenv("SCRAPE_EARLY_STOP", "1") == "1"
+
+# Process dédiés au parsing HTML (hors GIL). 0 = parsing dans le thread appelant
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "0"))
+
+# Benchmarks hors ligne : requêtes envoyées à <base>/<hôte><chemin> (benchmarks/stand_ins.py)
+# Vide = vrais sites. Les URLs des résultats et du cache restent les URLs d'origine
+SCRAPE_PROXY_BASE = os.getenv("SCRAPE_PROXY_BASE", "").rstrip("/")
 
 
 # ============================================================================
@@ -136,54 +197,556 @@ def _normalize_query(query: str) -> str:
     return q
 
 
-def _try_scrape_url(url: str, source_name: str) -> Optional[Dict]:
+def _parse_page_bs4(html: str) -> Tuple[str, str]:
     """
-    Essaie de scraper une URL donnée.
-    Retourne None si échec.
+    Ancien chemin BeautifulSoup (PARSER_BACKEND=bs4) : plusieurs parcours de l'arbre.
+    Retourne (sections structurées, texte principal).
     """
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Nettoyage
+    _clean_soup(soup)
+
+    # Extraction structurée d'abord, texte principal en secours
+    return _extract_structured_info(soup, ""), _extract_main_text(soup)
+
+
+def _finish_text(structured: str, main_text: str) -> Optional[str]:
+    """
+    Choix du texte (sections structurées, sinon texte principal) et limites.
+    Retourne None si le texte utile est trop court.
+    """
+    text = structured
+
+    # Si pas de sections trouvées, extraction classique
+    if not text or len(text) < 100:
+        text = main_text
+
+    text = _keep_useful_lines(text, max_lines=40)
+
+    # Limite stricte pour Ollama
+    text = text[:2000]
+
+    if text and len(text) > 100:  # Au moins 100 caractères utiles
+        return text
+
+    return None
+
+
+def _extract_content(html: str) -> Optional[str]:
+    """
+    Pipeline d'extraction : nettoyage, sections structurées, texte principal.
+    Retourne None si le texte utile est trop court.
+    """
+    if PARSER_BACKEND == "bs4":
+        return _finish_text(*_parse_page_bs4(html))
+    return _finish_text(*parse_page(html))
+
+
+class _ExtractionStream:
+    """
+    Extraction au fil du téléchargement : octets → texte (décodé une seule fois)
+    → parseur incrémental. done devient vrai quand le reste de la page est inutile.
+    Avec PARSER_BACKEND=bs4, le texte est accumulé et parsé à la fin.
+    Le temps CPU cumulé (décodage + parsing) est compté dans l'étape html_parse.
+    """
+
+    def __init__(self, encoding: Optional[str] = None):
+        self._decoder = HtmlDecoder(encoding)
+        self._parser = PageParser() if PARSER_BACKEND != "bs4" else None
+        self._parts: List[str] = []
+        self._seconds = 0.0
+
+    @property
+    def done(self) -> bool:
+        return SCRAPE_EARLY_STOP and self._parser is not None and self._parser.done
+
+    def feed(self, data: bytes) -> None:
+        started = time.perf_counter()
+        self._push(self._decoder.feed(data))
+        self._seconds += time.perf_counter() - started
+
+    def close(self) -> Optional[str]:
+        started = time.perf_counter()
+        self._push(self._decoder.flush())
+        if self._parser is None:
+            text = _extract_content("".join(self._parts))
+        else:
+            text = _finish_text(*self._parser.close())
+
+        observe("html_parse", self._seconds + time.perf_counter() - started)
+        return text
+
+    def _push(self, text: str) -> None:
+        if not text:
+            return
+        if self._parser is None:
+            self._parts.append(text)
+        else:
+            self._parser.feed(text)
+
+
+def _extract_chunks(chunks: Iterable[bytes], encoding: Optional[str]) -> Optional[str]:
+    """Extraction d'un flux de morceaux ; la lecture s'arrête dès que done est vrai."""
+    stream = _ExtractionStream(encoding)
+    for chunk in chunks:
+        stream.feed(chunk)
+        if stream.done:
+            break
+    return stream.close()
+
+
+def _split_bytes(data: bytes) -> Iterator[bytes]:
+    for i in range(0, len(data), SCRAPE_CHUNK_SIZE):
+        yield data[i:i + SCRAPE_CHUNK_SIZE]
+
+
+class _Abandoned(Exception):
+    """Recherche déjà terminée : le téléchargement en cours ne sert plus (version sync)."""
+
+
+def _capped(chunks: Iterable[bytes], url: str, abandoned: Optional[threading.Event] = None) -> Iterator[bytes]:
+    """
+    Morceaux du corps de réponse, jusqu'à SCRAPE_MAX_BYTES (le reste n'est pas lu).
+    Si abandoned est levé entre deux morceaux : _Abandoned (connexion fermée par l'appelant).
+    """
+    total = 0
+    for chunk in chunks:
+        if abandoned is not None and abandoned.is_set():
+            raise _Abandoned(url)
+        total += len(chunk)
+        if total > SCRAPE_MAX_BYTES:
+            logger.info("✂️ Page tronquée à %d octets : %s", SCRAPE_MAX_BYTES, url)
+            yield chunk[:len(chunk) - (total - SCRAPE_MAX_BYTES)]
+            return
+        yield chunk
+
+
+async def _capped_async(chunks: AsyncIterator[bytes], url: str) -> AsyncIterator[bytes]:
+    """Version asynchrone de _capped."""
+    total = 0
+    async for chunk in chunks:
+        total += len(chunk)
+        if total > SCRAPE_MAX_BYTES:
+            logger.info("✂️ Page tronquée à %d octets : %s", SCRAPE_MAX_BYTES, url)
+            yield chunk[:len(chunk) - (total - SCRAPE_MAX_BYTES)]
+            return
+        yield chunk
+
+
+def _is_html(headers) -> bool:
+    """Seules les pages HTML sont parsées (pas de PDF, image, JSON…)."""
+    content_type = (headers.get("Content-Type") or "").split(";")[0].strip().lower()
+    return not content_type or content_type in ("text/html", "application/xhtml+xml")
+
+
+# ============================================================================
+# EXTRACTION DANS UN POOL DE PROCESS (hors GIL)
+# ============================================================================
+
+_EXTRACTION_POOL: Optional[ProcessPoolExecutor] = None
+_EXTRACTION_POOL_LOCK = threading.Lock()
+
+# Pool tombé en panne : parsing local jusqu'au redémarrage (EXTRACTION_WORKERS reste intact)
+_POOL_DISABLED = False
+
+
+def _extract_bytes(data: bytes, encoding: Optional[str]) -> Optional[str]:
+    """
+    Exécuté dans un worker : HTML brut (octets) → texte extrait.
+    Le décodage se fait aussi dans le worker ; le parsing s'arrête dès que done est vrai.
+    """
+    return _extract_chunks(_split_bytes(data), encoding)
+
+
+def _warm_worker() -> None:
+    """Au démarrage d'un worker : imports faits, regex compilées, 1re extraction payée."""
+    _extract_content("<html><body><main><p>FlorIA</p></main></body></html>")
+
+
+def start_extraction_pool() -> Optional[ProcessPoolExecutor]:
+    """
+    Crée le pool (si EXTRACTION_WORKERS > 0) et démarre tous ses workers tout de suite
+    (chacun se prépare une fois, dans _warm_worker).
+    forkserver : pas de fork d'un process qui a déjà des threads (verrous copiés).
+    """
+    global _EXTRACTION_POOL
+
+    with _EXTRACTION_POOL_LOCK:
+        if _EXTRACTION_POOL is None and EXTRACTION_WORKERS > 0 and not _POOL_DISABLED:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _EXTRACTION_POOL = ProcessPoolExecutor(
+                max_workers=EXTRACTION_WORKERS,
+                mp_context=context,
+                initializer=_warm_worker
+            )
+            # Une tâche vide par worker : le pool ne lance ses process qu'à la demande
+            for _ in range(EXTRACTION_WORKERS):
+                _EXTRACTION_POOL.submit(os.getpid)
+            logger.info("⚙️ Pool d'extraction : %d process", EXTRACTION_WORKERS)
+
+        return _EXTRACTION_POOL
+
+
+def shutdown_extraction_pool() -> None:
+    """Arrêt de l'application : les workers sont terminés."""
+    global _EXTRACTION_POOL
+
+    with _EXTRACTION_POOL_LOCK:
+        pool, _EXTRACTION_POOL = _EXTRACTION_POOL, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _pool_failed(e: Exception) -> None:
+    """Worker mort (OOM, kill) : le pool est abandonné, parsing dans le thread ensuite."""
+    global _POOL_DISABLED
+
+    logger.warning("💥 Pool d'extraction hors service, parsing local : %s", e)
+    _POOL_DISABLED = True
+    shutdown_extraction_pool()
+
+
+def _extract_response(
+    response: requests.Response,
+    url: str,
+    abandoned: Optional[threading.Event] = None
+) -> Optional[str]:
+    """
+    Texte extrait d'une réponse en streaming (corps plafonné à SCRAPE_MAX_BYTES).
+    Sans pool : parsing au fil du téléchargement, la connexion est coupée dès que done.
+    Avec pool : le corps est lu puis parsé dans un worker.
+    """
+    encoding = charset_from_content_type(response.headers.get("Content-Type"))
+    chunks = _capped(response.iter_content(SCRAPE_CHUNK_SIZE), url, abandoned)
+
+    pool = start_extraction_pool()
+    if pool is None:
+        return _extract_chunks(chunks, encoding)
+
+    data = b"".join(chunks)
     try:
-        response = requests.get(
-            url,
-            timeout=10,
-            headers={'User-Agent': 'FlorIA-Bot/1.0 (Educational Project)'}
+        with span("html_parse"):
+            return pool.submit(_extract_bytes, data, encoding).result()
+    except BrokenProcessPool as e:
+        _pool_failed(e)
+        return _extract_bytes(data, encoding)
+
+
+async def _extract_response_async(response: httpx.Response, url: str) -> Optional[str]:
+    """
+    Version asynchrone : chaque morceau est parsé dans un thread (la boucle n'est
+    jamais bloquée), ou le corps complet part dans le pool de process.
+    """
+    encoding = charset_from_content_type(response.headers.get("Content-Type"))
+    chunks = _capped_async(response.aiter_bytes(SCRAPE_CHUNK_SIZE), url)
+
+    pool = start_extraction_pool()
+    if pool is None:
+        stream = _ExtractionStream(encoding)
+        async for chunk in chunks:
+            await asyncio.to_thread(stream.feed, chunk)
+            if stream.done:
+                break
+        return await asyncio.to_thread(stream.close)
+
+    data = b"".join([chunk async for chunk in chunks])
+    try:
+        with span("html_parse"):
+            return await asyncio.wrap_future(pool.submit(_extract_bytes, data, encoding))
+    except BrokenProcessPool as e:
+        _pool_failed(e)
+        return await asyncio.to_thread(_extract_bytes, data, encoding)
+
+
+def _build_result(url: str, source_name: str, text: str) -> Dict:
+    """Forme d'un résultat de scraping réussi."""
+    return {
+        "title": source_name,
+        "url": url,
+        "source_name": source_name,
+        "content": text
+    }
+
+
+# ============================================================================
+# SESSIONS HTTP PARTAGÉES (keep-alive, limite par hôte, retries)
+# ============================================================================
+
+def _build_session() -> requests.Session:
+    """
+    Session requests partagée : un pool de connexions par hôte,
+    retries avec backoff sur 5xx et connexions coupées.
+    """
+    retry = Retry(
+        total=SCRAPE_RETRIES,
+        backoff_factor=SCRAPE_BACKOFF,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=["GET"],
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(
+        pool_connections=len(SOURCES),
+        pool_maxsize=SCRAPE_POOL_SIZE,
+        max_retries=retry
+    )
+
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_SESSION = _build_session()
+
+# Sémaphores par hôte : on reste poli avec les sites de la whitelist
+_HOST_SLOTS: Dict[str, threading.BoundedSemaphore] = {}
+_HOST_SLOTS_LOCK = threading.Lock()
+
+
+@contextmanager
+def _host_slot(url: str):
+    """Limite le nombre de requêtes simultanées vers un même hôte (version sync)."""
+    host = urlsplit(url).netloc
+    with _HOST_SLOTS_LOCK:
+        slot = _HOST_SLOTS.setdefault(host, threading.BoundedSemaphore(SCRAPE_MAX_PER_HOST))
+    with slot:
+        yield
+
+
+def _routed(url: str) -> str:
+    """URL réellement demandée : inchangée, ou réécrite vers SCRAPE_PROXY_BASE."""
+    if not SCRAPE_PROXY_BASE:
+        return url
+    parts = urlsplit(url)
+    return f"{SCRAPE_PROXY_BASE}/{parts.netloc}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+
+
+@contextmanager
+def _http_stream(url: str, headers: Dict[str, str]):
+    """
+    GET en streaming via la session partagée (pool + retries), dans la limite par hôte.
+    Le corps est lu par l'appelant ; fermé en sortie, même s'il n'a pas été lu en entier.
+    """
+    with _host_slot(url):
+        response = _SESSION.get(_routed(url), timeout=SCRAPE_TIMEOUT, headers=headers, stream=True)
+        try:
+            yield response
+        finally:
+            response.close()
+
+
+# Client httpx partagé (keep-alive), recréé si la boucle asyncio change
+_ASYNC_CLIENT: Optional[httpx.AsyncClient] = None
+_ASYNC_CLIENT_LOOP: Optional[asyncio.AbstractEventLoop] = None
+_ASYNC_HOST_SLOTS: Dict[str, asyncio.Semaphore] = {}
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    """Client asynchrone partagé pour le scraping."""
+    global _ASYNC_CLIENT, _ASYNC_CLIENT_LOOP
+
+    loop = asyncio.get_running_loop()
+    if _ASYNC_CLIENT is None or _ASYNC_CLIENT.is_closed or _ASYNC_CLIENT_LOOP is not loop:
+        _ASYNC_CLIENT = httpx.AsyncClient(
+            timeout=SCRAPE_TIMEOUT,
+            headers=HEADERS,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_connections=SCRAPE_MAX_PER_HOST * len(SOURCES),
+                max_keepalive_connections=SCRAPE_POOL_SIZE * len(SOURCES)
+            )
         )
+        _ASYNC_CLIENT_LOOP = loop
+        _ASYNC_HOST_SLOTS.clear()
+    return _ASYNC_CLIENT
 
-        # Si 404 ou autre erreur, passer
-        if response.status_code != 200:
-            return None
 
-        soup = BeautifulSoup(response.text, "html.parser")
+async def aclose_client() -> None:
+    """Ferme le client de scraping partagé (arrêt de l'application)."""
+    global _ASYNC_CLIENT
+    if _ASYNC_CLIENT is not None:
+        await _ASYNC_CLIENT.aclose()
+        _ASYNC_CLIENT = None
 
-        # Nettoyage
-        _clean_soup(soup)
 
-        # Extraction structurée d'abord
-        text = _extract_structured_info(soup, "")
+@asynccontextmanager
+async def _http_stream_async(url: str, headers: Dict[str, str]):
+    """
+    GET asynchrone en streaming via le client partagé, dans la limite par hôte,
+    avec retries + backoff exponentiel (5xx, connexion coupée).
+    """
+    client = _get_async_client()
+    host = urlsplit(url).netloc
+    slot = _ASYNC_HOST_SLOTS.setdefault(host, asyncio.Semaphore(SCRAPE_MAX_PER_HOST))
+
+    for attempt in range(SCRAPE_RETRIES + 1):
+        last_attempt = attempt == SCRAPE_RETRIES
+        async with slot:
+            try:
+                request = client.build_request("GET", _routed(url), headers=headers)
+                response = await client.send(request, stream=True)
+            except (httpx.ConnectError, httpx.ReadError, httpx.RemoteProtocolError):
+                if last_attempt:
+                    raise
+                response = None
+
+            if response is not None:
+                if response.status_code not in RETRY_STATUSES or last_attempt:
+                    try:
+                        yield response
+                    finally:
+                        await response.aclose()
+                    return
+                await response.aclose()
+
+        await asyncio.sleep(SCRAPE_BACKOFF * (2 ** attempt))
 
-        # Si pas de sections trouvées, extraction classique
-        if not text or len(text) < 100:
-            text = _extract_main_text(soup)
 
-        text = _keep_useful_lines(text, max_lines=40)
+# ============================================================================
+# CACHE : lecture / écriture autour des requêtes
+# ============================================================================
 
-        # Limite stricte pour Ollama
-        text = text[:2000]
+def _cached_result(entry: Dict, url: str, source_name: str) -> Optional[Dict]:
+    """Résultat reconstruit depuis une entrée du cache (None si entrée négative)."""
+    if entry["content"]:
+        return _build_result(url, source_name, entry["content"])
+    return None
 
-        if text and len(text) > 100:  # Au moins 100 caractères utiles
-            return {
-                "title": source_name,
-                "url": url,
-                "source_name": source_name,
-                "content": text
-            }
 
-    except Exception as e:
-        print(f"❌ Erreur scraping {url}: {e}")
-        return None
+def _conditional_headers(entry: Optional[Dict]) -> Dict[str, str]:
+    """En-têtes de revalidation pour une entrée périmée."""
+    headers: Dict[str, str] = {}
+    if entry and entry["content"]:
+        if entry["etag"]:
+            headers["If-None-Match"] = entry["etag"]
+        if entry["last_modified"]:
+            headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+# Statuts qui prouvent l'absence de la page ; les autres (5xx, 403, 429…) sont transitoires
+MISSING_STATUSES = (404, 410)
+
+
+def _cache_failure(url: str, status_code: int) -> None:
+    """Mémorise les absences (404 / 410). Les erreurs 5xx restent transitoires."""
+    if SCRAPE_CACHE and status_code in MISSING_STATUSES:
+        SCRAPE_CACHE.store_miss(url, status_code)
+
 
+def _cache_page(url: str, source_name: str, text: Optional[str], headers) -> Optional[Dict]:
+    """Enregistre le texte extrait (ou l'absence de texte utile) et construit le résultat."""
+    if SCRAPE_CACHE:
+        if text:
+            SCRAPE_CACHE.store(url, text, headers.get("ETag"), headers.get("Last-Modified"))
+        else:
+            SCRAPE_CACHE.store_miss(url, 200)
+
+    if text:
+        return _build_result(url, source_name, text)
     return None
 
 
+def _found(result: Optional[Dict]) -> Tuple[Optional[Dict], bool]:
+    """Réponse exploitée : trouvée, ou absence certaine (page sans texte utile, pas du HTML)."""
+    return result, result is not None
+
+
+def _try_scrape_url(
+    url: str,
+    source_name: str,
+    abandoned: Optional[threading.Event] = None
+) -> Tuple[Optional[Dict], Optional[bool]]:
+    """
+    Essaie de scraper une URL donnée (en passant par le cache disque).
+    Retourne (résultat, trouvée) ; trouvée vaut :
+    - True  : page trouvée
+    - False : absence certaine (404 / 410, pas du HTML, pas de texte utile)
+    - None  : échec transitoire (timeout, connexion coupée, 5xx…) ou abandon
+    abandoned levé (recherche terminée sans elle) : pas encore lancée → rien n'est demandé ;
+    en cours → arrêt au prochain morceau reçu.
+    """
+    if abandoned is not None and abandoned.is_set():
+        return None, None
+
+    entry = SCRAPE_CACHE.get(url) if SCRAPE_CACHE else None
+    if entry and entry["fresh"]:
+        return _found(_cached_result(entry, url, source_name))
+
+    try:
+        with span("source_fetch", source=source_name), _http_stream(url, _conditional_headers(entry)) as response:
+
+            # Page inchangée depuis la dernière visite
+            if response.status_code == 304 and entry and entry["content"]:
+                SCRAPE_CACHE.refresh(url)
+                return _found(_cached_result(entry, url, source_name))
+
+            # Si 404 ou autre erreur, passer
+            if response.status_code != 200:
+                _cache_failure(url, response.status_code)
+                return None, False if response.status_code in MISSING_STATUSES else None
+
+            # Pas du HTML (PDF, image…) : corps jamais téléchargé
+            if not _is_html(response.headers):
+                return _found(_cache_page(url, source_name, None, response.headers))
+
+            text = _extract_response(response, url, abandoned)
+            return _found(_cache_page(url, source_name, text, response.headers))
+
+    except _Abandoned:
+        logger.debug("🛑 Téléchargement abandonné : %s", url)
+        return None, None
+
+    except Exception as e:
+        logger.warning("❌ Erreur scraping %s : %s", url, e)
+        return None, None
+
+
+async def _cache_call(fn, *args):
+    """
+    Lecture / écriture du cache disque (SQLite WAL, verrou) dans un thread :
+    la boucle continue de servir les autres requêtes pendant ce temps.
+    """
+    if SCRAPE_CACHE is None:
+        return fn(*args)
+    return await asyncio.to_thread(fn, *args)
+
+
+async def _try_scrape_url_async(url: str, source_name: str) -> Tuple[Optional[Dict], Optional[bool]]:
+    """
+    Version asynchrone de _try_scrape_url (même cache, lu et écrit hors de la boucle, même retour).
+    Le parsing HTML (CPU) part dans le pool de process (ou un thread) pour ne pas bloquer la boucle.
+    """
+    entry = await _cache_call(SCRAPE_CACHE.get, url) if SCRAPE_CACHE else None
+    if entry and entry["fresh"]:
+        return _found(_cached_result(entry, url, source_name))
+
+    try:
+        with span("source_fetch", source=source_name):
+            async with _http_stream_async(url, _conditional_headers(entry)) as response:
+
+                if response.status_code == 304 and entry and entry["content"]:
+                    await _cache_call(SCRAPE_CACHE.refresh, url)
+                    return _found(_cached_result(entry, url, source_name))
+
+                if response.status_code != 200:
+                    await _cache_call(_cache_failure, url, response.status_code)
+                    return None, False if response.status_code in MISSING_STATUSES else None
+
+                if not _is_html(response.headers):
+                    return _found(await _cache_call(_cache_page, url, source_name, None, response.headers))
+
+                text = await _extract_response_async(response, url)
+                return _found(await _cache_call(_cache_page, url, source_name, text, response.headers))
+
+    except Exception as e:
+        logger.warning("❌ Erreur scraping %s : %s", url, e)
+        return None, None
+
+
 # ============================================================================
 # STRATÉGIES DE RECHERCHE PAR SOURCE
 # ============================================================================
@@ -224,73 +787,312 @@ SEARCH_STRATEGIES = {
 }
 
 
+def is_plant_page(url: str) -> bool:
+    """
+    Fiche d'une plante (et non page de résultats de recherche du site).
+    Les pages de recherche des SOURCES passent toutes la requête en paramètre
+    (eflore ?masque=, recherche.php?q=) : elles ne vont pas dans la base locale.
+    """
+    return not urlsplit(url).query
+
+
 # ============================================================================
 # TOOL MCP : fetch_plant_sources
 # ============================================================================
 
+def _build_summary(query: str, found: List[Dict]) -> Dict:
+    """
+    Synthèse : combine les contenus trouvés et construit la sortie du tool.
+    sections = contenu complet découpé par section, pour la sélection côté orchestrator
+    (summary, tronqué, reste là pour les anciens clients).
+    """
+    results = [
+        {
+            "title": r["title"],
+            "url": r["url"],
+            "source_name": r["source_name"]
+        }
+        for r in found
+    ]
+    all_content = [r["content"] for r in found]
+    sections = [
+        {"source_name": r["source_name"], "url": r["url"], "text": text}
+        for r in found
+        for text in split_sections(r["content"])
+    ]
+
+    summary = "\n\n---\n\n".join(all_content) if all_content else None
+
+    # Limite finale stricte
+    if summary and len(summary) > 2500:
+        summary = summary[:2500] + "..."
+
+    logger.info("📊 Résultat : %d source(s) trouvée(s)", len(results))
+
+    return {
+        "query": query,
+        "summary": summary,
+        "sources": results,
+        "sections": sections
+    }
+
+
+# Pool partagé : borne le nombre de requêtes simultanées (version sync)
+_EXECUTOR = ThreadPoolExecutor(max_workers=SCRAPE_WORKERS, thread_name_prefix="scrape")
+
+# Marqueur : requête encore en cours
+_PENDING = object()
+
+
+def source_urls(source_name: str, query: str) -> List[str]:
+    """
+    URLs à essayer pour une source : URL déjà résolue pour cette requête,
+    sinon les modèles de SEARCH_STRATEGIES du plus au moins fiable (tools/resolution.py).
+    """
+    urls = SEARCH_STRATEGIES[source_name](query)
+    if URL_RESOLVER is None:
+        return urls
+    return URL_RESOLVER.order(source_name, query, urls)
+
+
+def _candidate_urls(query: str) -> List[Tuple[str, List[str]]]:
+    """
+    (source, URLs à essayer) dans l'ordre de priorité de SOURCES.
+    """
+    candidates = []
+    for source in SOURCES:
+        source_name = source["name"]
+
+        if source_name in SEARCH_STRATEGIES:
+            candidates.append((source_name, source_urls(source_name, query)))
+    return candidates
+
+
+def _remember_resolutions(query: str, candidates: List, verdicts: List[List], skipped: set) -> None:
+    """
+    Mémorise quelle URL a marché (ou que rien n'a marché) pour chaque source scrapée.
+    verdicts[i][j] = trouvée de _try_scrape_url ; None (échec transitoire,
+    requête annulée ou jamais terminée) ne compte pas.
+    """
+    if URL_RESOLVER is None:
+        return
+
+    for i, (source_name, urls) in enumerate(candidates):
+        if i in skipped or not urls:
+            continue
+
+        tried = dict(zip(urls, verdicts[i]))
+        URL_RESOLVER.record(source_name, query, SEARCH_STRATEGIES[source_name](query), tried)
+
+
+def _fill_from_knowledge_base(query: str, candidates: List, outcomes: List[List]) -> set:
+    """
+    Sources déjà présentes dans la base locale : fiche (ou absence) sans requête réseau.
+    Seules les sources inconnues de la base restent à scraper en direct.
+    Retourne les positions des sources servies par la base.
+    """
+    filled = set()
+    if KNOWLEDGE_BASE is None:
+        return filled
+
+    entries = KNOWLEDGE_BASE.lookup(query)
+    for i, (source_name, urls) in enumerate(candidates):
+        entry = entries.get(source_name)
+        if entry is None:
+            continue
+
+        result = None
+        if entry["status"] == "found":
+            result = _build_result(entry["url"], source_name, entry["content"])
+            logger.debug("📚 Base locale : %s", source_name)
+
+        outcomes[i] = [None] * len(urls)
+        if urls:
+            outcomes[i][0] = result
+        filled.add(i)
+
+    return filled
+
+
+def _pick_results(outcomes: List[List], limit: int) -> Optional[List[Dict]]:
+    """
+    Choisit les résultats dans l'ordre de priorité (sources, puis URLs).
+
+    outcomes[i][j] = résultat de l'URL j de la source i (None si échec,
+    _PENDING si en cours). Retourne None tant qu'une requête encore en cours
+    peut changer la sélection.
+    """
+    picked = []
+    for source_outcomes in outcomes:
+        if len(picked) >= limit:
+            break
+
+        for outcome in source_outcomes:
+            if outcome is _PENDING:
+                return None
+            if outcome:
+                picked.append(outcome)
+                break
+
+    return picked
+
+
+def _record_outcome(
+    outcomes: List[List],
+    verdicts: List[List],
+    candidates: List,
+    i: int,
+    j: int,
+    attempt: Tuple[Optional[Dict], Optional[bool]]
+) -> None:
+    """Enregistre le résultat d'une URL candidate (retour de _try_scrape_url)."""
+    source_name, urls = candidates[i]
+    result, verdicts[i][j] = attempt
+    outcomes[i][j] = result
+
+    if result:
+        logger.debug("✅ Trouvé sur %s : %s", source_name, urls[j])
+    else:
+        logger.debug("⚠️ Échec : %s", urls[j])
+
+
+def _finish(outcomes: List[List], limit: int) -> List[Dict]:
+    """Délai dépassé : les requêtes encore en cours comptent comme des échecs."""
+    for source_outcomes in outcomes:
+        for j, outcome in enumerate(source_outcomes):
+            if outcome is _PENDING:
+                source_outcomes[j] = None
+    return _pick_results(outcomes, limit)
+
+
 def fetch_plant_sources(query: str, limit: int = 3) -> Dict:
     """
     Tool MCP amélioré : recherche intelligente multi-sources.
 
+    La base locale (tools/knowledge_base.py, remplie par le crawler) est lue d'abord ;
+    pour les sources qu'elle ne connaît pas, les URLs candidates sont interrogées en
+    parallèle (via le cache disque, qui garde son TTL et sa revalidation) ;
+    l'ordre de priorité de SOURCES est conservé pour choisir les résultats,
+    et les requêtes restantes sont abandonnées dès que la sélection est certaine.
+
     Args:
         query: nom de la plante
         limit: nombre maximum de sources
 
     Returns:
-        Dict avec query, summary, sources
+        Dict avec query, summary, sources, sections
     """
 
     if not query or not query.strip():
-        return {"query": query, "summary": None, "sources": []}
+        return {"query": query, "summary": None, "sources": [], "sections": []}
+
+    logger.debug("🔍 Recherche pour : %s", query)
+
+    candidates = _candidate_urls(query)
+    outcomes = [[_PENDING] * len(urls) for _, urls in candidates]
+    verdicts = [[None] * len(urls) for _, urls in candidates]
+    from_kb = _fill_from_knowledge_base(query, candidates, outcomes)
+    found = _pick_results(outcomes, limit)
+
+    # Scraping direct seulement si la base ne suffit pas
+    futures = {}
+    abandoned = threading.Event()
+    if found is None:
+        for i, (source_name, urls) in enumerate(candidates):
+            for j, url in enumerate(urls):
+                if outcomes[i][j] is _PENDING:
+                    # copy_context : les durées de chaque source restent rattachées à la requête
+                    run = contextvars.copy_context().run
+                    futures[_EXECUTOR.submit(run, _try_scrape_url, url, source_name, abandoned)] = (i, j)
+
+    deadline = time.monotonic() + SCRAPE_DEADLINE
+    pending = set(futures)
+
+    while found is None and pending:
+        done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        if not done:
+            break
 
-    results = []
-    all_content = []
+        for future in done:
+            i, j = futures[future]
+            _record_outcome(outcomes, verdicts, candidates, i, j, future.result())
 
-    print(f"🔍 Recherche pour : {query}")
+        found = _pick_results(outcomes, limit)
 
-    for source in SOURCES:
-        if len(results) >= limit:
-            break
+    # Les requêtes plus lentes ne servent plus : celles en file sont annulées,
+    # celles déjà lancées s'arrêtent au prochain morceau reçu (slots du pool et de l'hôte libérés)
+    abandoned.set()
+    for future in pending:
+        future.cancel()
 
-        source_name = source["name"]
-        strategy = SEARCH_STRATEGIES.get(source_name)
+    _remember_resolutions(query, candidates, verdicts, from_kb)
+    if found is None:
+        found = _finish(outcomes, limit)
 
-        if not strategy:
-            continue
+    return _build_summary(query, found)
 
-        # Obtenir les URLs à essayer pour cette source
-        urls_to_try = strategy(query)
-
-        # Essayer chaque URL jusqu'à ce qu'une fonctionne
-        for url in urls_to_try:
-            result = _try_scrape_url(url, source_name)
-
-            if result:
-                print(f"✅ Trouvé sur {source_name}: {url}")
-                all_content.append(result["content"])
-                results.append({
-                    "title": result["title"],
-                    "url": result["url"],
-                    "source_name": result["source_name"]
-                })
-                break  # Passe à la source suivante
-            else:
-                print(f"⚠️  Échec: {url}")
-
-    # Synthèse : combine les contenus trouvés
-    summary = "\n\n---\n\n".join(all_content) if all_content else None
 
-    # Limite finale stricte
-    if summary and len(summary) > 2500:
-        summary = summary[:2500] + "..."
+async def fetch_plant_sources_async(query: str, limit: int = 3) -> Dict:
+    """
+    Version asynchrone du tool fetch_plant_sources (même sortie).
+    """
 
-    print(f"📊 Résultat: {len(results)} source(s) trouvée(s)")
+    if not query or not query.strip():
+        return {"query": query, "summary": None, "sources": [], "sections": []}
+
+    logger.debug("🔍 Recherche pour : %s", query)
+
+    # Mémoire des URLs résolues (lue et écrite) et base locale (lue) dans un thread :
+    # la boucle n'attend pas leurs verrous
+    if URL_RESOLVER is not None:
+        candidates = await asyncio.to_thread(_candidate_urls, query)
+    else:
+        candidates = _candidate_urls(query)
+    outcomes = [[_PENDING] * len(urls) for _, urls in candidates]
+    verdicts = [[None] * len(urls) for _, urls in candidates]
+    from_kb = set()
+    if KNOWLEDGE_BASE is not None:
+        from_kb = await asyncio.to_thread(_fill_from_knowledge_base, query, candidates, outcomes)
+    found = _pick_results(outcomes, limit)
+
+    # Scraping direct seulement si la base ne suffit pas
+    tasks = {}
+    if found is None:
+        for i, (source_name, urls) in enumerate(candidates):
+            for j, url in enumerate(urls):
+                if outcomes[i][j] is _PENDING:
+                    tasks[asyncio.create_task(_try_scrape_url_async(url, source_name))] = (i, j)
+
+    deadline = time.monotonic() + SCRAPE_DEADLINE
+    pending = set(tasks)
 
-    return {
-        "query": query,
-        "summary": summary,
-        "sources": results
-    }
+    try:
+        while found is None and pending:
+            done, pending = await asyncio.wait(
+                pending,
+                timeout=max(0.0, deadline - time.monotonic()),
+                return_when=asyncio.FIRST_COMPLETED
+            )
+            if not done:
+                break
+
+            for task in done:
+                i, j = tasks[task]
+                _record_outcome(outcomes, verdicts, candidates, i, j, task.result())
+
+            found = _pick_results(outcomes, limit)
+
+    finally:
+        # Les requêtes plus lentes ne servent plus : on les annule
+        for task in pending:
+            task.cancel()
+
+    if URL_RESOLVER is not None:
+        await asyncio.to_thread(_remember_resolutions, query, candidates, verdicts, from_kb)
+    if found is None:
+        found = _finish(outcomes, limit)
+
+    return _build_summary(query, found)
 
 # # tools/scraping.py
 
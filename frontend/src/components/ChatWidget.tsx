@@ -5,7 +5,7 @@ import logoImage from "@/assets/logo-floria.svg";
 import { markdownToHtml } from "@/lib/markdown";
 import { useChatHistory, type ChatMessage } from "@/hooks/use-chat-history";
 import { useChatSession } from "@/hooks/use-chat-session";
-import { formatChatReply, sendChatMessage } from "@/lib/chat-api";
+import { formatChatReply, streamChatMessage, type ChatSource } from "@/lib/chat-api";
 
 type Message = ChatMessage;
 
@@ -19,10 +19,11 @@ const initialMessages: Message[] = [
 
 export function ChatWidget() {
   const [isOpen, setIsOpen] = useState(false);
-  const { messages, addMessage, resetMessages } = useChatHistory();
+  const { messages, setMessages, addMessage, resetMessages } = useChatHistory();
   const { sessionId, resetSession } = useChatSession();
   const [input, setInput] = useState("");
   const [isLoading, setIsLoading] = useState(false);
+  const [streamingId, setStreamingId] = useState<string | null>(null);
   const conversationIdRef = useRef(0);
   const displayMessages = messages.length > 0 ? [initialMessages[0], ...messages] : initialMessages;
 
@@ -40,29 +41,55 @@ export function ChatWidget() {
     setIsLoading(true);
     const conversationId = conversationIdRef.current;
 
-    try {
-      const payload = await sendChatMessage({ message: input.trim(), sessionId });
+    // Réponse affichée au fil de l'eau : sources dès qu'elles arrivent, puis chaque token
+    const assistantId = (Date.now() + 1).toString();
+    let reply = "";
+    let sources: ChatSource[] = [];
+    let shown = false;
+
+    const showReply = (content: string) => {
       if (conversationIdRef.current !== conversationId) {
         return;
       }
-      const assistantMessage: Message = {
-        id: (Date.now() + 1).toString(),
-        role: "assistant",
-        content: formatChatReply(payload),
-      };
-      addMessage(assistantMessage);
-    } catch {
-      if (conversationIdRef.current !== conversationId) {
+      if (!shown) {
+        shown = true;
+        setStreamingId(assistantId);
+        addMessage({ id: assistantId, role: "assistant", content });
         return;
       }
-      addMessage({
-        id: (Date.now() + 1).toString(),
-        role: "assistant",
-        content: "Désolé, je n'arrive pas à joindre le serveur pour le moment. Réessayez dans un instant.",
-      });
+      setMessages((prev) =>
+        prev.map((message) => (message.id === assistantId ? { ...message, content } : message)),
+      );
+    };
+
+    try {
+      const payload = await streamChatMessage(
+        { message: input.trim(), sessionId },
+        {
+          onSources: (event) => {
+            sources = event.sources ?? [];
+            if (sources.length) {
+              showReply(formatChatReply({ reply, sources }));
+            }
+          },
+          onToken: (token) => {
+            reply += token;
+            showReply(formatChatReply({ reply, sources }));
+          },
+        },
+      );
+      showReply(formatChatReply(payload));
+    } catch (error) {
+      const interrupted = error instanceof Error && error.message === "chat_stream_interrupted" && reply;
+      showReply(
+        interrupted
+          ? formatChatReply({ reply: `${reply}\n\n*Réponse interrompue, réessayez dans un instant.*`, sources })
+          : "Désolé, je n'arrive pas à joindre le serveur pour le moment. Réessayez dans un instant.",
+      );
     } finally {
       if (conversationIdRef.current === conversationId) {
         setIsLoading(false);
+        setStreamingId(null);
       }
     }
   };
@@ -73,6 +100,7 @@ export function ChatWidget() {
     resetSession();
     setInput("");
     setIsLoading(false);
+    setStreamingId(null);
   };
 
   return (
@@ -141,7 +169,7 @@ export function ChatWidget() {
                 </div>
               </div>
             ))}
-            {isLoading && (
+            {isLoading && !streamingId && (
               <div className="flex justify-start">
                 <div className="bg-muted rounded-2xl rounded-bl-md px-4 py-3">
                   <div className="flex gap-1">
@@ -14,7 +14,13 @@ type ChatRequest = {
   sessionId: string;
 };
 
+type ChatStreamHandlers = {
+  onSources?: (payload: Pick<ChatApiResponse, "tools_used" | "sources">) => void;
+  onToken?: (token: string) => void;
+};
+
 const CHAT_ENDPOINT = "http://localhost:8000/chat";
+const CHAT_STREAM_ENDPOINT = "http://localhost:8000/chat/stream";
 
 export const formatChatReply = (payload: ChatApiResponse) => {
   let content = payload.reply;
@@ -47,3 +53,62 @@ export const sendChatMessage = async ({ message, sessionId }: ChatRequest) => {
 
   return (await response.json()) as ChatApiResponse;
 };
+
+// Consomme /chat/stream (Server-Sent Events) : sources, tokens, puis réponse complète.
+// Un événement "error" (génération interrompue) rejette la promesse.
+export const streamChatMessage = async (
+  { message, sessionId }: ChatRequest,
+  { onSources, onToken }: ChatStreamHandlers = {},
+) => {
+  const response = await fetch(CHAT_STREAM_ENDPOINT, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({
+      message,
+      session_id: sessionId,
+    }),
+  });
+
+  if (!response.ok || !response.body) {
+    throw new Error("chat_request_failed");
+  }
+
+  const result: ChatApiResponse = { reply: "", tools_used: [], sources: [] };
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+
+    buffer += decoder.decode(value, { stream: true });
+    const events = buffer.split("\n\n");
+    buffer = events.pop() ?? "";
+
+    for (const raw of events) {
+      const event = raw.match(/^event: (.*)$/m)?.[1];
+      const data = raw.match(/^data: (.*)$/m)?.[1];
+      if (!event || data === undefined) continue;
+
+      const parsed = JSON.parse(data);
+      if (event === "sources") {
+        result.tools_used = parsed.tools_used;
+        result.sources = parsed.sources;
+        onSources?.(parsed);
+      } else if (event === "token") {
+        result.reply += parsed;
+        onToken?.(parsed);
+      } else if (event === "done") {
+        result.reply = parsed.reply;
+      } else if (event === "error") {
+        // Génération coupée côté serveur : la réponse partielle n'est pas une réponse
+        throw new Error("chat_stream_interrupted");
+      }
+    }
+  }
+
+  return result;
+};